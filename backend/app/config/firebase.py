@@ -31,6 +31,25 @@ def verify_firebase_token(id_token: str) -> dict:
         logger.error(f"Failed to verify Firebase token: {str(e)}")
         raise
 
+def prime_signing_keys() -> int:
+    """
+    Fetch the public certificates used to verify ID tokens.
+    The verifier's HTTP cache keeps them (honouring Cache-Control), so the
+    first real login doesn't pay for the round trip. This reaches into the
+    Admin SDK's token verifier because it exposes no public hook for it;
+    if those internals change, this fails and logins fetch the keys instead.
+    """
+    try:
+        from firebase_admin import _token_gen
+        client = auth._get_client(firebase_admin.get_app())
+        request, cert_uri = client._token_verifier.request, _token_gen.ID_TOKEN_CERT_URI
+    except (AttributeError, ImportError) as e:
+        raise RuntimeError(f"Admin SDK token verifier internals unavailable: {str(e)}")
+    response = request(cert_uri)
+    if response.status != 200:
+        raise RuntimeError(f"Fetching signing certificates failed with HTTP {response.status}")
+    return len(response.data)
+
 def get_user_by_uid(uid: str):
     """Get Firebase user by UID"""
     try:
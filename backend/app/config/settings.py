@@ -5,9 +5,16 @@ import secrets
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
     
     # Security
     JWT_SECRET: str = secrets.token_urlsafe(32)
+    TOKEN_VERIFY_WORKERS: int = 4      # Threads verifying Firebase ID token signatures
+    TOKEN_VERIFY_TIMEOUT: float = 5.0  # Seconds a request waits for its token to be verified
+    ACCESS_TOKEN_TTL: int = 900         # Seconds an API access token is valid
+    REFRESH_TOKEN_TTL: int = 1209600    # Seconds a refresh token is valid (14 days)
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -23,7 +30,114 @@ class Settings(BaseSettings):
     # File Upload Settings
     MAX_UPLOAD_SIZE: int = 104857600  # 100MB in bytes
     ALLOWED_FILE_TYPES: str = "video/*,application/pdf,application/epub+zip"
+    
+    # Object Storage
+    STORAGE_BACKEND: str = "local"  # "local" (uploads/ directory) or "s3" (any S3-compatible store, e.g. MinIO)
     STORAGE_BUCKET: str
+    S3_ENDPOINT_URL: Optional[str] = None         # e.g. http://minio:9000; unset for AWS
+    S3_PUBLIC_ENDPOINT_URL: Optional[str] = None  # Endpoint browsers reach, when it differs (e.g. http://localhost:9000)
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: Optional[str] = None        # Unset: the standard AWS credential chain
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_ADDRESSING_STYLE: str = "path"             # MinIO needs path-style; "virtual" for AWS
+    S3_PUBLIC_URL: Optional[str] = None  # CDN/public bucket base URL; unset serves presigned GETs (HLS needs a public URL)
+    S3_MAX_CONNECTIONS: int = 20
+    S3_MULTIPART_CHUNK_SIZE: int = 8388608  # 8MB parts for uploads and downloads
+    STORAGE_URL_EXPIRY: int = 3600     # Seconds a presigned download URL stays valid
+    DIRECT_UPLOAD_EXPIRY: int = 900    # Seconds a presigned upload URL stays valid
+    
+    # Video Packaging (HLS)
+    FFMPEG_PATH: str = "ffmpeg"
+    FFPROBE_PATH: str = "ffprobe"
+    HLS_RENDITIONS: str = "360,720"  # Target heights, lowest first
+    HLS_INCLUDE_SOURCE: bool = True  # Also remux the original as a rendition
+    HLS_SEGMENT_SECONDS: int = 6
+    HLS_CACHE_MAX_AGE: int = 31536000  # 1 year; published playlists are immutable
+    TRANSCODE_WORKERS: int = 2
+    TRANSCODE_STALE_SECONDS: int = 900  # Pending/processing videos without progress this long are re-queued
+    
+    # PDF documents (linearized for fast web view, first page rendered as a preview)
+    QPDF_PATH: str = "qpdf"
+    PDFTOPPM_PATH: str = "pdftoppm"
+    PDF_PREVIEW_WIDTH: int = 800         # Pixels; the height follows the page's aspect ratio
+    PDF_PROCESS_TIMEOUT: int = 300       # Seconds per tool run before the original is kept as is
+    
+    # Avatars
+    AVATAR_SIZES: str = "48,128,512"    # Square derivatives in pixels; the smallest is used in lists
+    AVATAR_MAX_SIZE: int = 5242880      # 5MB
+    AVATAR_ALLOWED_TYPES: str = "image/jpeg,image/png,image/webp,image/gif"
+    AVATAR_CACHE_MAX_AGE: int = 31536000  # 1 year; derivatives are content-addressed
+    IMAGE_WORKERS: int = 2
+    
+    # Compression
+    COMPRESSION_MIN_SIZE: int = 1024      # Smaller responses are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4   # On-the-fly responses; precompressed files use the maximum
+    # Media types worth compressing; video, images and EPUB (a zip archive) already are compressed
+    COMPRESSIBLE_TYPES: str = "application/json,application/x-ndjson,text/*,application/pdf,image/svg+xml"
+    
+    # Category bundles
+    BUNDLE_MANIFEST_CACHE_SIZE: int = 64  # Category ZIP layouts kept per worker
+    
+    # Bootstrap and batch reads
+    BOOTSTRAP_CATALOGUE_PAGE_SIZE: int = 24  # Catalogue items returned by /api/bootstrap
+    CONTENT_BATCH_GET_MAX: int = 100         # Ids accepted by POST /api/content/batch-get
+    CONTINUE_MAX_ITEMS: int = 50             # Largest limit accepted by GET /api/content/continue
+    DIRECTORY_PAGE_SIZE: int = 50            # Users per GET /api/auth/directory page by default
+    DIRECTORY_MAX_PAGE_SIZE: int = 200       # Largest limit accepted by GET /api/auth/directory
+    
+    # Roster Import
+    ROSTER_IMPORT_BATCH_SIZE: int = 1000  # Rows validated and inserted per round trip
+    
+    # content_access partitioning and archival
+    PARTITION_MONTHS_AHEAD: int = 3      # Future monthly partitions kept ready
+    PARTITION_CHECK_SECONDS: float = 3600.0  # How often each worker tops the partitions up
+    ACCESS_RETENTION_MONTHS: int = 24    # Months of content_access kept in the live table
+    ACCESS_ARCHIVE_DIR: str = "archives"
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 5000  # Rows fetched per server-side cursor round trip
+    
+    # Recommendations
+    RECOMMENDATION_TOP_K: int = 20        # Neighbours stored per content item
+    RECOMMENDATION_MIN_SUPPORT: int = 2   # Minimum users in common before two items are related
+    
+    # Admission Control
+    ADMISSION_CONTROL_ENABLED: bool = True
+    # Concurrent requests allowed per expensive route ("METHOD path=limit", comma-separated)
+    ADMISSION_ROUTE_LIMITS: str = "POST /api/content/upload=4,GET /api/content/=16,POST /api/auth/login=8"
+    ADMISSION_QUEUE_SIZE: int = 32        # Requests allowed to wait per route before shedding
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0  # Seconds a queued request may wait for a slot
+    RATE_LIMIT_PER_SECOND: float = 5.0    # Token refill rate per user (or address) and route
+    RATE_LIMIT_BURST: int = 20            # Bucket capacity per user and route
+    RATE_LIMIT_MAX_WAIT: float = 1.0      # Seconds a request may wait for a token before 429
+    
+    # Query budgets
+    STATEMENT_TIMEOUT_MS: int = 15000  # Per-statement budget for API requests (0 = none); background jobs are not limited
+    # Tighter budgets for hot routes ("METHOD path=milliseconds", comma-separated)
+    ROUTE_STATEMENT_TIMEOUTS: str = "GET /api/content/=2000,GET /api/auth/students=3000,GET /api/bootstrap=3000"
+    CANCEL_QUERIES_ON_DISCONNECT: bool = True
+    
+    # Caching
+    CATALOGUE_CACHE_TTL: int = 30  # Seconds a serialized catalogue page is reused
+    PERMISSION_CACHE_TTL: int = 300  # Seconds a user's accessible-student set is reused
+    CACHE_INVALIDATION_BUS: str = "postgres"  # "postgres" (LISTEN/NOTIFY) or "local" (single process/tests)
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    
+    # Delta sync
+    SYNC_PAGE_SIZE: int = 500              # Rows per stream per /api/sync response
+    SYNC_SETTLE_SECONDS: float = 2.0       # Newer changes wait a poll so in-flight transactions can commit
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # Older sync tokens must start over with a full sync
+    
+    # Live events (SSE)
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Idle keep-alive interval
+    SSE_QUEUE_SIZE: int = 100            # Undelivered events per client before it is reset
+    SSE_REPLAY_BUFFER: int = 1000        # Recent events kept per worker for Last-Event-ID resume
+    SSE_MAX_SUBSCRIBED_CONTENT: int = 50  # Content ids a client may follow for comments
+    
+    # Readiness
+    READINESS_PROBE_TTL: float = 5.0  # Seconds a database reachability check is reused
+    WARMUP_RETRY_SECONDS: float = 5.0
     
     # Computed Properties
     @property
@@ -34,6 +148,30 @@ class Settings(BaseSettings):
     def allowed_file_types_list(self) -> list[str]:
         return self.ALLOWED_FILE_TYPES.split(",")
     
+    @property
+    def admission_route_limits(self) -> dict[tuple[str, str], int]:
+        return _parse_route_values(self.ADMISSION_ROUTE_LIMITS)
+    
+    @property
+    def route_statement_timeouts(self) -> dict[tuple[str, str], int]:
+        return _parse_route_values(self.ROUTE_STATEMENT_TIMEOUTS)
+    
+    @property
+    def avatar_sizes_list(self) -> list[int]:
+        return sorted(int(size) for size in self.AVATAR_SIZES.split(",") if size.strip())
+    
+    @property
+    def avatar_allowed_types_list(self) -> list[str]:
+        return [media_type.strip() for media_type in self.AVATAR_ALLOWED_TYPES.split(",") if media_type.strip()]
+    
+    @property
+    def compressible_types_list(self) -> list[str]:
+        return [media_type.strip() for media_type in self.COMPRESSIBLE_TYPES.split(",") if media_type.strip()]
+    
+    @property
+    def hls_renditions_list(self) -> list[int]:
+        return sorted(int(height) for height in self.HLS_RENDITIONS.split(",") if height.strip())
+    
     @property
     def is_development(self) -> bool:
         return self.ENVIRONMENT.lower() == "development"
@@ -46,6 +184,17 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
+def _parse_route_values(raw: str) -> dict[tuple[str, str], int]:
+    """Parse "METHOD path=value" entries, comma-separated"""
+    values = {}
+    for entry in raw.split(","):
+        if not entry.strip():
+            continue
+        route, _, value = entry.strip().rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        values[(method.upper(), path.strip())] = int(value)
+    return values
+
 # Create settings instance
 settings = Settings()
 
@@ -57,9 +206,55 @@ def validate_settings():
     assert settings.FIREBASE_PRIVATE_KEY, "FIREBASE_PRIVATE_KEY is required"
     assert settings.FIREBASE_CLIENT_EMAIL, "FIREBASE_CLIENT_EMAIL is required"
     assert settings.STORAGE_BUCKET, "STORAGE_BUCKET is required"
+    assert settings.STORAGE_BACKEND in ["local", "s3"], "STORAGE_BACKEND must be either 'local' or 's3'"
+    assert settings.DIRECT_UPLOAD_EXPIRY > 0, "DIRECT_UPLOAD_EXPIRY must be positive"
+    assert settings.S3_MULTIPART_CHUNK_SIZE >= 5242880, "S3_MULTIPART_CHUNK_SIZE must be at least 5MB"
+    assert settings.CACHE_INVALIDATION_BUS in ["postgres", "local"], \
+        "CACHE_INVALIDATION_BUS must be either 'postgres' or 'local'"
+    assert settings.DB_POOL_SIZE > 0, "DB_POOL_SIZE must be positive"
     assert settings.MAX_UPLOAD_SIZE > 0, "MAX_UPLOAD_SIZE must be positive"
     assert len(settings.allowed_origins_list) > 0, "At least one origin must be allowed"
     assert len(settings.allowed_file_types_list) > 0, "At least one file type must be allowed"
+    assert settings.HLS_SEGMENT_SECONDS > 0, "HLS_SEGMENT_SECONDS must be positive"
+    assert settings.TRANSCODE_WORKERS > 0, "TRANSCODE_WORKERS must be positive"
+    assert settings.TRANSCODE_STALE_SECONDS > 0, "TRANSCODE_STALE_SECONDS must be positive"
+    assert settings.PDF_PREVIEW_WIDTH > 0, "PDF_PREVIEW_WIDTH must be positive"
+    assert settings.PDF_PROCESS_TIMEOUT > 0, "PDF_PROCESS_TIMEOUT must be positive"
+    assert len(settings.avatar_sizes_list) > 0, "At least one avatar size is required"
+    assert settings.IMAGE_WORKERS > 0, "IMAGE_WORKERS must be positive"
+    assert settings.TOKEN_VERIFY_WORKERS > 0, "TOKEN_VERIFY_WORKERS must be positive"
+    assert settings.TOKEN_VERIFY_TIMEOUT > 0, "TOKEN_VERIFY_TIMEOUT must be positive"
+    assert settings.ACCESS_TOKEN_TTL > 0, "ACCESS_TOKEN_TTL must be positive"
+    assert settings.REFRESH_TOKEN_TTL > settings.ACCESS_TOKEN_TTL, \
+        "REFRESH_TOKEN_TTL must be longer than ACCESS_TOKEN_TTL"
+    # The generated default differs per worker, so tokens would only verify on the worker that signed them
+    assert settings.is_development or "JWT_SECRET" in settings.model_fields_set, \
+        "JWT_SECRET must be set in production"
+    assert 1 <= settings.COMPRESSION_GZIP_LEVEL <= 9, "COMPRESSION_GZIP_LEVEL must be between 1 and 9"
+    assert 0 <= settings.COMPRESSION_BROTLI_QUALITY <= 11, "COMPRESSION_BROTLI_QUALITY must be between 0 and 11"
+    assert settings.BOOTSTRAP_CATALOGUE_PAGE_SIZE > 0, "BOOTSTRAP_CATALOGUE_PAGE_SIZE must be positive"
+    assert settings.CONTENT_BATCH_GET_MAX > 0, "CONTENT_BATCH_GET_MAX must be positive"
+    assert settings.CONTINUE_MAX_ITEMS > 0, "CONTINUE_MAX_ITEMS must be positive"
+    assert 0 < settings.DIRECTORY_PAGE_SIZE <= settings.DIRECTORY_MAX_PAGE_SIZE, \
+        "DIRECTORY_PAGE_SIZE must be positive and at most DIRECTORY_MAX_PAGE_SIZE"
+    assert settings.SYNC_PAGE_SIZE > 0, "SYNC_PAGE_SIZE must be positive"
+    assert settings.SYNC_TOMBSTONE_RETENTION_DAYS > 0, "SYNC_TOMBSTONE_RETENTION_DAYS must be positive"
+    assert settings.SSE_HEARTBEAT_SECONDS > 0, "SSE_HEARTBEAT_SECONDS must be positive"
+    assert settings.SSE_QUEUE_SIZE > 0, "SSE_QUEUE_SIZE must be positive"
+    assert settings.ROSTER_IMPORT_BATCH_SIZE > 0, "ROSTER_IMPORT_BATCH_SIZE must be positive"
+    assert settings.PARTITION_MONTHS_AHEAD > 0, "PARTITION_MONTHS_AHEAD must be positive"
+    assert settings.PARTITION_CHECK_SECONDS > 0, "PARTITION_CHECK_SECONDS must be positive"
+    assert settings.ACCESS_RETENTION_MONTHS > 0, "ACCESS_RETENTION_MONTHS must be positive"
+    assert settings.EXPORT_BATCH_SIZE > 0, "EXPORT_BATCH_SIZE must be positive"
+    assert settings.RECOMMENDATION_TOP_K > 0, "RECOMMENDATION_TOP_K must be positive"
+    assert all(limit > 0 for limit in settings.admission_route_limits.values()), \
+        "ADMISSION_ROUTE_LIMITS entries must be positive"
+    assert settings.STATEMENT_TIMEOUT_MS >= 0, "STATEMENT_TIMEOUT_MS cannot be negative"
+    assert all(timeout >= 0 for timeout in settings.route_statement_timeouts.values()), \
+        "ROUTE_STATEMENT_TIMEOUTS entries cannot be negative"
+    assert settings.ADMISSION_QUEUE_SIZE >= 0, "ADMISSION_QUEUE_SIZE cannot be negative"
+    assert settings.RATE_LIMIT_PER_SECOND > 0, "RATE_LIMIT_PER_SECOND must be positive"
+    assert settings.RATE_LIMIT_BURST > 0, "RATE_LIMIT_BURST must be positive"
     
     # Validate environment
     assert settings.ENVIRONMENT.lower() in ["development", "production"], \
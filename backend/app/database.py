@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
@@ -6,6 +6,8 @@ from contextlib import contextmanager
 import logging
 from typing import Generator
 from app.config.settings import settings
+from app.services.query_budget import install_query_budgets
+from app.services.tenancy import install_tenant_scoping
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +17,19 @@ def setup_database():
         engine = create_engine(
             settings.DATABASE_URL,
             poolclass=QueuePool,
-            pool_size=5,
-            max_overflow=10,
-            pool_timeout=30,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
             pool_pre_ping=True,  # Enable connection health checks
             pool_recycle=3600,   # Recycle connections after 1 hour
         )
         
+        # Per-request statement budgets and cancellation on client disconnect
+        install_query_budgets(engine)
+        
         # Test the connection
         with engine.connect() as connection:
-            connection.execute("SELECT 1")
+            connection.execute(text("SELECT 1"))
             
         SessionLocal = sessionmaker(
             autocommit=False,
@@ -32,6 +37,7 @@ def setup_database():
             bind=engine,
             expire_on_commit=False
         )
+        install_tenant_scoping(SessionLocal)
         
         logger.info("Database connection established successfully")
         return engine, SessionLocal
@@ -64,6 +70,35 @@ def get_db_session() -> Generator[Session, None, None]:
     finally:
         session.close()
 
+def warm_pool() -> int:
+    """Open the configured pool connections so first requests skip the connect handshake"""
+    if not engine:
+        raise RuntimeError("Database not initialized. Call setup_database() first.")
+    
+    connections = []
+    try:
+        # Hold every connection at once, otherwise the pool just hands back the same one
+        for _ in range(settings.DB_POOL_SIZE):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+def ping_database() -> bool:
+    """Check that the database answers a trivial query"""
+    if not engine:
+        return False
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except SQLAlchemyError as e:
+        logger.error(f"Database ping failed: {str(e)}")
+        return False
+
 # Initialize database connection
 engine = None
 SessionLocal = None
@@ -2,8 +2,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db_session
-from app.config.firebase import verify_firebase_token
 from app.models.user import User, UserRole
+from app.services.access_tokens import is_local_token, principal_from_claims, read_access_token
+from app.services.permissions import can_view_student
+from app.services.tenancy import set_current_tenant
+from app.services.token_verification import TokenVerificationTimeout, verify_id_token
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,10 +16,18 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db_session)
 ) -> User:
-    """Dependency to get current authenticated user"""
+    """
+    Dependency to get current authenticated user. API access tokens are
+    checked locally without a query; Firebase ID tokens are still accepted.
+    """
     try:
         token = credentials.credentials
-        decoded_token = verify_firebase_token(token)
+        if is_local_token(token):
+            user = principal_from_claims(db, read_access_token(token))
+            set_current_tenant(user.tenant_id)
+            return user
+        
+        decoded_token = await verify_id_token(token)
         
         user = db.query(User).filter(User.firebase_uid == decoded_token['uid']).first()
         if not user:
@@ -30,9 +41,16 @@ async def get_current_user(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User account is disabled"
             )
-            
+        
+        # Everything else in the request only sees the user's school
+        set_current_tenant(user.tenant_id)
         return user
         
+    except TokenVerificationTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry"
+        )
     except Exception as e:
         logger.error(f"Authentication error: {str(e)}")
         raise HTTPException(
@@ -67,9 +85,13 @@ async def get_guardian_user(current_user: User = Depends(get_current_user)) -> U
         )
     return current_user
 
-def get_student_access(student_id: str, current_user: User = Depends(get_current_user)) -> bool:
+def get_student_access(
+    student_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+) -> bool:
     """Check if current user has access to student data"""
-    if not current_user.can_view_student(student_id):
+    if not can_view_student(db, current_user, student_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this student's data"
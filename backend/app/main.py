@@ -3,16 +3,35 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.staticfiles import StaticFiles
+from app import database
 from app.database import init_db
 from app.config.firebase import init_firebase
-from app.routes import auth, content
+from app.routes import auth, bootstrap, content, dashboard, events, exports, sync
 from app.middleware.security import (
     SecurityMiddleware, 
     UploadSizeMiddleware, 
     FileTypeValidationMiddleware
 )
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.query_cancellation import QueryCancellationMiddleware
+from app.middleware.static_ranges import RangeStaticFiles
 from app.config.settings import settings, validate_settings
+from app.services.transcoding import shutdown_transcoder
+from app.services.compression import shutdown_precompression
+from app.services.documents import shutdown_document_processing
+from app.services.images import shutdown_image_workers
+from app.services.token_verification import shutdown_token_verifier
+from app.services.warmup import (
+    run_warmup, run_background_warmup, run_partition_maintenance, run_packaging_recovery,
+    warmup_state, database_reachable
+)
+from app.services.invalidation import bus as invalidation_bus
+from app.services.events import hub as event_hub
+from app.services.access_tokens import revocations as token_revocations
+from app.services.query_budget import counters as query_counters, is_query_cancelled, is_statement_timeout
+from sqlalchemy.exc import OperationalError
+import asyncio
 import time
 from typing import Callable
 import uvicorn
@@ -38,14 +57,25 @@ app = FastAPI(
     redoc_url="/api/redoc" if settings.is_development else None
 )
 
-# Static file serving
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Static file serving with byte ranges; with the S3 backend clients fetch files (and ranges) from the store
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs("uploads", exist_ok=True)
+    app.mount("/uploads", RangeStaticFiles(directory="uploads"), name="uploads")
+
+# Compression sits innermost so it wraps the route and static responses directly
+app.add_middleware(CompressionMiddleware)
+
+# Query budgets wrap the routes so a disconnect can cancel their database work
+app.add_middleware(QueryCancellationMiddleware)
 
 # Security Middlewares
 app.add_middleware(SecurityMiddleware)
 app.add_middleware(UploadSizeMiddleware)
 app.add_middleware(FileTypeValidationMiddleware)
 
+# Admission control runs before upload parsing so overload is shed cheaply
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -121,6 +151,21 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         }
     )
 
+@app.exception_handler(OperationalError)
+async def database_error_handler(request: Request, exc: OperationalError):
+    if not is_query_cancelled(exc):
+        return await global_exception_handler(request, exc)
+    request_id = request.headers.get("X-Request-ID", str(time.time()))
+    timed_out = is_statement_timeout(exc)
+    return JSONResponse(
+        status_code=503 if timed_out else 499,
+        content={
+            "detail": "Query exceeded its time budget" if timed_out else "Client closed request",
+            "code": "QUERY_TIMEOUT" if timed_out else "QUERY_CANCELLED",
+            "request_id": request_id
+        }
+    )
+
 # Initialize services on startup
 @app.on_event("startup")
 async def startup_event():
@@ -143,6 +188,26 @@ async def startup_event():
         os.makedirs("logs", exist_ok=True)
         logger.info("Required directories created/verified")
         
+        # Subscribe to cache invalidations published by the other workers
+        app.state.invalidation_task = asyncio.create_task(invalidation_bus.run())
+        
+        # Live events reach SSE clients through the same bus
+        event_hub.start(invalidation_bus)
+        
+        # Token revocations from any worker are checked in memory by every worker
+        token_revocations.start(invalidation_bus)
+        
+        # Warm pools and caches in the background; readiness stays false until done
+        app.state.warmup_task = asyncio.create_task(run_warmup())
+        # Best-effort priming (Firebase signing keys) is reported but does not gate readiness
+        app.state.background_warmup_task = asyncio.create_task(run_background_warmup())
+        
+        # Future content_access partitions are topped up periodically, outside readiness
+        app.state.partition_task = asyncio.create_task(run_partition_maintenance())
+        
+        # Video packaging queued in a process that has since stopped is picked up again
+        app.state.packaging_task = asyncio.create_task(run_packaging_recovery())
+        
         logger.info("All services initialized successfully")
     except Exception as e:
         logger.critical(f"Failed to initialize services: {str(e)}")
@@ -151,15 +216,31 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutdown: Cleaning up resources")
-    # Add cleanup tasks here
+    event_hub.close()
+    for task_name in ("warmup_task", "background_warmup_task", "partition_task", "packaging_task", "invalidation_task"):
+        task = getattr(app.state, task_name, None)
+        if task and not task.done():
+            task.cancel()
+    shutdown_transcoder()
+    shutdown_precompression()
+    shutdown_document_processing()
+    shutdown_image_workers()
+    shutdown_token_verifier()
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
+app.include_router(bootstrap.router, prefix="/api")
 app.include_router(content.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(sync.router, prefix="/api")
 
-# Health check endpoint
+# Health check endpoints
 @app.get("/api/health")
+@app.get("/api/health/live")
 async def health_check():
+    """Liveness: the process is up and serving the event loop"""
     return {
         "status": "healthy",
         "timestamp": time.time(),
@@ -167,6 +248,35 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Readiness: warm-up finished and the database answers"""
+    database_ok = await database_reachable() if warmup_state.ready else False
+    ready = warmup_state.ready and database_ok
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "timestamp": time.time(),
+            "database": database_ok,
+            "warmup": warmup_state.to_dict()
+        }
+    )
+
+@app.get("/api/health/queries")
+async def query_health():
+    """Statements stopped by their budget or a client disconnect, and pool usage"""
+    pool = database.engine.pool if database.engine else None
+    return {
+        "timestamp": time.time(),
+        "queries": query_counters.to_dict(),
+        "pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow()
+        } if pool else None
+    }
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
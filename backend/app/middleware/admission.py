@@ -0,0 +1,150 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.responses import Response
+from app.config.settings import settings
+from app.services.access_tokens import AccessTokenError, is_local_token, read_access_token
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_BUCKETS = 10000
+
+# A whole school logs in at once from one NAT address; these routes are only
+# rate limited per verified user and otherwise rely on their route slots
+ADDRESS_LIMIT_EXEMPT_ROUTES = {("POST", "/api/auth/login")}
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests for a route, with a bounded and time-limited wait queue"""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self._waiting = 0
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked() and self._waiting >= self.queue_size:
+            return False
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting -= 1
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+class TokenBucket:
+    """
+    Token bucket where callers reserve tokens ahead of time.
+    Tokens may go negative, which queues the caller for the time it takes
+    to refill; reservations that would wait too long are rejected.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, max_wait: float) -> Tuple[bool, float]:
+        """Reserve one token, returning (accepted, seconds to wait)"""
+        self._refill(time.monotonic())
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            return False, wait
+        self.tokens -= 1
+        return True, wait
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """
+    Sheds load on expensive routes before it reaches the database pool.
+    Callers are rate limited with token buckets, per user for this API's
+    own access tokens and per client address otherwise; every caller then
+    competes for a fixed number of route slots.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiters: Dict[Tuple[str, str], ConcurrencyLimiter] = {
+            route: ConcurrencyLimiter(limit, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT)
+            for route, limit in settings.admission_route_limits.items()
+        }
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def _client_key(self, request: Request) -> Optional[str]:
+        # Users behind one school NAT get separate buckets when their token proves who they are.
+        # Local tokens verify with one HMAC; an unverified token would let a caller mint a
+        # fresh bucket per request, so anything else is keyed on the client address
+        # (except on ADDRESS_LIMIT_EXEMPT_ROUTES).
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token and is_local_token(token):
+            try:
+                return f"user:{read_access_token(token)['sub']}"
+            except AccessTokenError:
+                pass
+        if (request.method, request.url.path) in ADDRESS_LIMIT_EXEMPT_ROUTES or not request.client:
+            return None
+        return f"ip:{request.client.host}"
+
+    def _bucket(self, key: Tuple[str, str]) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= MAX_TRACKED_BUCKETS:
+                now = time.monotonic()
+                self.buckets = {k: b for k, b in self.buckets.items() if not b.is_idle(now)}
+            bucket = TokenBucket(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+            self.buckets[key] = bucket
+        return bucket
+
+    def _reject(self, status_code: int, detail: str, code: str, retry_after: float) -> Response:
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": detail, "code": code},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        route = (request.method, request.url.path)
+        limiter = self.limiters.get(route)
+        if not settings.ADMISSION_CONTROL_ENABLED or limiter is None:
+            return await call_next(request)
+
+        client_key = self._client_key(request)
+        if client_key:
+            accepted, wait = self._bucket((client_key, request.url.path)).reserve(settings.RATE_LIMIT_MAX_WAIT)
+            if not accepted:
+                logger.warning(f"Rate limit exceeded on {request.method} {request.url.path}")
+                return self._reject(429, "Too many requests", "RATE_LIMITED", wait)
+            if wait:
+                await asyncio.sleep(wait)
+
+        if not await limiter.acquire():
+            logger.warning(f"Shedding {request.method} {request.url.path}: no capacity within queue deadline")
+            return self._reject(503, "Server is busy, please retry", "OVERLOADED", limiter.timeout)
+
+        try:
+            return await call_next(request)
+        finally:
+            limiter.release()
@@ -0,0 +1,143 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.settings import settings
+from app.services.compression import (
+    StreamCompressor,
+    accepted_encodings,
+    is_compressible,
+    negotiate_encoding,
+    sibling_path
+)
+import logging
+import mimetypes
+import os
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_PREFIX = "/uploads/"
+UPLOADS_DIRECTORY = "uploads"
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli compression.
+    Uploaded files are answered from their precompressed .br/.gz siblings; other
+    compressible responses above COMPRESSION_MIN_SIZE are compressed as they stream.
+    Implemented as plain ASGI so no response body is ever buffered.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        accept_encoding = headers.get("accept-encoding")
+
+        if scope["path"].startswith(UPLOADS_PREFIX):
+            if scope["method"] in ("GET", "HEAD") and "range" not in headers:
+                response = self._precompressed_response(scope["path"], accept_encoding)
+                if response is not None:
+                    await response(scope, receive, send)
+                    return
+            # Uploads without a sibling are either incompressible or still being processed
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self.app, encoding)
+        await responder(scope, receive, send)
+
+    def _precompressed_response(self, path: str, accept_encoding: str):
+        relative = path[len(UPLOADS_PREFIX):]
+        root = os.path.realpath(UPLOADS_DIRECTORY)
+        file_path = os.path.realpath(os.path.join(root, relative))
+        if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+            return None
+
+        media_type = mimetypes.guess_type(file_path)[0]
+        if not is_compressible(media_type):
+            return None
+
+        for encoding in accepted_encodings(accept_encoding):
+            compressed = sibling_path(file_path, encoding)
+            if os.path.isfile(compressed):
+                return FileResponse(
+                    compressed,
+                    media_type=media_type,
+                    headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+                )
+        return None
+
+class _CompressingResponder:
+    """Wraps one response; decides on the first body chunk whether to compress it"""
+
+    def __init__(self, app: ASGIApp, encoding: str):
+        self.app = app
+        self.encoding = encoding
+        self.send: Send = None
+        self.start_message: Message = None
+        self.compressor: StreamCompressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how large the response is
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_length = headers.get("content-length")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or not is_compressible(headers.get("content-type"))
+                or (content_length is not None and int(content_length) < settings.COMPRESSION_MIN_SIZE)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.compressor = StreamCompressor(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            _add_vary(headers)
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        if more_body:
+            # Flushed per chunk so streamed responses reach the client as they are produced
+            data = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            data = self.compressor.compress(body) + self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,67 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.settings import settings
+from app.services.query_budget import RequestQueries, current_queries, route_statement_timeout
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QueryCancellationMiddleware:
+    """
+    Gives each request its statement budget and cancels its in-flight queries
+    when the client disconnects before the response is complete, so abandoned
+    requests hand their pooled connections back instead of running to the end.
+    Implemented as plain ASGI so it sees http.disconnect as soon as it arrives.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        queries = RequestQueries(f"{method} {path}", route_statement_timeout(method, path))
+        token = current_queries.set(queries)
+        if not settings.CANCEL_QUERIES_ON_DISCONNECT:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                current_queries.reset(token)
+            return
+
+        # One message at a time, so request bodies still stream with backpressure
+        messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+        async def watch_disconnect() -> None:
+            while True:
+                try:
+                    message = await receive()
+                except Exception:
+                    message = {"type": "http.disconnect"}
+                if message["type"] == "http.disconnect":
+                    if not queries.response_sent:
+                        signalled = await run_in_threadpool(queries.cancel)
+                        if signalled:
+                            logger.info(f"Client left {queries.route}; cancelled {signalled} query connection(s)")
+                    await messages.put(message)
+                    return
+                await messages.put(message)
+
+        async def queued_receive() -> Message:
+            return await messages.get()
+
+        async def tracked_send(message: Message) -> None:
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                queries.response_sent = True
+            await send(message)
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await self.app(scope, queued_receive, tracked_send)
+        finally:
+            watcher.cancel()
+            current_queries.reset(token)
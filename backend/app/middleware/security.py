@@ -2,6 +2,7 @@ from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import Response
 from app.config.settings import settings
+from app.services.transcoding import HLS_EXTENSIONS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,12 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         # Cache Control
         if request.url.path.startswith(("/api/static/", "/api/media/")):
             response.headers["Cache-Control"] = "public, max-age=31536000"
+        elif request.url.path.startswith("/uploads/") and request.url.path.endswith(HLS_EXTENSIONS):
+            # Segments and versioned playlists are never rewritten once published
+            response.headers["Cache-Control"] = f"public, max-age={settings.HLS_CACHE_MAX_AGE}, immutable"
+        elif request.url.path.startswith("/uploads/avatars/"):
+            # Avatar derivatives are named by content hash
+            response.headers["Cache-Control"] = f"public, max-age={settings.AVATAR_CACHE_MAX_AGE}, immutable"
         else:
             response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
         
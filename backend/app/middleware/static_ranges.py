@@ -0,0 +1,60 @@
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.services.bundles import parse_range
+from typing import Iterator
+import os
+
+CHUNK_SIZE = 1024 * 1024
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = source.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+class RangeStaticFiles(StaticFiles):
+    """
+    StaticFiles that honours a single byte range (206 Partial Content) and
+    advertises Accept-Ranges, so PDF viewers can load a linearized document
+    page by page instead of waiting for the whole file.
+    """
+
+    def file_response(self, full_path: os.PathLike, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if status_code != 200 or not isinstance(response, FileResponse):
+            return response
+        response.headers["Accept-Ranges"] = "bytes"
+
+        request_headers = Headers(scope=scope)
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if scope["method"] != "GET" or not range_header:
+            return response
+        # The file changed since the client's first piece: send it whole
+        if if_range and if_range not in (response.headers.get("etag"), response.headers.get("last-modified")):
+            return response
+
+        size = stat_result.st_size
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+            )
+        if byte_range is None:
+            return response
+
+        start, end = byte_range
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_read_range(str(full_path), start, end), status_code=206, headers=headers)
@@ -1,7 +1,43 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+import os
+import time
+import uuid
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): a 48-bit Unix millisecond timestamp
+    followed by random bits, so new keys land at the right edge of the B-tree.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+def new_id() -> str:
+    """Default for primary keys"""
+    return str(uuid7())
+
+class UUIDString(TypeDecorator):
+    """
+    Native 16-byte uuid column exposed to Python as a str, like the old String keys.
+    Malformed ids bind as NULL, so lookups with them find nothing instead of erroring.
+    """
+    impl = UUID(as_uuid=False)
+    cache_ok = True
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return None
 
 class BaseModel:
     """Base class for all models"""
@@ -1,61 +1,98 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, ForeignKey, Float, Enum
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, BigInteger, ForeignKey, Float, Enum
 from sqlalchemy.orm import relationship
-from app.models.base import Base
+from app.models.base import Base, UUIDString, new_id
+from app.models.tenant import TenantScoped
 from app.models.user import User
+from app.services.storage import storage
 from datetime import datetime
+from typing import Optional
 import enum
-import uuid
 
 class ContentType(str, enum.Enum):
     VIDEO = "video"
     DOCUMENT = "document"
     EBOOK = "ebook"
 
+class TranscodeStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+
 class ContentCategory(Base):
     __tablename__ = "content_categories"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     name = Column(String, nullable=False, unique=True)
     description = Column(Text)
     
     # Relationship
     contents = relationship("EducationalContent", back_populates="category")
 
-class EducationalContent(Base):
+class EducationalContent(TenantScoped, Base):
     __tablename__ = "educational_content"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     title = Column(String, nullable=False)
     description = Column(Text)
-    content_type = Column(Enum(ContentType), nullable=False)
+    content_type = Column(
+        Enum(ContentType, name="content_type", values_callable=lambda e: [m.value for m in e]),
+        nullable=False
+    )
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=False)
     duration = Column(Integer)  # For videos (in seconds)
+    crc32 = Column(BigInteger)  # Checksum of the stored file, used by category bundles
     
     # Foreign Keys
-    category_id = Column(String, ForeignKey('content_categories.id'), nullable=False)
-    uploaded_by = Column(String, ForeignKey('users.id'), nullable=False)
+    category_id = Column(UUIDString, ForeignKey('content_categories.id'), nullable=False)
+    uploaded_by = Column(UUIDString, ForeignKey('users.id'), nullable=False)
     
     # Additional metadata
     is_published = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
     download_count = Column(Integer, default=0)
     
+    # HLS packaging (videos only)
+    transcode_status = Column(
+        Enum(TranscodeStatus, name="transcode_status", values_callable=lambda e: [m.value for m in e])
+    )
+    transcode_progress = Column(Float, default=0.0)  # Percentage across the whole ladder
+    hls_manifest_path = Column(String)  # Latest master playlist, set once the first rendition is ready
+    hls_renditions = Column(String)     # Comma-separated list of ready renditions
+    
+    # PDF documents
+    page_count = Column(Integer)
+    preview_path = Column(String)  # First page rendered as an image
+    
     # Relationships
     category = relationship("ContentCategory", back_populates="contents")
     uploader = relationship("User")
     access_logs = relationship("ContentAccess", back_populates="content")
     comments = relationship("ContentComment", back_populates="content")
+    
+    @property
+    def file_url(self) -> str:
+        """Where clients download the file from, per the configured storage backend"""
+        return storage.url(self.file_path)
+    
+    @property
+    def hls_manifest_url(self) -> Optional[str]:
+        return storage.url(self.hls_manifest_path)
+    
+    @property
+    def preview_url(self) -> Optional[str]:
+        return storage.url(self.preview_path)
 
-class ContentAccess(Base):
+class ContentAccess(TenantScoped, Base):
     __tablename__ = "content_access"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     
     # Foreign Keys
-    content_id = Column(String, ForeignKey('educational_content.id'), nullable=False)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
+    content_id = Column(UUIDString, ForeignKey('educational_content.id'), nullable=False)
+    user_id = Column(UUIDString, ForeignKey('users.id'), nullable=False)
     
     # Access metadata
     last_accessed = Column(DateTime, default=datetime.utcnow)
@@ -69,11 +106,11 @@ class ContentAccess(Base):
 class ContentComment(Base):
     __tablename__ = "content_comments"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     
     # Foreign Keys
-    content_id = Column(String, ForeignKey('educational_content.id'), nullable=False)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
+    content_id = Column(UUIDString, ForeignKey('educational_content.id'), nullable=False)
+    user_id = Column(UUIDString, ForeignKey('users.id'), nullable=False)
     
     # Comment details
     comment = Column(Text, nullable=False)
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Float
+from app.models.base import Base, UUIDString
+
+# Progress rollups maintained incrementally from content_access.
+# Every table shares the same counters so they can be updated and rebuilt uniformly:
+#   started        - access rows (content items a student has opened)
+#   completed      - access rows marked completed
+#   progress_total - sum of progress percentages; average = progress_total / started
+
+class StudentProgressRollup(Base):
+    __tablename__ = "student_progress_rollups"
+
+    student_id = Column(UUIDString, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    started = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Float, nullable=False, default=0.0)
+    last_accessed = Column(DateTime)
+
+class ContentProgressRollup(Base):
+    __tablename__ = "content_progress_rollups"
+
+    content_id = Column(UUIDString, ForeignKey('educational_content.id', ondelete='CASCADE'), primary_key=True)
+    started = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Float, nullable=False, default=0.0)
+    last_accessed = Column(DateTime)
+
+class StudentCategoryProgressRollup(Base):
+    __tablename__ = "student_category_progress_rollups"
+
+    student_id = Column(UUIDString, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    category_id = Column(UUIDString, ForeignKey('content_categories.id', ondelete='CASCADE'), primary_key=True)
+    started = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Float, nullable=False, default=0.0)
+    last_accessed = Column(DateTime)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Integer, SmallInteger, ForeignKey, REAL
+from app.models.base import Base, UUIDString
+
+class ContentRecommendation(Base):
+    """Top-K co-access neighbours of a content item, refreshed by the batch job"""
+    __tablename__ = "content_recommendations"
+
+    content_id = Column(UUIDString, ForeignKey('educational_content.id', ondelete='CASCADE'), primary_key=True)
+    related_content_id = Column(UUIDString, ForeignKey('educational_content.id', ondelete='CASCADE'), primary_key=True)
+    rank = Column(SmallInteger, nullable=False)
+    score = Column(REAL, nullable=False)     # Cosine similarity of the two access sets
+    support = Column(Integer, nullable=False)  # Users who accessed both items
+
+class JobWatermark(Base):
+    """High-water mark of the data an incremental batch job has already processed"""
+    __tablename__ = "job_watermarks"
+
+    job_name = Column(String, primary_key=True)
+    watermark = Column(DateTime, nullable=False)
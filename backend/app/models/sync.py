@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, String
+from app.models.base import Base, UUIDString
+
+class SyncTombstone(Base):
+    """
+    A deleted category, content item or progress row, written by a database
+    trigger so the change feed can report deletions. Rows older than
+    SYNC_TOMBSTONE_RETENTION_DAYS are purged.
+    """
+    __tablename__ = "sync_tombstones"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    entity_type = Column(String(32), nullable=False)  # "category", "content" or "progress"
+    entity_id = Column(UUIDString, nullable=False)
+    user_id = Column(UUIDString)  # Owner of per-user rows; NULL for shared ones
+    tenant_id = Column(UUIDString)  # School of the deleted row; NULL for categories, which all schools share
+    deleted_at = Column(DateTime, nullable=False)
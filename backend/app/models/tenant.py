@@ -0,0 +1,34 @@
+from contextvars import ContextVar
+from sqlalchemy import Boolean, Column, ForeignKey, String
+from sqlalchemy.orm import declared_attr
+from typing import Optional
+from app.models.base import Base, UUIDString, new_id
+
+# Created by migration 013; existing rows and single-school deployments belong to it
+DEFAULT_TENANT_ID = "01a152c6-8f79-757a-b3be-2e54fbdf72a7"
+
+# School of the authenticated user, set by get_current_user for the rest of the request
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+def current_tenant_id() -> str:
+    """Tenant for new rows: the request's school, or the default one outside a request"""
+    return current_tenant.get() or DEFAULT_TENANT_ID
+
+class Tenant(Base):
+    """A school hosted on the deployment"""
+    __tablename__ = "tenants"
+
+    id = Column(UUIDString, primary_key=True, default=new_id)
+    slug = Column(String(64), unique=True, nullable=False)
+    name = Column(String, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+
+class TenantScoped:
+    """
+    Mixin for tables partitioned by school. Reads are filtered to the current
+    tenant automatically (see app.services.tenancy); inserts default to it.
+    """
+
+    @declared_attr
+    def tenant_id(cls):
+        return Column(UUIDString, ForeignKey('tenants.id'), nullable=False, default=current_tenant_id)
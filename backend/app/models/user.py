@@ -2,9 +2,10 @@ from sqlalchemy import Column, String, Enum, DateTime, Boolean, ForeignKey, Tabl
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
-from app.models.base import Base
+from app.models.base import Base, UUIDString, new_id
+from app.models.tenant import TenantScoped
+from app.services.avatars import avatar_urls, small_avatar_url
 from typing import Optional, List
-import uuid
 
 class UserRole(str, enum.Enum):
     STUDENT = "student"
@@ -16,33 +17,35 @@ class UserRole(str, enum.Enum):
 guardian_student = Table(
     'guardian_student',
     Base.metadata,
-    Column('guardian_id', String, ForeignKey('users.id')),
-    Column('student_id', String, ForeignKey('users.id'))
+    Column('guardian_id', UUIDString, ForeignKey('users.id')),
+    Column('student_id', UUIDString, ForeignKey('users.id'))
 )
 
 # Association table for teacher-student relationship
 teacher_student = Table(
     'teacher_student',
     Base.metadata,
-    Column('teacher_id', String, ForeignKey('users.id')),
-    Column('student_id', String, ForeignKey('users.id'))
+    Column('teacher_id', UUIDString, ForeignKey('users.id')),
+    Column('student_id', UUIDString, ForeignKey('users.id'))
 )
 
-class User(Base):
+class User(TenantScoped, Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     firebase_uid = Column(String, unique=True, nullable=False)
     email = Column(String, unique=True, nullable=False)
     full_name = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False)
     is_active = Column(Boolean, default=True)
+    tokens_revoked_at = Column(DateTime)  # API tokens issued at or before this (to the millisecond) are rejected
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Profile fields
     phone_number = Column(String)
     profile_picture = Column(String)
+    avatar_key = Column(String)  # Content hash of the uploaded avatar; derivatives live under uploads/avatars
     
     # Role-specific fields
     grade_level = Column(String)  # For students
@@ -77,6 +80,15 @@ class User(Base):
         self.grade_level = kwargs.get('grade_level')
         self.subjects = kwargs.get('subjects')
         
+    @property
+    def avatar_urls(self) -> Optional[dict]:
+        return avatar_urls(self.avatar_key)
+    
+    @property
+    def small_avatar_url(self) -> Optional[str]:
+        """Smallest avatar derivative, falling back to the raw profile picture"""
+        return small_avatar_url(self.avatar_key) or self.profile_picture
+    
     @property
     def is_student(self) -> bool:
         return self.role == UserRole.STUDENT
@@ -120,6 +132,7 @@ class User(Base):
             "email": self.email,
             "full_name": self.full_name,
             "role": self.role.value,
+            "tenant_id": self.tenant_id,
             "is_active": self.is_active,
             "phone_number": self.phone_number,
             "profile_picture": self.profile_picture,
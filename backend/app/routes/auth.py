@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from sqlalchemy.orm import Session, selectinload
 from app.database import get_db_session
-from app.config.firebase import verify_firebase_token
 from app.models.user import User, UserRole
 from app.schemas.auth import (
-    UserCreate, UserResponse, UserLogin, UserUpdate,
+    UserCreate, UserResponse, UserLogin, UserUpdate, LoginResponse, RefreshRequest, TokenResponse,
     GuardianLinkRequest, StudentResponse, TeacherResponse,
-    GuardianResponse, ErrorResponse
+    GuardianResponse, ErrorResponse, RosterImportResponse, DirectoryPage
 )
 from app.dependencies import (
     get_current_user, get_admin_user, get_teacher_user,
     get_guardian_user, get_student_access,
     get_user_management_permission
 )
-from typing import List
+from app.services.access_tokens import (
+    AccessTokenError, issue_tokens, read_refresh_token, refresh_is_revoked, revoke_tokens
+)
+from app.services.directory import DirectoryCursorError, search_directory
+from app.services.roster import import_roster, RosterImportError
+from app.services.permissions import student_access_cache
+from app.services.invalidation import publish_invalidation
+from app.services.tenancy import resolve_tenant
+from app.services.token_verification import TokenVerificationTimeout, verify_id_token
+from app.services.avatars import large_avatar_url
+from app.services.images import create_avatar_derivatives, ImageProcessingError
+from app.config.settings import settings
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,7 +38,7 @@ async def register_user(
     """Register a new user"""
     try:
         # Verify Firebase token
-        decoded_token = verify_firebase_token(user_data.firebase_token)
+        decoded_token = await verify_id_token(user_data.firebase_token)
         firebase_uid = decoded_token['uid']
         email = decoded_token['email']
         
@@ -39,6 +50,13 @@ async def register_user(
                 detail="User already registered"
             )
         
+        tenant = resolve_tenant(db, user_data.tenant)
+        if not tenant:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown school"
+            )
+        
         # Create new user
         user = User(
             firebase_uid=firebase_uid,
@@ -50,6 +68,7 @@ async def register_user(
             grade_level=user_data.grade_level,
             subjects=user_data.subjects
         )
+        user.tenant_id = tenant.id
         
         db.add(user)
         db.commit()
@@ -58,6 +77,11 @@ async def register_user(
         logger.info(f"New user registered: {user.email} with role {user.role}")
         return user
         
+    except TokenVerificationTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry"
+        )
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         db.rollback()
@@ -66,15 +90,15 @@ async def register_user(
             detail=str(e)
         )
 
-@router.post("/login", response_model=UserResponse, responses={401: {"model": ErrorResponse}})
+@router.post("/login", response_model=LoginResponse, responses={401: {"model": ErrorResponse}})
 async def login(
     login_data: UserLogin,
     db: Session = Depends(get_db_session)
 ):
-    """Login user"""
+    """Login user and exchange the Firebase ID token for API tokens"""
     try:
         # Verify Firebase token
-        decoded_token = verify_firebase_token(login_data.firebase_token)
+        decoded_token = await verify_id_token(login_data.firebase_token)
         
         # Get user from database
         user = db.query(User).filter(User.firebase_uid == decoded_token['uid']).first()
@@ -91,8 +115,13 @@ async def login(
             )
         
         logger.info(f"User logged in: {user.email}")
-        return user
+        return {**UserResponse.model_validate(user).model_dump(), **issue_tokens(user)}
         
+    except TokenVerificationTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry"
+        )
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(
@@ -100,6 +129,46 @@ async def login(
             detail="Invalid authentication credentials"
         )
 
+@router.post("/refresh", response_model=TokenResponse, responses={401: {"model": ErrorResponse}})
+async def refresh_tokens(
+    refresh_data: RefreshRequest,
+    db: Session = Depends(get_db_session)
+):
+    """Issue a new access token (and refresh token) without going back to Firebase"""
+    try:
+        claims = read_refresh_token(refresh_data.refresh_token)
+    except AccessTokenError as e:
+        logger.warning(f"Refresh rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
+    # One lookup per refresh keeps disabled accounts and revocations authoritative
+    user = db.query(User).filter(User.id == claims["sub"]).first()
+    if not user or not user.is_active or refresh_is_revoked(user, claims):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    return issue_tokens(user)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Revoke every API token issued to the current user, on every device"""
+    try:
+        revoke_tokens(db, current_user)
+    except Exception as e:
+        logger.error(f"Logout error: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
@@ -128,8 +197,48 @@ async def update_current_user(
             detail=str(e)
         )
 
+@router.put("/me/avatar", response_model=UserResponse, responses={400: {"model": ErrorResponse}})
+async def upload_avatar(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Upload a profile picture; resized derivatives are generated before responding"""
+    if file.content_type not in settings.avatar_allowed_types_list:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Invalid image type"
+        )
+    
+    data = await file.read(settings.AVATAR_MAX_SIZE + 1)
+    if len(data) > settings.AVATAR_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Image exceeds maximum avatar size"
+        )
+    
+    try:
+        key = await create_avatar_derivatives(data)
+        current_user.avatar_key = key
+        current_user.profile_picture = large_avatar_url(key)
+        db.commit()
+        db.refresh(current_user)
+        return current_user
+    except ImageProcessingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Avatar upload error: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/students", response_model=List[StudentResponse])
-async def get_accessible_students(
+def get_accessible_students(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db_session)
 ):
@@ -174,9 +283,46 @@ async def link_guardian_to_student(
     
     guardian.students_as_guardian.append(student)
     db.commit()
+    publish_invalidation(student_access_cache.name, [guardian.id])
     
     return {"message": "Guardian linked to student successfully"}
 
+@router.post(
+    "/roster/import",
+    response_model=RosterImportResponse,
+    responses={400: {"model": ErrorResponse}, 415: {"model": ErrorResponse}}
+)
+async def import_roster_links(
+    request: Request,
+    _: bool = Depends(get_user_management_permission),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Bulk link guardians and teachers to students.
+    The body is streamed as CSV (text/csv, header: link_type,user,student) or
+    NDJSON (application/x-ndjson). Users may be referenced by id or email.
+    Re-running the same import is safe; existing links are reported, not duplicated.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        fmt = "csv"
+    elif media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        fmt = "ndjson"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Roster must be uploaded as text/csv or application/x-ndjson"
+        )
+    
+    try:
+        return await import_roster(db, request.stream(), fmt)
+    except RosterImportError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/teachers", response_model=List[TeacherResponse])
 async def get_teachers(
     current_user: User = Depends(get_current_user),
@@ -192,9 +338,45 @@ async def get_guardians(
     db: Session = Depends(get_db_session)
 ):
     """Get list of guardians (admin only)"""
-    guardians = db.query(User).filter(User.role == UserRole.GUARDIAN).all()
+    guardians = (
+        db.query(User)
+        .options(selectinload(User.students_as_guardian))
+        .filter(User.role == UserRole.GUARDIAN)
+        .all()
+    )
     return guardians
 
+@router.get("/directory", response_model=DirectoryPage, responses={400: {"model": ErrorResponse}})
+def search_users(
+    role: Optional[UserRole] = None,
+    q: Optional[str] = Query(None, min_length=2, max_length=100),
+    prefix: bool = False,
+    cursor: Optional[str] = Query(None, max_length=512),
+    limit: int = Query(settings.DIRECTORY_PAGE_SIZE, ge=1, le=settings.DIRECTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Page through the school's users by name, optionally filtered by role and
+    a search on name or email (substring, or prefix with `prefix=true`).
+    Admins see every role; everyone else can look up teachers.
+    """
+    if not current_user.is_admin:
+        if role not in (None, UserRole.TEACHER):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to browse these users"
+            )
+        role = UserRole.TEACHER
+    
+    try:
+        return search_directory(db, role, q, prefix, cursor, limit)
+    except DirectoryCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/student/{student_id}", response_model=StudentResponse)
 async def get_student_info(
     student_id: str,
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.bootstrap import BootstrapResponse
+from app.services.bootstrap import load_bootstrap
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["Bootstrap"])
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+async def bootstrap(current_user: User = Depends(get_current_user)):
+    """Current user, accessible students and the first catalogue page in one response"""
+    try:
+        return await load_bootstrap(current_user)
+    except Exception as e:
+        logger.error(f"Error loading bootstrap data: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error loading bootstrap data"
+        )
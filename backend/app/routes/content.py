@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, File, UploadFile
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from app.database import get_db_session
 from app.dependencies import (
@@ -8,7 +11,15 @@ from app.dependencies import (
     get_student_access
 )
 from app.models.user import User
-from app.models.content import ContentType, ContentCategory, EducationalContent
+from app.models.recommendation import ContentRecommendation
+from app.models.content import (
+    ContentType,
+    ContentCategory,
+    EducationalContent,
+    ContentAccess,
+    ContentComment,
+    TranscodeStatus
+)
 from app.schemas.content import (
     ContentCategoryCreate, 
     ContentCategoryResponse,
@@ -16,13 +27,40 @@ from app.schemas.content import (
     EducationalContentResponse,
     ContentFilterParams,
     ContentProgressUpdateRequest,
-    ContentAccessResponse
+    ContentAccessResponse,
+    RelatedContentResponse,
+    InProgressContentResponse,
+    ContentBatchGetRequest,
+    ContentBatchGetResponse,
+    ContentCommentCreate,
+    ContentCommentResponse,
+    DirectUploadRequest,
+    DirectUploadResponse,
+    DirectUploadFinalizeRequest
 )
 from app.config.settings import settings
+from app.services.transcoding import submit_video_packaging, remove_hls_artifacts
+from app.services.compression import submit_precompression, remove_precompressed
+from app.services.documents import is_pdf_document, submit_document_processing, remove_document_artifacts
+from app.services.storage import LocalStorage, StorageError, new_upload_key, storage
+from app.services.bundles import load_bundle_manifest, parse_range
+from app.services.direct_uploads import issue_direct_upload, read_direct_upload
+from app.services.catalogue import load_published_catalogue, query_catalogue, invalidate_catalogue
+from app.services.rollups import apply_progress_change, remove_content_from_rollups
+from app.services.resume import load_in_progress
+from app.services.events import (
+    CONTENT_DELETED,
+    CONTENT_PUBLISHED,
+    comment_event,
+    content_event,
+    publish_event
+)
+from datetime import datetime
+from urllib.parse import quote
 import logging
 import os
-import uuid
 import mimetypes
+import zlib
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +78,7 @@ async def create_content_category(
         db.add(db_category)
         db.commit()
         db.refresh(db_category)
+        invalidate_catalogue()
         return db_category
     except Exception as e:
         logger.error(f"Error creating content category: {str(e)}")
@@ -49,6 +88,109 @@ async def create_content_category(
             detail=str(e)
         )
 
+def _store_content(
+    db: Session,
+    current_user: User,
+    file_path: str,
+    file_size: int,
+    mime_type: str,
+    content_type: ContentType,
+    title: str,
+    description: Optional[str],
+    category_id: str,
+    is_published: bool,
+    crc32: Optional[int] = None
+) -> EducationalContent:
+    """Create the record for a stored file and start its background processing"""
+    # Videos are probed (duration) and packaged into HLS after the record is stored
+    transcode_status = TranscodeStatus.PENDING if content_type == ContentType.VIDEO else None
+    
+    content = EducationalContent(
+        title=title,
+        description=description,
+        content_type=content_type,
+        file_path=file_path,
+        file_size=file_size,
+        mime_type=mime_type,
+        duration=None,
+        crc32=crc32,
+        category_id=category_id,
+        uploaded_by=current_user.id,
+        is_published=is_published,
+        transcode_status=transcode_status
+    )
+    
+    db.add(content)
+    db.commit()
+    db.refresh(content)
+    invalidate_catalogue()
+    if content.is_published:
+        publish_event(content_event(CONTENT_PUBLISHED, content))
+    
+    if transcode_status == TranscodeStatus.PENDING:
+        submit_video_packaging(content.id)
+    elif is_pdf_document(content_type, mime_type):
+        # Served as is, not precompressed: an encoded response cannot be read by byte range
+        submit_document_processing(content.id)
+    else:
+        submit_precompression(content.file_path, content.mime_type)
+    
+    return content
+
+@router.get("/categories/{category_id}/bundle")
+async def download_category_bundle(
+    category_id: str,
+    request: Request,
+    _: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Every published file of a category as one ZIP, streamed from storage.
+    Content-Length is exact and byte ranges are honoured, so downloads resume.
+    """
+    manifest = await run_in_threadpool(load_bundle_manifest, db, category_id)
+    if manifest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+    
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": manifest.etag,
+        # Category names may be non-ASCII; filename* carries the real name (RFC 6266)
+        "Content-Disposition": (
+            f'attachment; filename="{manifest.filename.encode("ascii", "replace").decode()}"; '
+            f"filename*=UTF-8''{quote(manifest.filename)}"
+        ),
+    }
+    
+    # A resumed download only continues the same archive
+    if_range = request.headers.get("if-range")
+    range_header = request.headers.get("range") if not if_range or if_range == manifest.etag else None
+    try:
+        byte_range = parse_range(range_header, manifest.size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{manifest.size}"}
+        )
+    
+    status_code = status.HTTP_200_OK
+    start, end = 0, manifest.size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{manifest.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        manifest.iter_range(start, end),
+        status_code=status_code,
+        media_type="application/zip",
+        headers=headers
+    )
+
 @router.post("/upload", response_model=EducationalContentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_content(
     file: UploadFile = File(...),
@@ -60,7 +202,7 @@ async def upload_content(
     current_user: User = Depends(get_teacher_user),
     db: Session = Depends(get_db_session)
 ):
-    """Upload educational content"""
+    """Upload educational content through the API (see /uploads/presign for direct uploads)"""
     try:
         # Validate file type
         if file.content_type not in settings.allowed_file_types_list:
@@ -69,62 +211,44 @@ async def upload_content(
                 detail="Invalid file type"
             )
         
-        # Check file size
         file_size = 0
-        file_path = None
+        crc32 = 0
+        file_path = new_upload_key(file.filename)
+        staging_path = storage.new_staging_path()
         try:
-            # Create uploads directory if not exists
-            os.makedirs("uploads", exist_ok=True)
-            
-            # Generate unique filename
-            file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-            unique_filename = f"{uuid.uuid4()}.{file_extension}"
-            file_path = os.path.join("uploads", unique_filename)
-            
-            # Save file
-            with open(file_path, "wb") as buffer:
+            # Stage the file, then hand it to the storage backend
+            with open(staging_path, "wb") as buffer:
                 while chunk := await file.read(1024 * 1024):  # Read in 1MB chunks
-                    buffer.write(chunk)
                     file_size += len(chunk)
+                    # Check file size against max upload size
+                    if file_size > settings.MAX_UPLOAD_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="File size exceeds maximum limit"
+                        )
+                    buffer.write(chunk)
+                    crc32 = zlib.crc32(chunk, crc32)
             
-            # Check file size against max upload size
-            if file_size > settings.MAX_UPLOAD_SIZE:
-                os.remove(file_path)
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="File size exceeds maximum limit"
-                )
+            await run_in_threadpool(storage.store_file, file_path, staging_path, file.content_type)
         except Exception as file_error:
             logger.error(f"File upload error: {str(file_error)}")
-            if file_path and os.path.exists(file_path):
-                os.remove(file_path)
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
             raise
         
-        # Determine duration for video content
-        duration = None
-        if content_type == ContentType.VIDEO:
-            # TODO: Implement video duration extraction using ffprobe or similar
-            pass
-        
-        # Create content record
-        content = EducationalContent(
-            title=title,
-            description=description,
-            content_type=content_type,
+        return _store_content(
+            db,
+            current_user,
             file_path=file_path,
             file_size=file_size,
             mime_type=file.content_type,
-            duration=duration,
+            content_type=content_type,
+            title=title,
+            description=description,
             category_id=category_id,
-            uploaded_by=current_user.id,
-            is_published=is_published
+            is_published=is_published,
+            crc32=crc32
         )
-        
-        db.add(content)
-        db.commit()
-        db.refresh(content)
-        
-        return content
     
     except Exception as e:
         logger.error(f"Content upload error: {str(e)}")
@@ -134,36 +258,178 @@ async def upload_content(
             detail=str(e)
         )
 
-@router.get("/", response_model=List[EducationalContentResponse])
-async def list_content(
-    filters: ContentFilterParams = Depends(),
-    current_user: User = Depends(get_current_user),
+@router.post("/uploads/presign", response_model=DirectUploadResponse)
+async def presign_upload(
+    upload_request: DirectUploadRequest,
+    current_user: User = Depends(get_teacher_user),
     db: Session = Depends(get_db_session)
 ):
-    """List educational content with optional filtering"""
-    query = db.query(EducationalContent)
+    """
+    Start a direct upload: the client sends the file to the returned URL
+    (with the returned form fields or headers), then calls /uploads/finalize.
+    """
+    if not db.get(ContentCategory, upload_request.category_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category not found"
+        )
     
-    # Apply filters
-    if filters.content_type:
-        query = query.filter(EducationalContent.content_type == filters.content_type)
+    try:
+        return issue_direct_upload(current_user, upload_request)
+    except Exception as e:
+        logger.error(f"Upload presign error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Storage is unavailable"
+        )
+
+@router.put("/uploads/direct/{token}", status_code=status.HTTP_204_NO_CONTENT)
+async def receive_direct_upload(token: str, request: Request):
+    """Presigned upload target of the local storage backend; the token is the credential"""
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Direct uploads go to the storage service"
+        )
     
-    if filters.category_id:
-        query = query.filter(EducationalContent.category_id == filters.category_id)
+    try:
+        upload = storage.read_upload_token(token)
+    except StorageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
     
-    if filters.is_published is not None:
-        query = query.filter(EducationalContent.is_published == filters.is_published)
+    if request.headers.get("content-type") != upload["content_type"]:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type does not match the presigned upload"
+        )
+    
+    file_size = 0
+    staging_path = storage.new_staging_path()
+    try:
+        with open(staging_path, "wb") as buffer:
+            async for chunk in request.stream():
+                file_size += len(chunk)
+                if file_size > upload["max_size"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="File size exceeds maximum limit"
+                    )
+                buffer.write(chunk)
+        
+        if not file_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty upload"
+            )
+        await run_in_threadpool(storage.store_file, upload["key"], staging_path, upload["content_type"])
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+@router.post("/uploads/finalize", response_model=EducationalContentResponse, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    finalize_request: DirectUploadFinalizeRequest,
+    current_user: User = Depends(get_teacher_user),
+    db: Session = Depends(get_db_session)
+):
+    """Record a file uploaded with /uploads/presign once it is in storage"""
+    try:
+        upload = read_direct_upload(finalize_request.upload_token, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    if filters.min_view_count is not None:
-        query = query.filter(EducationalContent.view_count >= filters.min_view_count)
+    # Retried finalize calls return the record created the first time
+    existing = db.query(EducationalContent).filter(EducationalContent.file_path == upload["key"]).first()
+    if existing:
+        return existing
     
-    if filters.uploaded_by:
-        query = query.filter(EducationalContent.uploaded_by == filters.uploaded_by)
+    file_size = await run_in_threadpool(storage.size, upload["key"])
+    if file_size is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="File has not been uploaded yet"
+        )
+    if file_size > settings.MAX_UPLOAD_SIZE:
+        await run_in_threadpool(storage.delete, upload["key"])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File size exceeds maximum limit"
+        )
     
-    # Ensure non-admin users only see published content
+    try:
+        return _store_content(
+            db,
+            current_user,
+            file_path=upload["key"],
+            file_size=file_size,
+            mime_type=upload["mime_type"],
+            content_type=ContentType(upload["content_type"]),
+            title=upload["title"],
+            description=upload["description"],
+            category_id=upload["category_id"],
+            is_published=upload["is_published"]
+        )
+    except Exception as e:
+        logger.error(f"Upload finalize error: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/", response_model=List[EducationalContentResponse])
+def list_content(
+    filters: ContentFilterParams = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """List educational content with optional filtering"""
     if not current_user.is_admin:
-        query = query.filter(EducationalContent.is_published == True)
+        return load_published_catalogue(db, filters)
+    
+    return query_catalogue(db, filters, include_unpublished=True).all()
+
+@router.get("/continue", response_model=List[InProgressContentResponse])
+def continue_content(
+    limit: int = Query(10, ge=1, le=settings.CONTINUE_MAX_ITEMS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """The current user's most recently accessed unfinished content, newest first"""
+    return load_in_progress(db, current_user, limit)
+
+@router.post("/batch-get", response_model=ContentBatchGetResponse)
+async def batch_get_content(
+    request: ContentBatchGetRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Resolve several content ids in one query, authorizing each item"""
+    contents = {
+        content.id: content
+        for content in db.query(EducationalContent)
+        .options(joinedload(EducationalContent.category))
+        .filter(EducationalContent.id.in_(request.ids))
+    }
+    
+    items, not_found, forbidden = [], [], []
+    for content_id in request.ids:
+        content = contents.get(content_id)
+        if content is None:
+            not_found.append(content_id)
+        # Same rule as GET /content/{content_id}
+        elif not content.is_published and not (current_user.is_admin or content.uploaded_by == current_user.id):
+            forbidden.append(content_id)
+        else:
+            items.append(content)
     
-    return query.all()
+    return {"items": items, "not_found": not_found, "forbidden": forbidden}
 
 @router.get("/{content_id}", response_model=EducationalContentResponse)
 async def get_content(
@@ -189,6 +455,188 @@ async def get_content(
     
     return content
 
+@router.get("/{content_id}/file")
+async def get_content_file(
+    content_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Redirect to the stored file (a presigned URL with the S3 backend)"""
+    content = db.query(EducationalContent).filter(EducationalContent.id == content_id).first()
+    
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    
+    if not content.is_published and not (current_user.is_admin or content.uploaded_by == current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this content"
+        )
+    
+    return RedirectResponse(content.file_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+@router.get("/{content_id}/related", response_model=List[RelatedContentResponse])
+async def get_related_content(
+    content_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Content that students who studied this item also studied, from the precomputed neighbours"""
+    query = (
+        select(ContentRecommendation.score, ContentRecommendation.support, EducationalContent)
+        .join(EducationalContent, EducationalContent.id == ContentRecommendation.related_content_id)
+        .options(joinedload(EducationalContent.category))
+        .where(ContentRecommendation.content_id == content_id)
+        .order_by(ContentRecommendation.rank)
+        .limit(limit)
+    )
+    if not current_user.is_admin:
+        query = query.where(EducationalContent.is_published == True)
+    
+    return [
+        {"score": score, "support": support, "content": content}
+        for score, support, content in db.execute(query).all()
+    ]
+
+@router.put("/{content_id}/progress", response_model=ContentAccessResponse)
+async def update_content_progress(
+    content_id: str,
+    progress_data: ContentProgressUpdateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Record the current user's progress on a content item"""
+    content = db.query(EducationalContent).filter(EducationalContent.id == content_id).first()
+    
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    
+    if not content.is_published and not (current_user.is_admin or content.uploaded_by == current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this content"
+        )
+    
+    try:
+        # Serialize concurrent updates for the same user/content so rollup deltas are applied once
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"{current_user.id}:{content_id}"))))
+        
+        access = db.query(ContentAccess).filter(
+            ContentAccess.user_id == current_user.id,
+            ContentAccess.content_id == content_id
+        ).first()
+        previous = (access.progress, access.completed) if access else None
+        if not access:
+            access = ContentAccess(content_id=content_id, user_id=current_user.id)
+            db.add(access)
+        
+        access.progress = progress_data.progress
+        access.completed = bool(progress_data.completed) or progress_data.progress >= 100.0
+        access.last_accessed = datetime.utcnow()
+        
+        if current_user.is_student:
+            apply_progress_change(
+                db,
+                student_id=current_user.id,
+                content_id=content_id,
+                category_id=content.category_id,
+                previous=previous,
+                progress=access.progress,
+                completed=access.completed,
+                accessed_at=access.last_accessed
+            )
+        
+        db.commit()
+        db.refresh(access)
+        return access
+    
+    except Exception as e:
+        logger.error(f"Progress update error: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to update progress"
+        )
+
+@router.post("/comments", response_model=ContentCommentResponse, status_code=status.HTTP_201_CREATED)
+async def create_comment(
+    comment_data: ContentCommentCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Comment on content the user can view"""
+    content = db.query(EducationalContent).filter(EducationalContent.id == comment_data.content_id).first()
+    
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    
+    if not content.is_published and not (current_user.is_admin or content.uploaded_by == current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to comment on this content"
+        )
+    
+    try:
+        comment = ContentComment(
+            content_id=content.id,
+            user_id=current_user.id,
+            comment=comment_data.comment
+        )
+        db.add(comment)
+        db.commit()
+        db.refresh(comment)
+        publish_event(comment_event(comment, content))
+        return comment
+    except Exception as e:
+        logger.error(f"Comment creation error: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/{content_id}/comments", response_model=List[ContentCommentResponse])
+async def list_comments(
+    content_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Comments on a content item, newest first"""
+    content = db.query(EducationalContent).filter(EducationalContent.id == content_id).first()
+    
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    
+    if not content.is_published and not (current_user.is_admin or content.uploaded_by == current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this content"
+        )
+    
+    return (
+        db.query(ContentComment)
+        .filter(ContentComment.content_id == content_id)
+        .order_by(ContentComment.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
 @router.delete("/{content_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_content(
     content_id: str,
@@ -212,13 +660,19 @@ async def delete_content(
         )
     
     try:
-        # Remove physical file
-        if os.path.exists(content.file_path):
-            os.remove(content.file_path)
+        # Remove the stored file and everything derived from it
+        await run_in_threadpool(storage.delete, content.file_path)
+        await run_in_threadpool(remove_hls_artifacts, content.file_path)
+        await run_in_threadpool(remove_document_artifacts, content.file_path)
+        remove_precompressed(content.file_path)
         
         # Delete database record
+        deleted_event = content_event(CONTENT_DELETED, content)
+        remove_content_from_rollups(db, content.id)
         db.delete(content)
         db.commit()
+        invalidate_catalogue()
+        publish_event(deleted_event)
     except Exception as e:
         logger.error(f"Content deletion error: {str(e)}")
         db.rollback()
@@ -0,0 +1,111 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db_session
+from app.dependencies import get_current_user, get_teacher_user, get_student_access
+from app.models.user import User, UserRole
+from app.models.content import ContentCategory, EducationalContent
+from app.models.progress import (
+    StudentProgressRollup,
+    ContentProgressRollup,
+    StudentCategoryProgressRollup
+)
+from app.schemas.dashboard import (
+    StudentProgressSummary,
+    CategoryProgressSummary,
+    ContentProgressSummary
+)
+from app.services.permissions import accessible_student_ids
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/dashboard", tags=["Dashboards"])
+
+def _summary(rollup) -> dict:
+    """Counters from a rollup row (or an empty summary when the student hasn't started anything)"""
+    if rollup is None:
+        return {}
+    return {
+        "started": rollup.started,
+        "completed": rollup.completed,
+        "average_progress": round(rollup.progress_total / rollup.started, 2) if rollup.started else 0.0,
+        "last_accessed": rollup.last_accessed,
+    }
+
+@router.get("/students", response_model=List[StudentProgressSummary])
+async def get_student_progress(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """Progress summary for every student the current user can see (teachers, guardians, admins)"""
+    if current_user.is_student:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view student dashboards"
+        )
+    
+    query = (
+        select(User, StudentProgressRollup)
+        .outerjoin(StudentProgressRollup, StudentProgressRollup.student_id == User.id)
+        .where(User.role == UserRole.STUDENT)
+        .order_by(User.full_name, User.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    student_ids = accessible_student_ids(db, current_user)
+    if student_ids is not None:
+        if not student_ids:
+            return []
+        query = query.where(User.id.in_(student_ids))
+    
+    return [
+        StudentProgressSummary(
+            student_id=student.id,
+            full_name=student.full_name,
+            grade_level=student.grade_level,
+            **_summary(rollup)
+        )
+        for student, rollup in db.execute(query).all()
+    ]
+
+@router.get("/students/{student_id}/categories", response_model=List[CategoryProgressSummary])
+async def get_student_category_progress(
+    student_id: str,
+    _: bool = Depends(get_student_access),
+    db: Session = Depends(get_db_session)
+):
+    """Per-category progress for one student"""
+    rows = db.execute(
+        select(StudentCategoryProgressRollup, ContentCategory.name)
+        .join(ContentCategory, ContentCategory.id == StudentCategoryProgressRollup.category_id)
+        .where(StudentCategoryProgressRollup.student_id == student_id)
+        .order_by(ContentCategory.name)
+    ).all()
+    
+    return [
+        CategoryProgressSummary(
+            category_id=rollup.category_id,
+            category_name=name,
+            **_summary(rollup)
+        )
+        for rollup, name in rows
+    ]
+
+@router.get("/content/{content_id}", response_model=ContentProgressSummary)
+async def get_content_progress(
+    content_id: str,
+    _: User = Depends(get_teacher_user),
+    db: Session = Depends(get_db_session)
+):
+    """Progress across all students for one content item"""
+    # Rollups are not tenant-scoped; only report on the caller's school's content
+    if db.query(EducationalContent.id).filter(EducationalContent.id == content_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    rollup = db.get(ContentProgressRollup, content_id)
+    return ContentProgressSummary(content_id=content_id, **_summary(rollup))
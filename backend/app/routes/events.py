@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.config.settings import settings
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.services.events import hub, stream_events
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/events", tags=["Live Events"])
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    content_ids: Optional[str] = Query(None, description="Comma-separated content ids to follow for comments"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events for catalogue changes and new comments on followed content,
+    filtered by what the user may see. Reconnecting with Last-Event-ID replays what
+    was missed; a `reset` event means the client should refetch instead.
+    """
+    followed = [content_id.strip() for content_id in (content_ids or "").split(",") if content_id.strip()]
+    if len(followed) > settings.SSE_MAX_SUBSCRIBED_CONTENT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.SSE_MAX_SUBSCRIBED_CONTENT} content ids can be followed"
+        )
+    
+    subscriber, replay = hub.subscribe(current_user, followed, last_event_id)
+    return StreamingResponse(
+        stream_events(subscriber, replay, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stops nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.dependencies import get_admin_user
+from app.models.user import User
+from app.services.exports import (
+    EXPORT_FORMATS,
+    content_access_export,
+    content_comments_export,
+    stream_export
+)
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+def _export_response(statement, fmt: str, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        stream_export(statement, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/content-access")
+async def export_content_access(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on last_accessed"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on last_accessed"),
+    category_id: Optional[str] = None,
+    student_id: Optional[List[str]] = Query(None, description="Repeat to export several students"),
+    _: User = Depends(get_admin_user)
+):
+    """Stream content access/progress rows (admin only)"""
+    statement = content_access_export(start, end, category_id, student_id)
+    return _export_response(statement, format, "content-access")
+
+@router.get("/comments")
+async def export_comments(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    category_id: Optional[str] = None,
+    student_id: Optional[List[str]] = Query(None, description="Repeat to export several students"),
+    _: User = Depends(get_admin_user)
+):
+    """Stream content comments (admin only)"""
+    statement = content_comments_export(start, end, category_id, student_id)
+    return _export_response(statement, format, "comments")
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db_session
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.sync import SyncResponse
+from app.services.sync import SyncTokenError, SyncTokenExpired, load_changes
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+@router.get("", response_model=SyncResponse)
+async def sync_changes(
+    token: Optional[str] = Query(None, max_length=512),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Change feed for offline copies: categories, content and the caller's progress
+    created, updated or deleted since the sync token. Without a token it returns
+    everything visible; keep calling while has_more is true.
+    """
+    try:
+        return load_changes(db, current_user, token)
+    except SyncTokenExpired as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e)
+        )
+    except SyncTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, validator
+from typing import Dict, Optional, List
 from datetime import datetime
 from app.models.user import UserRole
 
@@ -30,11 +30,14 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     firebase_token: str
+    tenant: Optional[str] = None  # School slug; the default school when omitted
 
 class UserResponse(UserBase):
     id: str
     firebase_uid: str
+    tenant_id: str
     is_active: bool
+    avatar_urls: Optional[Dict[str, str]] = None
     created_at: datetime
     updated_at: datetime
     
@@ -67,39 +70,80 @@ class GuardianLinkRequest(BaseModel):
     student_id: str
     guardian_id: str
 
+class RosterImportRowError(BaseModel):
+    row: int
+    error: str
+
+class RosterImportResponse(BaseModel):
+    total_rows: int
+    linked: int
+    already_linked: int
+    duplicates: int
+    failed: int
+    errors: List[RosterImportRowError]
+
 class StudentResponse(BaseModel):
     id: str
     full_name: str
     email: EmailStr
     grade_level: str
-    profile_picture: Optional[str] = None
+    profile_picture: Optional[str] = Field(None, validation_alias="small_avatar_url")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 class TeacherResponse(BaseModel):
     id: str
     full_name: str
     email: EmailStr
     subjects: str
-    profile_picture: Optional[str] = None
+    profile_picture: Optional[str] = Field(None, validation_alias="small_avatar_url")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 class GuardianResponse(BaseModel):
     id: str
     full_name: str
     email: EmailStr
-    profile_picture: Optional[str] = None
-    students: List[StudentResponse]
+    profile_picture: Optional[str] = Field(None, validation_alias="small_avatar_url")
+    students: List[StudentResponse] = Field(validation_alias="students_as_guardian")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
+
+class DirectoryEntry(BaseModel):
+    id: str
+    full_name: str
+    email: EmailStr
+    role: UserRole
+    profile_picture: Optional[str] = None
+    grade_level: Optional[str] = None
+    subjects: Optional[str] = None
+    students: Optional[List[StudentResponse]] = None  # Guardians only
+
+class DirectoryPage(BaseModel):
+    items: List[DirectoryEntry]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page; None on the last page
 
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int  # Seconds until the access token expires
+    refresh_token: str
+
+class LoginResponse(UserResponse):
+    """The logged-in user plus API tokens to use instead of the Firebase ID token"""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    refresh_token: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class ErrorResponse(BaseModel):
     detail: str
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.auth import UserResponse, StudentResponse
+from app.schemas.content import EducationalContentResponse
+
+class BootstrapResponse(BaseModel):
+    user: UserResponse
+    students: List[StudentResponse]
+    catalogue: List[EducationalContentResponse]
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
-from app.models.content import ContentType
+from app.models.content import ContentType, TranscodeStatus
+from app.config.settings import settings
 
 class ContentCategoryBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=100)
@@ -41,6 +42,15 @@ class EducationalContentResponse(EducationalContentBase):
     uploaded_by: str
     view_count: int
     download_count: int
+    transcode_status: Optional[TranscodeStatus] = None
+    transcode_progress: Optional[float] = None
+    hls_manifest_path: Optional[str] = None
+    hls_renditions: Optional[str] = None
+    page_count: Optional[int] = None
+    preview_path: Optional[str] = None
+    file_url: Optional[str] = None
+    hls_manifest_url: Optional[str] = None
+    preview_url: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     category: Optional[ContentCategoryResponse]
@@ -48,6 +58,31 @@ class EducationalContentResponse(EducationalContentBase):
     class Config:
         from_attributes = True
 
+class RelatedContentResponse(BaseModel):
+    score: float
+    support: int
+    content: EducationalContentResponse
+
+class InProgressContentResponse(BaseModel):
+    content: EducationalContentResponse
+    progress: float
+    last_accessed: datetime
+
+class ContentBatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
+
+    @validator('ids')
+    def validate_ids(cls, v):
+        if len(v) > settings.CONTENT_BATCH_GET_MAX:
+            raise ValueError(f"At most {settings.CONTENT_BATCH_GET_MAX} ids per request")
+        # Keep the caller's order, drop repeats
+        return list(dict.fromkeys(v))
+
+class ContentBatchGetResponse(BaseModel):
+    items: List[EducationalContentResponse]
+    not_found: List[str]
+    forbidden: List[str]
+
 class ContentAccessBase(BaseModel):
     content_id: str
     progress: float = Field(default=0.0, ge=0.0, le=100.0)
@@ -90,12 +125,45 @@ class ContentUploadRequest(BaseModel):
     category_id: str
     is_published: bool = False
 
+class DirectUploadRequest(ContentUploadRequest):
+    filename: str = Field(..., min_length=1, max_length=255)
+    mime_type: str
+    file_size: int = Field(..., gt=0)
+
+    @validator('mime_type')
+    def validate_mime_type(cls, v):
+        if v not in settings.allowed_file_types_list:
+            raise ValueError("Invalid file type")
+        return v
+
+    @validator('file_size')
+    def validate_file_size(cls, v):
+        if v > settings.MAX_UPLOAD_SIZE:
+            raise ValueError("File size exceeds maximum limit")
+        return v
+
+class DirectUploadInstructions(BaseModel):
+    method: str
+    url: str
+    fields: Dict[str, str]
+    headers: Dict[str, str]
+
+class DirectUploadResponse(BaseModel):
+    upload_token: str
+    expires_at: datetime
+    upload: DirectUploadInstructions
+
+class DirectUploadFinalizeRequest(BaseModel):
+    upload_token: str
+
 class ContentFilterParams(BaseModel):
     content_type: Optional[ContentType] = None
     category_id: Optional[str] = None
     is_published: Optional[bool] = None
     min_view_count: Optional[int] = Field(None, ge=0)
     uploaded_by: Optional[str] = None
+    skip: int = Field(0, ge=0)
+    limit: Optional[int] = Field(None, ge=1, le=500)
 
 class ContentProgressUpdateRequest(BaseModel):
     progress: float = Field(..., ge=0.0, le=100.0)
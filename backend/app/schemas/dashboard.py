@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class ProgressSummary(BaseModel):
+    started: int = 0
+    completed: int = 0
+    average_progress: float = 0.0
+    last_accessed: Optional[datetime] = None
+
+class StudentProgressSummary(ProgressSummary):
+    student_id: str
+    full_name: str
+    grade_level: Optional[str] = None
+
+class CategoryProgressSummary(ProgressSummary):
+    category_id: str
+    category_name: str
+
+class ContentProgressSummary(ProgressSummary):
+    content_id: str
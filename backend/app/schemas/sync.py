@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from app.schemas.content import ContentCategoryResponse, EducationalContentResponse
+
+class SyncProgressItem(BaseModel):
+    id: str
+    content_id: str
+    progress: float
+    completed: bool
+    last_accessed: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class SyncDeletions(BaseModel):
+    categories: List[str]
+    contents: List[str]
+    progress: List[str]
+
+class SyncResponse(BaseModel):
+    sync_token: str
+    has_more: bool  # Call again right away with the new token
+    categories: List[ContentCategoryResponse]
+    contents: List[EducationalContentResponse]
+    progress: List[SyncProgressItem]
+    deleted: SyncDeletions
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Dict, Optional
+from app.config.settings import settings
+from app import database
+from app.models.user import User, UserRole
+from app.services.invalidation import InvalidationBus, bus
+import calendar
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+ACCESS_AUDIENCE = "api"
+REFRESH_AUDIENCE = "refresh"
+REVOCATION_EVENT = "token_revocation"
+
+class AccessTokenError(ValueError):
+    """Raised for an access or refresh token that cannot be used"""
+
+def _timestamp(moment: datetime) -> int:
+    return calendar.timegm(moment.utctimetuple())
+
+def _timestamp_ms(moment: datetime) -> int:
+    return _timestamp(moment) * 1000 + moment.microsecond // 1000
+
+def _issued_at_ms(claims: Dict[str, Any]) -> int:
+    # Tokens issued before iat_ms existed count from the start of their second
+    return claims.get("iat_ms", claims["iat"] * 1000)
+
+def is_local_token(token: str) -> bool:
+    """True for tokens signed by this API rather than by Firebase (RS256)"""
+    try:
+        return jwt.get_unverified_header(token).get("alg") == ALGORITHM
+    except JWTError:
+        return False
+
+def _encode(claims: Dict[str, Any], audience: str, ttl: int) -> str:
+    now = datetime.utcnow()
+    # iat is whole seconds; iat_ms tells a login apart from a logout in the same second
+    claims = {
+        **claims,
+        "aud": audience,
+        "iat": _timestamp(now),
+        "iat_ms": _timestamp_ms(now),
+        "exp": _timestamp(now + timedelta(seconds=ttl)),
+    }
+    return jwt.encode(claims, settings.JWT_SECRET, algorithm=ALGORITHM)
+
+def _decode(token: str, audience: str) -> Dict[str, Any]:
+    try:
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM], audience=audience)
+    except JWTError as e:
+        raise AccessTokenError(f"Invalid token: {str(e)}")
+
+def issue_tokens(user: User) -> Dict[str, Any]:
+    """
+    A short-lived access token carrying everything requests are authorized
+    with (user id, role, school) and a long-lived refresh token to renew it.
+    """
+    access_token = _encode(
+        {"sub": user.id, "role": user.role.value, "tid": user.tenant_id},
+        ACCESS_AUDIENCE, settings.ACCESS_TOKEN_TTL
+    )
+    refresh_token = _encode({"sub": user.id}, REFRESH_AUDIENCE, settings.REFRESH_TOKEN_TTL)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_TTL,
+        "refresh_token": refresh_token,
+    }
+
+def read_access_token(token: str) -> Dict[str, Any]:
+    claims = _decode(token, ACCESS_AUDIENCE)
+    if revocations.is_revoked(claims["sub"], _issued_at_ms(claims)):
+        raise AccessTokenError("Token has been revoked")
+    return claims
+
+def read_refresh_token(token: str) -> Dict[str, Any]:
+    return _decode(token, REFRESH_AUDIENCE)
+
+def refresh_is_revoked(user: User, claims: Dict[str, Any]) -> bool:
+    """Refresh tokens are checked against the database, which outlives the in-memory list"""
+    issued_at = _issued_at_ms(claims)
+    if user.tokens_revoked_at is not None and issued_at <= _timestamp_ms(user.tokens_revoked_at):
+        return True
+    return revocations.is_revoked(user.id, issued_at)
+
+def principal_from_claims(db: Session, claims: Dict[str, Any]) -> User:
+    """
+    The token's user attached to the session without a query. Only the
+    claimed columns are set; any other attribute loads on first access.
+    """
+    user = User.__mapper__.class_manager.new_instance()
+    set_committed_value(user, "id", claims["sub"])
+    set_committed_value(user, "role", UserRole(claims["role"]))
+    set_committed_value(user, "tenant_id", claims["tid"])
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+class RevocationList:
+    """
+    Per user, the millisecond at or before which issued tokens are revoked.
+    Kept in memory for the access-token check and fed to every worker over
+    the invalidation bus; entries are only needed while such tokens live.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, int] = {}
+
+    def start(self, event_bus: InvalidationBus) -> None:
+        event_bus.subscribe(self._on_bus_event)
+        # Revocations broadcast while this worker's listener was down are only in the database
+        event_bus.on_reconnect(self._reload)
+
+    def _reload(self) -> int:
+        with database.get_db_session() as db:
+            return self.load(db)
+
+    def _on_bus_event(self, event: Dict[str, Any]) -> None:
+        revocation = event.get(REVOCATION_EVENT)
+        if revocation:
+            self.add(revocation["user_id"], revocation["revoked_at_ms"])
+
+    def add(self, user_id: str, revoked_at: int) -> None:
+        self._revoked[user_id] = max(revoked_at, self._revoked.get(user_id, 0))
+        self._prune()
+
+    def _prune(self) -> None:
+        horizon = _timestamp_ms(datetime.utcnow()) - settings.ACCESS_TOKEN_TTL * 1000
+        if len(self._revoked) > 1000:
+            self._revoked = {user_id: at for user_id, at in self._revoked.items() if at >= horizon}
+
+    def is_revoked(self, user_id: str, issued_at: int) -> bool:
+        revoked_at = self._revoked.get(user_id)
+        return revoked_at is not None and issued_at <= revoked_at
+
+    def load(self, db: Session) -> int:
+        """Revocations recent enough to still matter for unexpired access tokens"""
+        since = datetime.utcnow() - timedelta(seconds=settings.ACCESS_TOKEN_TTL)
+        rows = db.query(User.id, User.tokens_revoked_at).filter(User.tokens_revoked_at >= since).all()
+        for user_id, revoked_at in rows:
+            self.add(user_id, _timestamp_ms(revoked_at))
+        return len(rows)
+
+revocations = RevocationList()
+
+def revoke_tokens(db: Session, user: User, at: Optional[datetime] = None) -> None:
+    """Revoke every token issued to the user so far, in every worker"""
+    # Stored with microseconds, so a login right after a logout keeps its tokens
+    revoked_at = at or datetime.utcnow()
+    user.tokens_revoked_at = revoked_at
+    db.commit()
+    bus.broadcast({REVOCATION_EVENT: {"user_id": user.id, "revoked_at_ms": _timestamp_ms(revoked_at)}})
+    logger.info(f"Revoked tokens of user {user.id}")
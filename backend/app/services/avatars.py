@@ -0,0 +1,27 @@
+from typing import Dict, Optional
+from app.config.settings import settings
+from app.services.storage import UPLOADS_ROOT, storage
+
+# Where avatar derivatives are stored and how they are addressed. Kept apart from
+# the image processing in images.py so models can build URLs without Pillow.
+AVATAR_PREFIX = f"{UPLOADS_ROOT}/avatars"
+AVATAR_FORMAT = "webp"
+
+def avatar_storage_key(key: str, size: int) -> str:
+    # Two-character fan-out keeps directories small
+    return f"{AVATAR_PREFIX}/{key[:2]}/{key}-{size}.{AVATAR_FORMAT}"
+
+def avatar_url(key: str, size: int) -> str:
+    return storage.url(avatar_storage_key(key, size))
+
+def avatar_urls(key: Optional[str]) -> Optional[Dict[str, str]]:
+    """URLs of every derivative, keyed by edge length"""
+    if not key:
+        return None
+    return {str(size): avatar_url(key, size) for size in settings.avatar_sizes_list}
+
+def small_avatar_url(key: Optional[str]) -> Optional[str]:
+    return avatar_url(key, settings.avatar_sizes_list[0]) if key else None
+
+def large_avatar_url(key: Optional[str]) -> Optional[str]:
+    return avatar_url(key, settings.avatar_sizes_list[-1]) if key else None
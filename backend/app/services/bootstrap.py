@@ -0,0 +1,37 @@
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List
+from app.config.settings import settings
+from app import database
+from app.models.user import User
+from app.schemas.auth import StudentResponse, UserResponse
+from app.schemas.content import ContentFilterParams
+from app.services.catalogue import load_published_catalogue, query_catalogue, serialize_catalogue
+from app.services.permissions import accessible_students
+import asyncio
+
+def _load_students(user: User) -> List[Dict[str, Any]]:
+    with database.get_db_session() as db:
+        return [StudentResponse.model_validate(student).model_dump() for student in accessible_students(db, user)]
+
+def _load_catalogue(user: User) -> List[Dict[str, Any]]:
+    """The first catalogue page, newest first; admins' page includes unpublished items"""
+    filters = ContentFilterParams(skip=0, limit=settings.BOOTSTRAP_CATALOGUE_PAGE_SIZE)
+    with database.get_db_session() as db:
+        if user.is_admin:
+            return serialize_catalogue(query_catalogue(db, filters, include_unpublished=True).all())
+        return load_published_catalogue(db, filters)
+
+async def load_bootstrap(user: User) -> Dict[str, Any]:
+    """
+    Everything the app needs on first load. The independent queries run
+    concurrently, each on its own pooled connection.
+    """
+    students, catalogue = await asyncio.gather(
+        run_in_threadpool(_load_students, user),
+        run_in_threadpool(_load_catalogue, user),
+    )
+    return {
+        "user": UserResponse.model_validate(user).model_dump(),
+        "students": students,
+        "catalogue": catalogue,
+    }
@@ -0,0 +1,261 @@
+from datetime import datetime
+from sqlalchemy import Row, and_, func
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from app.config.settings import settings
+from app.models.content import ContentCategory, EducationalContent
+from app.models.tenant import current_tenant
+from app.services.cache import get_cache
+from app.services.storage import storage
+import hashlib
+import logging
+import os
+import re
+import struct
+import zlib
+
+logger = logging.getLogger(__name__)
+
+ZIP_STORED = 0
+UTF8_NAMES = 0x0800
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_ENTRY_LIMIT = 0xFFFF
+ZIP64_EXTRA = 0x0001
+VERSION_DEFAULT = 20
+VERSION_ZIP64 = 45
+
+# Keyed by category version, so a cached manifest is never stale; the TTL only bounds memory
+bundle_cache = get_cache("bundle_manifests", ttl=3600, maxsize=settings.BUNDLE_MANIFEST_CACHE_SIZE)
+
+class BundleEntry:
+    """One stored file in a bundle"""
+
+    def __init__(self, name: str, key: str, size: int, crc32: int, modified: datetime):
+        self.name = name
+        self.key = key
+        self.size = size
+        self.crc32 = crc32
+        self.modified = modified
+
+class BundleManifest:
+    """
+    Byte layout of a category ZIP: literal header bytes and ranges of stored
+    files. Entries are stored, not deflated, and checksums are known up front,
+    so the size is exact before a byte is sent and any range can be served.
+    """
+
+    def __init__(self, filename: str, etag: str, entries: List[BundleEntry]):
+        self.filename = filename
+        self.etag = etag
+        self.entry_count = len(entries)
+        self.parts: List[Tuple[int, Union[bytes, BundleEntry]]] = []
+        self.size = self._layout(entries)
+
+    def _layout(self, entries: List[BundleEntry]) -> int:
+        offset = 0
+        central = []
+        for entry in entries:
+            header = _local_header(entry)
+            central.append(_central_header(entry, offset))
+            self.parts.append((offset, header))
+            offset += len(header)
+            self.parts.append((offset, entry))
+            offset += entry.size
+
+        directory = b"".join(central)
+        trailer = directory + _end_records(len(entries), len(directory), offset)
+        self.parts.append((offset, trailer))
+        return offset + len(trailer)
+
+    def iter_range(self, start: int, end: int) -> Iterator[bytes]:
+        """Stream bytes start..end (inclusive) of the archive"""
+        for part_start, part in self.parts:
+            part_size = part.size if isinstance(part, BundleEntry) else len(part)
+            part_end = part_start + part_size
+            if part_end <= start or part_start > end or not part_size:
+                continue
+            low = max(start, part_start) - part_start
+            high = min(end + 1, part_end) - part_start
+            if isinstance(part, BundleEntry):
+                yield from storage.read_chunks(part.key, low, high - low)
+            else:
+                yield part[low:high]
+
+def _dos_timestamp(moment: Optional[datetime]) -> Tuple[int, int]:
+    moment = max(moment or datetime(1980, 1, 1), datetime(1980, 1, 1))
+    date = ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day
+    time = (moment.hour << 11) | (moment.minute << 5) | (moment.second // 2)
+    return time, date
+
+def _local_header(entry: BundleEntry) -> bytes:
+    name = entry.name.encode("utf-8")
+    zip64 = entry.size >= ZIP64_LIMIT
+    extra = struct.pack("<HHQQ", ZIP64_EXTRA, 16, entry.size, entry.size) if zip64 else b""
+    size = ZIP64_LIMIT if zip64 else entry.size
+    time, date = _dos_timestamp(entry.modified)
+    return struct.pack(
+        "<IHHHHHIIIHH",
+        0x04034B50, VERSION_ZIP64 if zip64 else VERSION_DEFAULT, UTF8_NAMES, ZIP_STORED,
+        time, date, entry.crc32, size, size, len(name), len(extra)
+    ) + name + extra
+
+def _central_header(entry: BundleEntry, offset: int) -> bytes:
+    name = entry.name.encode("utf-8")
+    zip64_fields = []
+    size = entry.size
+    if size >= ZIP64_LIMIT:
+        size = ZIP64_LIMIT
+        zip64_fields += [entry.size, entry.size]
+    header_offset = offset
+    if offset >= ZIP64_LIMIT:
+        header_offset = ZIP64_LIMIT
+        zip64_fields.append(offset)
+    extra = b""
+    if zip64_fields:
+        extra = struct.pack(f"<HH{len(zip64_fields)}Q", ZIP64_EXTRA, 8 * len(zip64_fields), *zip64_fields)
+    version = VERSION_ZIP64 if zip64_fields else VERSION_DEFAULT
+    time, date = _dos_timestamp(entry.modified)
+    return struct.pack(
+        "<IHHHHHHIIIHHHHHII",
+        0x02014B50, version, version, UTF8_NAMES, ZIP_STORED, time, date,
+        entry.crc32, size, size, len(name), len(extra), 0, 0, 0, 0, header_offset
+    ) + name + extra
+
+def _end_records(count: int, directory_size: int, directory_offset: int) -> bytes:
+    records = b""
+    if count >= ZIP64_ENTRY_LIMIT or directory_size >= ZIP64_LIMIT or directory_offset >= ZIP64_LIMIT:
+        zip64_end_offset = directory_offset + directory_size
+        records += struct.pack(
+            "<IQHHIIQQQQ",
+            0x06064B50, 44, VERSION_ZIP64, VERSION_ZIP64, 0, 0,
+            count, count, directory_size, directory_offset
+        )
+        records += struct.pack("<IIQI", 0x07064B50, 0, zip64_end_offset, 1)
+        count = min(count, ZIP64_ENTRY_LIMIT)
+        directory_size = min(directory_size, ZIP64_LIMIT)
+        directory_offset = min(directory_offset, ZIP64_LIMIT)
+    records += struct.pack(
+        "<IHHHHIIH", 0x06054B50, 0, 0, count, count, directory_size, directory_offset, 0
+    )
+    return records
+
+def _safe_name(name: str) -> str:
+    """A portable file name: no path separators, control or reserved characters"""
+    name = re.sub(r'[\x00-\x1f<>:"/\\|?*]+', "_", name).strip(" .")
+    return name[:150] or "untitled"
+
+def _entry_names(category_name: str, contents: List[Row]) -> List[str]:
+    folder = _safe_name(category_name)
+    names, seen = [], set()
+    for content in contents:
+        _, extension = os.path.splitext(content.file_path)
+        stem = _safe_name(content.title)
+        name, counter = f"{folder}/{stem}{extension.lower()}", 2
+        while name.lower() in seen:
+            name = f"{folder}/{stem} ({counter}){extension.lower()}"
+            counter += 1
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+def checksum_file(key: str) -> Tuple[int, int]:
+    """CRC-32 and size of a stored file, read once from storage"""
+    crc, size = 0, 0
+    for chunk in storage.read_chunks(key):
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+    return crc, size
+
+def _fill_checksums(db: Session, contents: List[Row]) -> Dict[str, Tuple[int, int]]:
+    """
+    CRC-32 and size of every file, checksumming those stored before checksums
+    were recorded (or uploaded directly) and saving the result.
+    """
+    checksums = {}
+    for content in contents:
+        if content.crc32 is not None:
+            checksums[content.id] = (content.crc32, content.file_size)
+            continue
+        crc, size = checksum_file(content.file_path)
+        if size != content.file_size:
+            logger.warning(f"Stored size of {content.id} is {size}, recorded {content.file_size}")
+        # Keep updated_at: a checksum is not a change clients or the bundle version should see
+        db.query(EducationalContent).filter(EducationalContent.id == content.id).update(
+            {"crc32": crc, "file_size": size, "updated_at": EducationalContent.updated_at},
+            synchronize_session=False
+        )
+        checksums[content.id] = (crc, size)
+    db.commit()
+    return checksums
+
+def category_version(db: Session, category_id: str) -> Optional[tuple]:
+    """Changes whenever the category or any of its published content changes; None if missing"""
+    return db.query(
+        ContentCategory.name,
+        ContentCategory.updated_at,
+        func.count(EducationalContent.id),
+        func.max(EducationalContent.updated_at)
+    ).outerjoin(
+        EducationalContent,
+        and_(EducationalContent.category_id == ContentCategory.id, EducationalContent.is_published == True)
+    ).filter(ContentCategory.id == category_id).group_by(ContentCategory.id).first()
+
+def load_bundle_manifest(db: Session, category_id: str) -> Optional[BundleManifest]:
+    """Manifest of a category's published content, cached per category version"""
+    version = category_version(db, category_id)
+    if version is None:
+        return None
+    # Categories are shared between schools, their published content is not
+    key = (current_tenant.get(), category_id, tuple(version))
+    cached = bundle_cache.get(key)
+    if cached is not None:
+        return cached
+
+    contents = (
+        db.query(
+            EducationalContent.id,
+            EducationalContent.title,
+            EducationalContent.file_path,
+            EducationalContent.file_size,
+            EducationalContent.crc32,
+            EducationalContent.updated_at
+        )
+        .filter(EducationalContent.category_id == category_id, EducationalContent.is_published == True)
+        .order_by(EducationalContent.created_at, EducationalContent.id)
+        .all()
+    )
+    checksums = _fill_checksums(db, contents)
+
+    category_name = version[0]
+    entries = [
+        BundleEntry(name, content.file_path, checksums[content.id][1], checksums[content.id][0], content.updated_at)
+        for name, content in zip(_entry_names(category_name, contents), contents)
+    ]
+    etag = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+    manifest = BundleManifest(f"{_safe_name(category_name)}.zip", f'"{etag}"', entries)
+    bundle_cache.set(key, manifest)
+    logger.info(f"Built bundle manifest for category {category_id}: {len(entries)} files, {manifest.size} bytes")
+    return manifest
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The single byte range requested, as inclusive offsets; None for the whole
+    archive. Raises ValueError when the range cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if start >= size or end < start:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
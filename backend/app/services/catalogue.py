@@ -0,0 +1,75 @@
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, List, Optional
+from app.config.settings import settings
+from app.models.content import EducationalContent
+from app.models.tenant import current_tenant
+from app.schemas.content import ContentFilterParams, EducationalContentResponse
+from app.services.cache import get_cache
+from app.services.invalidation import publish_invalidation
+
+# Serialized catalogue pages for non-admin users, keyed by school and filter values
+catalogue_cache = get_cache("catalogue", ttl=settings.CATALOGUE_CACHE_TTL, maxsize=256)
+
+def catalogue_cache_key(filters: ContentFilterParams) -> tuple:
+    return (
+        current_tenant.get(),
+        filters.content_type,
+        filters.category_id,
+        filters.is_published,
+        filters.min_view_count,
+        filters.uploaded_by,
+        filters.skip,
+        filters.limit,
+    )
+
+def query_catalogue(db: Session, filters: ContentFilterParams, include_unpublished: bool = False):
+    """Build the catalogue query for the given filters: one page, newest first"""
+    query = db.query(EducationalContent).options(joinedload(EducationalContent.category))
+
+    # Apply filters
+    if filters.content_type:
+        query = query.filter(EducationalContent.content_type == filters.content_type)
+
+    if filters.category_id:
+        query = query.filter(EducationalContent.category_id == filters.category_id)
+
+    if filters.is_published is not None:
+        query = query.filter(EducationalContent.is_published == filters.is_published)
+
+    if filters.min_view_count is not None:
+        query = query.filter(EducationalContent.view_count >= filters.min_view_count)
+
+    if filters.uploaded_by:
+        query = query.filter(EducationalContent.uploaded_by == filters.uploaded_by)
+
+    # Ensure non-admin users only see published content
+    if not include_unpublished:
+        query = query.filter(EducationalContent.is_published == True)
+
+    # Ends in the (created_at, id) key of the catalogue indexes, so a page is an index range
+    query = query.order_by(EducationalContent.created_at.desc(), EducationalContent.id)
+    if filters.skip:
+        query = query.offset(filters.skip)
+    if filters.limit is not None:
+        query = query.limit(filters.limit)
+
+    return query
+
+def serialize_catalogue(contents) -> List[Dict[str, Any]]:
+    return [EducationalContentResponse.model_validate(content).model_dump() for content in contents]
+
+def load_published_catalogue(db: Session, filters: Optional[ContentFilterParams] = None) -> List[Dict[str, Any]]:
+    """Return the published catalogue for the filters, served from the cache when warm"""
+    filters = filters or ContentFilterParams()
+    key = catalogue_cache_key(filters)
+    cached = catalogue_cache.get(key)
+    if cached is not None:
+        return cached
+
+    page = serialize_catalogue(query_catalogue(db, filters).all())
+    catalogue_cache.set(key, page)
+    return page
+
+def invalidate_catalogue() -> None:
+    """Drop cached catalogue pages in every worker"""
+    publish_invalidation(catalogue_cache.name)
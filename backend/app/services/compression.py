@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from app.config.settings import settings
+from app.services.storage import storage
+import brotli
+import logging
+import os
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Preferred first when the client accepts both
+ENCODINGS = ("br", "gzip")
+SIBLING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+CHUNK_SIZE = 1024 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompress")
+
+class StreamCompressor:
+    """Incremental gzip or brotli encoder; compress() never holds more than one chunk"""
+
+    def __init__(self, encoding: str, precompress: bool = False):
+        self.encoding = encoding
+        if encoding == "br":
+            quality = 11 if precompress else settings.COMPRESSION_BROTLI_QUALITY
+            self._brotli = brotli.Compressor(quality=quality)
+        else:
+            level = 9 if precompress else settings.COMPRESSION_GZIP_LEVEL
+            # wbits 31: zlib deflate stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit whatever the encoder buffered so far without ending the stream"""
+        if self.encoding == "br":
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+def is_compressible(media_type: Optional[str]) -> bool:
+    """Whether a media type is in COMPRESSIBLE_TYPES (wildcards like text/* allowed)"""
+    if not media_type:
+        return False
+    media_type = media_type.split(";")[0].strip().lower()
+    for allowed in settings.compressible_types_list:
+        if allowed.endswith("/*") and media_type.startswith(allowed[:-1]):
+            return True
+        if media_type == allowed:
+            return True
+    return False
+
+def accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    """Supported encodings the client accepts, best first"""
+    qualities: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            qualities[name] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    accepted = [encoding for encoding in ENCODINGS if qualities.get(encoding, wildcard) > 0]
+    return sorted(accepted, key=lambda encoding: -qualities.get(encoding, wildcard))
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    accepted = accepted_encodings(accept_encoding)
+    return accepted[0] if accepted else None
+
+def sibling_path(file_path: str, encoding: str) -> str:
+    return file_path + SIBLING_SUFFIXES[encoding]
+
+def precompress_file(file_path: str, mime_type: str) -> Dict[str, int]:
+    """
+    Write .br and .gz siblings next to a stored file, chunk by chunk.
+    A sibling that would not be smaller than the original is not kept.
+    """
+    if not is_compressible(mime_type):
+        return {}
+
+    original_size = os.path.getsize(file_path)
+    sizes = {}
+    for encoding in ENCODINGS:
+        target = sibling_path(file_path, encoding)
+        tmp_path = f"{target}.partial"
+        compressor = StreamCompressor(encoding, precompress=True)
+        with open(file_path, "rb") as source, open(tmp_path, "wb") as output:
+            while chunk := source.read(CHUNK_SIZE):
+                output.write(compressor.compress(chunk))
+            output.write(compressor.finish())
+
+        size = os.path.getsize(tmp_path)
+        if size >= original_size:
+            os.remove(tmp_path)
+            continue
+        os.replace(tmp_path, target)
+        sizes[encoding] = size
+
+    logger.info(f"Precompressed {file_path} ({original_size} bytes): {sizes}")
+    return sizes
+
+def _precompress_safely(file_path: str, mime_type: str) -> None:
+    try:
+        precompress_file(file_path, mime_type)
+    except Exception as e:
+        # The original is still served uncompressed
+        logger.error(f"Precompression failed for {file_path}: {str(e)}")
+        remove_precompressed(file_path)
+
+def submit_precompression(key: str, mime_type: str) -> None:
+    """
+    Precompress an uploaded file in the background. Only locally stored files
+    have siblings; CompressionMiddleware is what negotiates them.
+    """
+    file_path = storage.local_path(key)
+    if file_path and is_compressible(mime_type):
+        _executor.submit(_precompress_safely, file_path, mime_type)
+
+def remove_precompressed(key: Optional[str]) -> None:
+    """Remove the compressed siblings of a stored file"""
+    file_path = storage.local_path(key) if key else None
+    if not file_path:
+        return
+    for encoding in ENCODINGS:
+        for path in (sibling_path(file_path, encoding), f"{sibling_path(file_path, encoding)}.partial"):
+            if os.path.exists(path):
+                os.remove(path)
+
+def shutdown_precompression() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from jose import JWTError, jwt
+from typing import Any, Dict
+from app.config.settings import settings
+from app.models.user import User
+from app.schemas.content import DirectUploadRequest
+from app.services.storage import new_upload_key, storage
+
+FINALIZE_AUDIENCE = "content-finalize"
+
+def issue_direct_upload(user: User, request: DirectUploadRequest) -> Dict[str, Any]:
+    """
+    Presign a direct-to-storage upload and sign everything the finalize call
+    needs into an upload token, so nothing is stored until the file arrives.
+    """
+    key = new_upload_key(request.filename)
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRY)
+    upload = storage.presigned_upload(key, request.mime_type, settings.MAX_UPLOAD_SIZE)
+    token = jwt.encode(
+        {
+            "aud": FINALIZE_AUDIENCE,
+            "sub": user.id,
+            # An upload may still be in flight when its URL expires
+            "exp": expires_at + timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRY),
+            "key": key,
+            "mime_type": request.mime_type,
+            "title": request.title,
+            "description": request.description,
+            "content_type": request.content_type.value,
+            "category_id": request.category_id,
+            "is_published": request.is_published,
+        },
+        settings.JWT_SECRET,
+        algorithm="HS256"
+    )
+    return {"upload_token": token, "expires_at": expires_at, "upload": upload}
+
+def read_direct_upload(token: str, user: User) -> Dict[str, Any]:
+    """Claims of an upload token; raises ValueError unless it is valid and belongs to the user"""
+    try:
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"], audience=FINALIZE_AUDIENCE)
+    except JWTError as e:
+        raise ValueError(f"Invalid upload token: {str(e)}")
+    if claims.get("sub") != user.id:
+        raise ValueError("Upload token was issued to another user")
+    return claims
@@ -0,0 +1,74 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, Dict, Optional, Tuple
+from app.models.user import User, UserRole
+import base64
+import json
+
+# A cursor is the (full_name, id) of the last user on the previous page
+Cursor = Tuple[str, str]
+
+class DirectoryCursorError(ValueError):
+    """Raised for a directory cursor that cannot be used"""
+
+def encode_cursor(user: User) -> str:
+    raw = json.dumps([user.full_name, user.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        full_name, user_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise DirectoryCursorError("Malformed directory cursor")
+    if not isinstance(full_name, str) or not isinstance(user_id, str):
+        raise DirectoryCursorError("Malformed directory cursor")
+    return full_name, user_id
+
+def _like_pattern(term: str, prefix: bool) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix else f"%{escaped}%"
+
+def search_directory(
+    db: Session,
+    role: Optional[UserRole],
+    search: Optional[str],
+    prefix: bool,
+    cursor: Optional[str],
+    limit: int
+) -> Dict[str, Any]:
+    """
+    One page of users ordered by name. Searches match full_name or email
+    case-insensitively and are answered by the trigram indexes; browsing
+    without a search walks idx_users_tenant_role. Guardians come with their
+    students, loaded for the whole page in one query.
+    """
+    query = db.query(User)
+    if role is not None:
+        query = query.filter(User.role == role)
+    if role in (None, UserRole.GUARDIAN):
+        query = query.options(selectinload(User.students_as_guardian))
+    if search:
+        pattern = _like_pattern(search, prefix)
+        query = query.filter(or_(User.full_name.ilike(pattern, escape="\\"), User.email.ilike(pattern, escape="\\")))
+    if cursor:
+        full_name, user_id = decode_cursor(cursor)
+        query = query.filter(or_(User.full_name > full_name, and_(User.full_name == full_name, User.id > user_id)))
+
+    users = query.order_by(User.full_name, User.id).limit(limit + 1).all()
+    page = users[:limit]
+    return {
+        "items": [_entry(user) for user in page],
+        "next_cursor": encode_cursor(page[-1]) if len(users) > limit else None,
+    }
+
+def _entry(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "full_name": user.full_name,
+        "email": user.email,
+        "role": user.role,
+        "profile_picture": user.small_avatar_url,
+        "grade_level": user.grade_level if user.is_student else None,
+        "subjects": user.subjects if user.is_teacher else None,
+        "students": user.students_as_guardian if user.is_guardian else None,
+    }
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.config.settings import settings
+from app.database import get_db_session
+from app.models.content import ContentType, EducationalContent
+from app.models.tenant import current_tenant
+from app.services.catalogue import invalidate_catalogue
+from app.services.storage import storage
+from app.services.tenancy import set_current_tenant
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import zlib
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME_TYPE = "application/pdf"
+PREVIEW_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 1024 * 1024
+
+# qpdf exit status 3: the output was written, with warnings about the input
+QPDF_WARNINGS = 3
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="documents")
+
+def is_pdf_document(content_type: ContentType, mime_type: str) -> bool:
+    return content_type == ContentType.DOCUMENT and mime_type == PDF_MIME_TYPE
+
+def preview_key(file_path: str) -> str:
+    """Storage key of the first-page preview, next to the original blob"""
+    root, _ = os.path.splitext(file_path)
+    return f"{root}_preview.jpg"
+
+def _run(command) -> subprocess.CompletedProcess:
+    return subprocess.run(command, capture_output=True, text=True, timeout=settings.PDF_PROCESS_TIMEOUT)
+
+def linearize_pdf(source: str, output: str) -> None:
+    """
+    Rewrite a PDF for fast web view: the first page's objects and a hint
+    table come first, so a viewer can show page one after a few ranges and
+    fetch later pages on demand.
+    """
+    result = _run([settings.QPDF_PATH, "--linearize", source, output])
+    if result.returncode not in (0, QPDF_WARNINGS) or not os.path.isfile(output):
+        raise RuntimeError(f"qpdf failed: {result.stderr.strip()[-500:]}")
+
+def count_pages(source: str) -> int:
+    result = _run([settings.QPDF_PATH, "--show-npages", source])
+    if result.returncode not in (0, QPDF_WARNINGS):
+        raise RuntimeError(f"qpdf failed: {result.stderr.strip()[-500:]}")
+    return int(result.stdout.strip())
+
+def render_first_page(source: str, output_prefix: str) -> str:
+    """Render page one as a JPEG PDF_PREVIEW_WIDTH pixels wide; returns its path"""
+    result = _run([
+        settings.PDFTOPPM_PATH,
+        "-f", "1", "-l", "1", "-singlefile",
+        "-jpeg", "-jpegopt", "quality=80",
+        "-scale-to-x", str(settings.PDF_PREVIEW_WIDTH), "-scale-to-y", "-1",
+        source, output_prefix
+    ])
+    output = f"{output_prefix}.jpg"
+    if result.returncode != 0 or not os.path.isfile(output):
+        raise RuntimeError(f"pdftoppm failed: {result.stderr.strip()[-500:]}")
+    return output
+
+def _checksum(path: str) -> int:
+    crc = 0
+    with open(path, "rb") as source:
+        while chunk := source.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+def process_document(content_id: str) -> None:
+    """
+    Linearize an uploaded PDF and record its page count and first-page
+    preview. Each step is independent: whatever fails leaves the original
+    file (or no preview) in place and is only logged.
+    """
+    with get_db_session() as db:
+        content = db.get(EducationalContent, content_id)
+        if not content:
+            logger.warning(f"Skipping PDF processing for missing content {content_id}")
+            return
+        source_key = content.file_path
+
+    fields = {}
+    work_dir = tempfile.mkdtemp(prefix="pdf-", dir=storage.staging_directory())
+    try:
+        with storage.local_copy(source_key) as source:
+            try:
+                fields["page_count"] = count_pages(source)
+            except Exception as e:
+                logger.warning(f"Could not count pages of content {content_id}: {str(e)}")
+
+            try:
+                preview = render_first_page(source, os.path.join(work_dir, "preview"))
+                key = preview_key(source_key)
+                storage.store_file(key, preview, "image/jpeg", cache_control=PREVIEW_CACHE_CONTROL)
+                fields["preview_path"] = key
+            except Exception as e:
+                logger.warning(f"Could not render a preview of content {content_id}: {str(e)}")
+
+            try:
+                linearized = os.path.join(work_dir, "linearized.pdf")
+                linearize_pdf(source, linearized)
+                fields["file_size"] = os.path.getsize(linearized)
+                fields["crc32"] = _checksum(linearized)
+            except Exception as e:
+                # Viewers still open the original, they just wait for more of it first
+                logger.warning(f"Keeping the original of content {content_id}, linearization failed: {str(e)}")
+                linearized = None
+
+        # Replaced only after the local copy is released; same key, so file_url stays valid
+        if linearized:
+            storage.store_file(source_key, linearized, PDF_MIME_TYPE)
+
+        if fields:
+            with get_db_session() as db:
+                content = db.get(EducationalContent, content_id)
+                if content:
+                    content.update(fields)
+            invalidate_catalogue()
+        logger.info(f"PDF processing finished for content {content_id}: {sorted(fields)}")
+
+    except Exception as e:
+        logger.error(f"PDF processing failed for content {content_id}: {str(e)}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def _process_for_tenant(tenant_id: Optional[str], content_id: str) -> None:
+    # Pool threads do not inherit the request's context; keep the work scoped to the uploader's school
+    set_current_tenant(tenant_id)
+    process_document(content_id)
+
+def submit_document_processing(content_id: str) -> None:
+    """Queue PDF processing on the document pool, in the uploading request's school"""
+    _executor.submit(_process_for_tenant, current_tenant.get(), content_id)
+
+def remove_document_artifacts(file_path: Optional[str]) -> None:
+    """Remove the preview stored next to a blob"""
+    if file_path:
+        storage.delete(preview_key(file_path))
+
+def shutdown_document_processing() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
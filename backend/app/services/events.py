@@ -0,0 +1,184 @@
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Set
+from app.config.settings import settings
+from app.models.base import new_id
+from app.models.content import ContentComment, EducationalContent
+from app.models.user import User
+from app.services.invalidation import InvalidationBus, bus
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTENT_PUBLISHED = "content.published"
+CONTENT_DELETED = "content.deleted"
+COMMENT_CREATED = "comment.created"
+
+# Tells the client it may have missed events and should refetch instead of resuming
+RESET_FRAME = "event: reset\ndata: {}\n\n"
+
+class Subscriber:
+    """One connected client: its visibility and a bounded queue of pending events"""
+
+    def __init__(self, user: User, content_ids: Iterable[str]):
+        self.user_id = user.id
+        self.tenant_id = user.tenant_id
+        self.is_admin = user.is_admin
+        self.content_ids: Set[str] = set(content_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def can_receive(self, event: Dict[str, Any]) -> bool:
+        scope = event["scope"]
+        if scope["tenant_id"] != self.tenant_id:
+            return False
+        if event["event"] == COMMENT_CREATED and scope["content_id"] not in self.content_ids:
+            return False
+        # Same rule as GET /content/{content_id}
+        return self.is_admin or scope["is_published"] or scope["uploaded_by"] == self.user_id
+
+    def offer(self, event: Optional[Dict[str, Any]]) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Slow client: stop queueing; it gets a reset and resumes from its last event id
+            self.overflowed = True
+            return False
+
+class EventHub:
+    """
+    Per-worker fan-out of change events to SSE clients. Events arrive through
+    the invalidation bus, so every worker sees every event and keeps the same
+    recent history for Last-Event-ID resume.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=settings.SSE_REPLAY_BUFFER)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, event_bus: InvalidationBus) -> None:
+        self._loop = asyncio.get_running_loop()
+        event_bus.subscribe(self._on_bus_event)
+
+    def _on_bus_event(self, event: Dict[str, Any]) -> None:
+        # Publishers may run in worker threads; subscriber queues belong to the event loop
+        if "event" in event and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        self._history.append(event)
+        for subscriber in list(self._subscribers):
+            if subscriber.can_receive(event) and not subscriber.offer(event):
+                self._subscribers.discard(subscriber)
+
+    def subscribe(self, user: User, content_ids: Iterable[str], last_event_id: Optional[str]):
+        """
+        Register a client. Returns the subscriber and the events to replay;
+        None means the last event id is no longer known and the client must reset.
+        """
+        subscriber = Subscriber(user, content_ids)
+        replay: Optional[List[Dict[str, Any]]] = []
+        if last_event_id:
+            ids = [event["id"] for event in self._history]
+            if last_event_id in ids:
+                position = ids.index(last_event_id)
+                replay = [event for event in list(self._history)[position + 1:] if subscriber.can_receive(event)]
+            else:
+                replay = None
+        self._subscribers.add(subscriber)
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def close(self) -> None:
+        """End every open stream (shutdown)"""
+        for subscriber in list(self._subscribers):
+            subscriber.offer(None)
+        self._subscribers.clear()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+hub = EventHub()
+
+def format_event(event: Dict[str, Any]) -> str:
+    data = json.dumps(event["data"], separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+async def stream_events(subscriber: Subscriber, replay: Optional[List[Dict[str, Any]]],
+                        is_disconnected) -> AsyncIterator[str]:
+    """SSE frames for one client: replay, then live events with heartbeats while idle"""
+    try:
+        yield f"retry: {int(settings.SSE_HEARTBEAT_SECONDS * 1000)}\n\n"
+        if replay is None:
+            yield RESET_FRAME
+        else:
+            for event in replay:
+                yield format_event(event)
+
+        while True:
+            if subscriber.overflowed:
+                yield RESET_FRAME
+                break
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(subscriber)
+
+def _content_scope(content: EducationalContent) -> Dict[str, Any]:
+    return {
+        "content_id": content.id,
+        "is_published": bool(content.is_published),
+        "uploaded_by": content.uploaded_by,
+        "tenant_id": content.tenant_id,
+    }
+
+def content_event(kind: str, content: EducationalContent) -> Dict[str, Any]:
+    """
+    A compact catalogue change; clients fetch details with POST /content/batch-get.
+    Build it before deleting the row, publish it after the commit.
+    """
+    return {
+        "event": kind,
+        "id": new_id(),
+        "data": {
+            "id": content.id,
+            "category_id": content.category_id,
+            "content_type": content.content_type,
+        },
+        "scope": _content_scope(content),
+    }
+
+def comment_event(comment: ContentComment, content: EducationalContent) -> Dict[str, Any]:
+    """
+    Ids only, so the event fits a NOTIFY payload whatever the comment's length;
+    clients fetch the text with GET /content/{content_id}/comments.
+    """
+    return {
+        "event": COMMENT_CREATED,
+        "id": new_id(),
+        "data": {
+            "id": comment.id,
+            "content_id": comment.content_id,
+            "user_id": comment.user_id,
+            "created_at": comment.created_at.isoformat(),
+        },
+        "scope": _content_scope(content),
+    }
+
+def publish_event(event: Dict[str, Any]) -> None:
+    """Send an event to the SSE clients of every worker"""
+    bus.broadcast(event)
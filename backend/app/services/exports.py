@@ -0,0 +1,103 @@
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from typing import Iterator, List, Optional
+from app.config.settings import settings
+from app import database
+from app.models.content import EducationalContent, ContentAccess, ContentComment
+from datetime import datetime
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _apply_filters(statement: Select, model, time_column, start: Optional[datetime], end: Optional[datetime],
+                   category_id: Optional[str], student_ids: Optional[List[str]]) -> Select:
+    if start:
+        statement = statement.where(time_column >= start)
+    if end:
+        statement = statement.where(time_column < end)
+    if category_id:
+        statement = statement.where(EducationalContent.category_id == category_id)
+    if student_ids:
+        statement = statement.where(model.user_id.in_(student_ids))
+    return statement
+
+def content_access_export(start=None, end=None, category_id=None, student_ids=None) -> Select:
+    """Plain column select of content_access rows; never builds ORM objects"""
+    statement = (
+        select(
+            ContentAccess.id,
+            ContentAccess.user_id,
+            ContentAccess.content_id,
+            EducationalContent.category_id,
+            ContentAccess.progress,
+            ContentAccess.completed,
+            ContentAccess.last_accessed,
+            ContentAccess.created_at,
+            ContentAccess.updated_at,
+        )
+        .join(EducationalContent, EducationalContent.id == ContentAccess.content_id)
+    )
+    return _apply_filters(statement, ContentAccess, ContentAccess.last_accessed,
+                          start, end, category_id, student_ids)
+
+def content_comments_export(start=None, end=None, category_id=None, student_ids=None) -> Select:
+    statement = (
+        select(
+            ContentComment.id,
+            ContentComment.user_id,
+            ContentComment.content_id,
+            EducationalContent.category_id,
+            ContentComment.comment,
+            ContentComment.created_at,
+            ContentComment.updated_at,
+        )
+        .join(EducationalContent, EducationalContent.id == ContentComment.content_id)
+    )
+    return _apply_filters(statement, ContentComment, ContentComment.created_at,
+                          start, end, category_id, student_ids)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def stream_export(statement: Select, fmt: str) -> Iterator[bytes]:
+    """
+    Stream rows through a server-side cursor, one encoded chunk per fetched batch.
+    Memory stays bounded by EXPORT_BATCH_SIZE regardless of the total row count.
+    """
+    with database.get_db_session() as db:
+        result = db.execute(statement, execution_options={"yield_per": settings.EXPORT_BATCH_SIZE})
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        exported = 0
+
+        if fmt == "csv":
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            if fmt == "csv":
+                writer.writerows(
+                    [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                    for row in rows
+                )
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                    buffer.write("\n")
+            exported += len(rows)
+            yield buffer.getvalue().encode()
+
+        logger.info(f"Export streamed {exported} rows as {fmt}")
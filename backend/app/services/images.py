@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from app.config.settings import settings
+from app.services.avatars import AVATAR_FORMAT, avatar_storage_key
+from app.services.storage import storage
+import asyncio
+import hashlib
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+AVATAR_QUALITY = 82
+# Decoders accepted for avatars; anything else is rejected before decoding pixels
+AVATAR_SOURCE_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="images")
+
+class ImageProcessingError(ValueError):
+    """Raised when an uploaded image cannot be used"""
+
+def _decode(data: bytes) -> Image.Image:
+    """Decode once, apply EXIF orientation and crop to a centred square"""
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.format not in AVATAR_SOURCE_FORMATS:
+            raise ImageProcessingError(f"Unsupported image format: {image.format}")
+        image = ImageOps.exif_transpose(image)
+    except ImageProcessingError:
+        raise
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Invalid image: {str(e)}")
+
+    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    edge = min(image.size)
+    left = (image.width - edge) // 2
+    top = (image.height - edge) // 2
+    return image.crop((left, top, left + edge, top + edge))
+
+def _render(image: Image.Image, key: str, size: int) -> None:
+    storage_key = avatar_storage_key(key, size)
+    if storage.exists(storage_key):
+        return
+
+    # Never upscale; small sources keep their own size under every name
+    resized = image if image.width <= size else image.resize((size, size), Image.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, format=AVATAR_FORMAT, quality=AVATAR_QUALITY, method=4)
+
+    storage.put_bytes(
+        storage_key,
+        buffer.getvalue(),
+        content_type=f"image/{AVATAR_FORMAT}",
+        cache_control=f"public, max-age={settings.AVATAR_CACHE_MAX_AGE}, immutable"
+    )
+
+async def create_avatar_derivatives(data: bytes) -> str:
+    """
+    Store fixed-size WebP derivatives of an avatar and return its key.
+    The key is the SHA-256 of the upload, so derivative URLs never change
+    meaning and re-uploading the same picture costs nothing.
+    """
+    key = hashlib.sha256(data).hexdigest()
+    loop = asyncio.get_running_loop()
+    stored = await asyncio.gather(*(
+        loop.run_in_executor(_executor, storage.exists, avatar_storage_key(key, size))
+        for size in settings.avatar_sizes_list
+    ))
+    if all(stored):
+        return key
+
+    image = await loop.run_in_executor(_executor, _decode, data)
+    await asyncio.gather(*(
+        loop.run_in_executor(_executor, _render, image, key, size)
+        for size in settings.avatar_sizes_list
+    ))
+    logger.info(f"Stored avatar derivatives for {key}")
+    return key
+
+def shutdown_image_workers() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
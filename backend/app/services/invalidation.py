@@ -0,0 +1,191 @@
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+from app.config.settings import settings
+from app import database
+from app.services.cache import registered_caches
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Postgres caps NOTIFY payloads at 8000 bytes; larger key sets flush the whole cache instead
+MAX_PAYLOAD_BYTES = 7500
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+class InvalidationBus:
+    """
+    Publishes cache invalidation events and evicts keys from the named
+    in-process caches; also carries change events for the live event hub.
+    Subclasses decide how events reach other workers.
+    """
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._reconnect_hooks: List[Callable[[], Any]] = []
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback invoked for every event delivered to this worker"""
+        self._listeners.append(listener)
+
+    def on_reconnect(self, hook: Callable[[], Any]) -> None:
+        """
+        Register a blocking callback run (in the threadpool) whenever the bus
+        starts receiving again, to reload state fed by events it may have missed
+        """
+        self._reconnect_hooks.append(hook)
+
+    def publish(self, cache: str, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """Evict keys (or the whole cache when keys is None) here and in every other worker"""
+        event = {
+            "cache": cache,
+            "keys": sorted(str(key) for key in keys) if keys is not None else None,
+            "origin": self.origin,
+        }
+        self.deliver(event)
+        try:
+            self._send(event)
+        except Exception as e:
+            # Other workers fall back to cache TTLs; never fail the mutation over it
+            logger.error(f"Failed to publish invalidation for {cache}: {str(e)}")
+
+    def broadcast(self, message: Dict[str, Any]) -> None:
+        """Deliver a change event to the listeners of every worker, this one included"""
+        event = {**message, "origin": self.origin}
+        self.deliver(event)
+        try:
+            self._send(event)
+        except Exception as e:
+            logger.error(f"Failed to broadcast {message.get('event')} event: {str(e)}")
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        cache = registered_caches().get(event.get("cache"))
+        if cache is not None:
+            if event.get("keys") is None:
+                cache.clear()
+            else:
+                for key in event["keys"]:
+                    cache.invalidate(key)
+
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Invalidation listener failed: {str(e)}")
+
+    def _send(self, event: Dict[str, Any]) -> None:
+        pass
+
+    async def run(self) -> None:
+        """Receive events from other workers until cancelled"""
+
+class InProcessInvalidationBus(InvalidationBus):
+    """Stand-in bus for tests and single-worker runs; events never leave the process"""
+
+    def __init__(self):
+        super().__init__()
+        self.published: List[Dict[str, Any]] = []
+
+    def _send(self, event: Dict[str, Any]) -> None:
+        self.published.append(event)
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Fans events out to every worker with Postgres LISTEN/NOTIFY"""
+
+    def __init__(self, channel: str):
+        super().__init__()
+        self.channel = channel
+
+    def _encode(self, event: Dict[str, Any]) -> str:
+        payload = json.dumps(event, separators=(",", ":"))
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            payload = json.dumps({**event, "keys": None}, separators=(",", ":"))
+        return payload
+
+    def _send(self, event: Dict[str, Any]) -> None:
+        if not database.engine:
+            return
+        with database.engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": self._encode(event)}
+            )
+
+    def _receive(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed invalidation payload: {payload[:200]}")
+            return
+        if event.get("origin") != self.origin:
+            self.deliver(event)
+
+    def _connect(self):
+        # A dedicated connection outside the pool: it stays in LISTEN for the worker's lifetime
+        import psycopg2
+        import psycopg2.extensions
+
+        url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+        connection = psycopg2.connect(url.render_as_string(hide_password=False))
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    async def _catch_up(self) -> None:
+        # Events may have been missed while disconnected
+        for cache in registered_caches().values():
+            cache.clear()
+        for hook in self._reconnect_hooks:
+            try:
+                await run_in_threadpool(hook)
+            except Exception as e:
+                logger.error(f"Invalidation reconnect hook failed: {str(e)}")
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay = RECONNECT_DELAY_SECONDS
+        while True:
+            connection = None
+            try:
+                connection = await run_in_threadpool(self._connect)
+                await self._catch_up()
+                delay = RECONNECT_DELAY_SECONDS
+                logger.info(f"Listening for cache invalidations on channel {self.channel}")
+
+                readable = asyncio.Event()
+                loop.add_reader(connection.fileno(), readable.set)
+                try:
+                    while True:
+                        await readable.wait()
+                        readable.clear()
+                        connection.poll()
+                        while connection.notifies:
+                            self._receive(connection.notifies.pop(0).payload)
+                finally:
+                    loop.remove_reader(connection.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Invalidation listener error, reconnecting in {delay:.0f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+def create_bus() -> InvalidationBus:
+    if settings.CACHE_INVALIDATION_BUS == "postgres":
+        return PostgresInvalidationBus(settings.CACHE_INVALIDATION_CHANNEL)
+    return InProcessInvalidationBus()
+
+bus = create_bus()
+
+def publish_invalidation(cache: str, keys: Optional[Iterable[Hashable]] = None) -> None:
+    bus.publish(cache, keys)
@@ -0,0 +1,105 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Dict, List
+from app.config.settings import settings
+from app.services.rollups import subtract_from_rollups
+from datetime import date, datetime
+import gzip
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "content_access_y"
+
+def ensure_content_access_partitions(db: Session) -> int:
+    """Create monthly content_access partitions up to PARTITION_MONTHS_AHEAD months ahead"""
+    created = db.execute(
+        text("SELECT ensure_content_access_partitions(:months_ahead)"),
+        {"months_ahead": settings.PARTITION_MONTHS_AHEAD}
+    ).scalar()
+    db.commit()
+    if created:
+        logger.info(f"Created {created} content_access partitions")
+    return created
+
+def list_partitions(db: Session) -> List[Dict]:
+    """Monthly partitions of content_access with their range bounds, oldest first"""
+    rows = db.execute(text("""
+        SELECT c.relname AS name,
+               pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'content_access'::regclass
+          AND c.relname LIKE :prefix
+        ORDER BY c.relname
+    """), {"prefix": f"{PARTITION_PREFIX}%"}).mappings().all()
+
+    partitions = []
+    for row in rows:
+        # Names are content_access_yYYYYmMM, set by ensure_content_access_partitions
+        suffix = row["name"][len(PARTITION_PREFIX):]
+        year, month = int(suffix[:4]), int(suffix[5:7])
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        partitions.append({"name": row["name"], "start": start, "end": end})
+    return partitions
+
+def list_detached_partitions(db: Session) -> List[str]:
+    """
+    Monthly tables detached by an archive run that failed before dropping them.
+    Their rows are already out of the rollups, so they only need exporting.
+    """
+    return list(db.execute(text("""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND NOT relispartition AND relname LIKE :prefix
+        ORDER BY relname
+    """), {"prefix": f"{PARTITION_PREFIX}%"}).scalars())
+
+def archive_partition(db: Session, name: str, output_dir: str) -> str:
+    """
+    Detach one partition, write it out as gzip-compressed CSV and drop it.
+    Rows are subtracted from the progress rollups in the same transaction as the
+    detach, so rollups keep matching the live content_access data.
+    """
+    # Lock first so no row moves in or out between the rollup update and the detach
+    db.execute(text(f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE'))
+    subtract_from_rollups(db, access_table=f'"{name}"')
+    db.execute(text(f'ALTER TABLE content_access DETACH PARTITION "{name}"'))
+    db.commit()
+    return export_detached_partition(db, name, output_dir)
+
+def export_detached_partition(db: Session, name: str, output_dir: str) -> str:
+    """Write a detached partition out as gzip-compressed CSV, then drop it"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{name}.csv.gz")
+    tmp_path = f"{path}.partial"
+    raw_connection = db.connection().connection
+    with raw_connection.cursor() as cursor, gzip.open(tmp_path, "wb") as archive:
+        cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+    os.replace(tmp_path, path)
+
+    # Only drop once the archive is safely on disk
+    db.execute(text(f'DROP TABLE "{name}"'))
+    db.commit()
+    logger.info(f"Archived partition {name} to {path}")
+    return path
+
+def archive_old_partitions(db: Session, retention_months: int, output_dir: str) -> List[str]:
+    """
+    Archive every monthly partition that ends before the retention window,
+    after finishing any that an earlier run detached but did not export
+    """
+    archived = []
+    for name in list_detached_partitions(db):
+        logger.info(f"Resuming archive of detached partition {name}")
+        archived.append(export_detached_partition(db, name, output_dir))
+
+    today = datetime.utcnow().date()
+    months = today.year * 12 + today.month - 1 - retention_months
+    cutoff = date(months // 12, months % 12 + 1, 1)
+
+    for partition in list_partitions(db):
+        if partition["end"] <= cutoff:
+            archived.append(archive_partition(db, partition["name"], output_dir))
+    return archived
@@ -0,0 +1,48 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import FrozenSet, List, Optional
+from app.config.settings import settings
+from app.models.user import User, UserRole, guardian_student, teacher_student
+from app.services.cache import get_cache
+
+# Student ids a teacher or guardian may view, keyed by that user's id
+student_access_cache = get_cache("student_access", ttl=settings.PERMISSION_CACHE_TTL, maxsize=4096)
+
+def accessible_student_ids(db: Session, user: User) -> Optional[FrozenSet[str]]:
+    """Students visible to a user; None means every student of the school (admins)"""
+    if user.is_admin:
+        return None
+    if user.is_student:
+        return frozenset([user.id])
+
+    cached = student_access_cache.get(user.id)
+    if cached is not None:
+        return cached
+
+    if user.is_teacher:
+        query = select(teacher_student.c.student_id).where(teacher_student.c.teacher_id == user.id)
+    elif user.is_guardian:
+        query = select(guardian_student.c.student_id).where(guardian_student.c.guardian_id == user.id)
+    else:
+        return frozenset()
+
+    student_ids = frozenset(db.execute(query).scalars())
+    student_access_cache.set(user.id, student_ids)
+    return student_ids
+
+def can_view_student(db: Session, user: User, student_id: str) -> bool:
+    student_ids = accessible_student_ids(db, user)
+    if student_ids is None:
+        # Admins see every student of their own school
+        return db.query(User.id).filter(User.id == student_id, User.tenant_id == user.tenant_id).first() is not None
+    return student_id in student_ids
+
+def accessible_students(db: Session, user: User) -> List[User]:
+    """Student users visible to a user, loaded in one query"""
+    query = select(User).where(User.role == UserRole.STUDENT).order_by(User.full_name)
+    student_ids = accessible_student_ids(db, user)
+    if student_ids is not None:
+        if not student_ids:
+            return []
+        query = query.where(User.id.in_(student_ids))
+    return list(db.execute(query).scalars())
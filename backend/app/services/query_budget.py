@@ -0,0 +1,133 @@
+from contextvars import ContextVar
+from psycopg2.errors import QueryCanceled
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from typing import Any, Dict, Optional, Set
+from app.config.settings import settings
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Key in connection_record.info holding the statement_timeout last set on the connection
+TIMEOUT_INFO_KEY = "statement_timeout_ms"
+REQUEST_INFO_KEY = "request_queries"
+
+class RequestQueries:
+    """
+    Database work of one HTTP request: its statement budget and the DBAPI
+    connections it has checked out, so they can be cancelled if the client leaves.
+    """
+
+    def __init__(self, route: str, statement_timeout_ms: int):
+        self.route = route
+        self.statement_timeout_ms = statement_timeout_ms
+        self.disconnected = False
+        self.response_sent = False
+        self._connections: Set[Any] = set()
+        self._lock = threading.Lock()
+
+    def attach(self, dbapi_connection) -> None:
+        with self._lock:
+            self._connections.add(dbapi_connection)
+
+    def detach(self, dbapi_connection) -> None:
+        # Blocks while cancel() runs, so a connection is never returned to the
+        # pool (and handed to another request) with a cancel still in flight
+        with self._lock:
+            self._connections.discard(dbapi_connection)
+
+    def cancel(self) -> int:
+        """Cancel whatever the request's connections are running; returns how many were signalled"""
+        self.disconnected = True
+        with self._lock:
+            connections = list(self._connections)
+            for dbapi_connection in connections:
+                try:
+                    dbapi_connection.cancel()
+                except Exception as e:
+                    logger.warning(f"Could not cancel query for {self.route}: {str(e)}")
+        return len(connections)
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+class QueryCounters:
+    """Process-wide tally of statements stopped by a timeout or a client disconnect"""
+
+    def __init__(self):
+        self.timed_out = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind: str) -> None:
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"timed_out": self.timed_out, "cancelled": self.cancelled}
+
+counters = QueryCounters()
+
+def route_statement_timeout(method: str, path: str) -> int:
+    """Statement budget in milliseconds for a route; 0 means no limit"""
+    return settings.route_statement_timeouts.get((method, path), settings.STATEMENT_TIMEOUT_MS)
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    return "statement timeout" in str(exc)
+
+def is_query_cancelled(exc: BaseException) -> bool:
+    """True for a database error raised because the statement was cancelled or timed out"""
+    return isinstance(exc, DBAPIError) and isinstance(exc.orig, QueryCanceled)
+
+def _apply_statement_timeout(dbapi_connection, connection_record, timeout_ms: Optional[int]) -> None:
+    # The value is cached per connection, so the common case costs no round trip
+    if connection_record.info.get(TIMEOUT_INFO_KEY) == timeout_ms:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        if timeout_ms is None:
+            cursor.execute("RESET statement_timeout")
+        else:
+            cursor.execute("SET statement_timeout = %s", (timeout_ms,))
+    finally:
+        cursor.close()
+    # SET is transactional: commit so the pool's rollback on checkin does not undo it
+    dbapi_connection.commit()
+    connection_record.info[TIMEOUT_INFO_KEY] = timeout_ms
+
+def install_query_budgets(engine: Engine) -> None:
+    """
+    Apply the current request's statement budget to every connection it checks
+    out and track those connections for cancellation. Work outside a request
+    (warm-up, background jobs, scripts) runs with the server default.
+    """
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        queries = current_queries.get()
+        _apply_statement_timeout(
+            dbapi_connection, connection_record, queries.statement_timeout_ms if queries else None
+        )
+        if queries is not None:
+            queries.attach(dbapi_connection)
+            connection_record.info[REQUEST_INFO_KEY] = queries
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        queries = connection_record.info.pop(REQUEST_INFO_KEY, None)
+        if queries is not None:
+            queries.detach(dbapi_connection)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if not isinstance(context.original_exception, QueryCanceled):
+            return
+        queries = current_queries.get()
+        route = queries.route if queries else "background"
+        if is_statement_timeout(context.original_exception):
+            counters.record("timed_out")
+            logger.warning(f"Statement timed out on {route}")
+        else:
+            counters.record("cancelled")
+            logger.info(f"Statement cancelled on {route} after the client disconnected")
@@ -0,0 +1,157 @@
+from sqlalchemy import delete, distinct, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from scipy import sparse
+from typing import Dict, List, Optional, Sequence, Set
+from app.config.settings import settings
+from app.models.content import ContentAccess
+from app.models.recommendation import ContentRecommendation, JobWatermark
+from datetime import datetime, timedelta
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "content_recommendations"
+ITEM_CHUNK_SIZE = 512     # Items whose similarity rows are computed per sparse product
+INSERT_BATCH_SIZE = 1000
+# Re-scan a little before the last watermark so rows committed late by slow transactions aren't missed
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+def _changed_items(db: Session, since: datetime) -> Set[str]:
+    return set(db.execute(
+        select(distinct(ContentAccess.content_id)).where(ContentAccess.created_at >= since)
+    ).scalars())
+
+def _audience_sizes(db: Session) -> Dict[str, int]:
+    """Distinct users per item; the norms of the binary item vectors"""
+    return dict(db.execute(
+        select(ContentAccess.content_id, func.count(distinct(ContentAccess.user_id)))
+        .group_by(ContentAccess.content_id)
+    ).all())
+
+def _build_matrix(db: Session, item_index: Dict[str, int], changed: Optional[Set[str]]) -> sparse.csr_matrix:
+    """
+    Binary user x item matrix. For an incremental run only users who accessed a
+    changed item are loaded: they are the only ones contributing co-access counts
+    to those items' rows.
+    """
+    query = select(ContentAccess.user_id, ContentAccess.content_id)
+    if changed is not None:
+        audience = select(ContentAccess.user_id).where(ContentAccess.content_id.in_(changed))
+        query = query.where(ContentAccess.user_id.in_(audience))
+
+    user_index: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    result = db.execute(query, execution_options={"yield_per": 50000})
+    for batch in result.partitions():
+        for user_id, content_id in batch:
+            column = item_index.get(content_id)
+            if column is None:
+                continue
+            rows.append(user_index.setdefault(user_id, len(user_index)))
+            cols.append(column)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))),
+        shape=(len(user_index), len(item_index))
+    )
+    # Repeated access rows for the same pair collapse to a single 1
+    matrix.data[:] = 1.0
+    return matrix
+
+def _top_neighbours(co_access: sparse.csr_matrix, row: int, item: int, norms: np.ndarray) -> List[tuple]:
+    start, end = co_access.indptr[row], co_access.indptr[row + 1]
+    neighbours = co_access.indices[start:end]
+    support = co_access.data[start:end]
+
+    keep = (neighbours != item) & (support >= settings.RECOMMENDATION_MIN_SUPPORT)
+    neighbours, support = neighbours[keep], support[keep]
+    if not len(neighbours):
+        return []
+
+    scores = support / (norms[item] * norms[neighbours])
+    k = settings.RECOMMENDATION_TOP_K
+    top = np.argpartition(-scores, k)[:k] if len(scores) > k else np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(int(neighbours[i]), float(scores[i]), int(support[i])) for i in top]
+
+def _store(db: Session, item_ids: Sequence[str], chunk: Sequence[int], neighbours: Dict[int, List[tuple]]) -> int:
+    """Replace the stored neighbour lists of a chunk of items"""
+    db.execute(delete(ContentRecommendation).where(
+        ContentRecommendation.content_id.in_([item_ids[item] for item in chunk])
+    ))
+    now = datetime.utcnow()
+    values = [
+        {
+            "content_id": item_ids[item],
+            "related_content_id": item_ids[related],
+            "rank": rank,
+            "score": score,
+            "support": support,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in chunk
+        for rank, (related, score, support) in enumerate(neighbours[item], start=1)
+    ]
+    for offset in range(0, len(values), INSERT_BATCH_SIZE):
+        db.execute(insert(ContentRecommendation.__table__).values(values[offset:offset + INSERT_BATCH_SIZE]))
+    db.commit()
+    return len(values)
+
+def _set_watermark(db: Session, watermark: datetime) -> None:
+    statement = insert(JobWatermark.__table__).values(
+        job_name=JOB_NAME, watermark=watermark, created_at=watermark, updated_at=watermark
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["job_name"],
+        set_={"watermark": statement.excluded.watermark, "updated_at": statement.excluded.updated_at}
+    ))
+    db.commit()
+
+def refresh_recommendations(db: Session, full: bool = False) -> Dict[str, int]:
+    """
+    Recompute item-item cosine similarity over co-access and store the top-K
+    neighbours per item. Without `full`, only items with access rows created
+    since the previous run are recomputed.
+    """
+    run_started_at = datetime.utcnow()
+    watermark = None if full else db.get(JobWatermark, JOB_NAME)
+
+    changed: Optional[Set[str]] = None
+    if watermark is not None:
+        changed = _changed_items(db, watermark.watermark - WATERMARK_OVERLAP)
+        if not changed:
+            _set_watermark(db, run_started_at)
+            logger.info("No content access changes since the last recommendation run")
+            return {"items": 0, "neighbours": 0}
+
+    audience = _audience_sizes(db)
+    item_ids = list(audience)
+    item_index = {content_id: index for index, content_id in enumerate(item_ids)}
+    norms = np.sqrt(np.array([audience[content_id] for content_id in item_ids], dtype=np.float64))
+
+    matrix = _build_matrix(db, item_index, changed)
+    item_user = matrix.T.tocsr()
+
+    if changed is None:
+        targets = list(range(len(item_ids)))
+    else:
+        targets = [item_index[content_id] for content_id in changed if content_id in item_index]
+
+    stored = 0
+    for offset in range(0, len(targets), ITEM_CHUNK_SIZE):
+        chunk = targets[offset:offset + ITEM_CHUNK_SIZE]
+        # Co-access counts between the chunk's items and every item, in one sparse product
+        co_access = (item_user[chunk] @ matrix).tocsr()
+        neighbours = {item: _top_neighbours(co_access, row, item, norms) for row, item in enumerate(chunk)}
+        stored += _store(db, item_ids, chunk, neighbours)
+
+    _set_watermark(db, run_started_at)
+    logger.info(
+        f"Recommendations refreshed for {len(targets)} items "
+        f"({'full' if changed is None else 'incremental'}), {stored} neighbours stored"
+    )
+    return {"items": len(targets), "neighbours": stored}
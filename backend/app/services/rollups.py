@@ -0,0 +1,158 @@
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from app.models.progress import (
+    StudentProgressRollup,
+    ContentProgressRollup,
+    StudentCategoryProgressRollup
+)
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TOLERANCE = 0.01
+
+# Aggregates over content_access (students only) that define what each rollup should contain.
+# Used by the rebuild, the consistency check, content deletion and partition archival;
+# {access_table} is content_access itself or one of its partitions.
+_STUDENT_ACCESS = """
+    FROM {access_table} a
+    JOIN users u ON u.id = a.user_id AND u.role = 'student'
+"""
+_COUNTERS = """
+    count(*) AS started,
+    count(*) FILTER (WHERE a.completed) AS completed,
+    coalesce(sum(a.progress), 0) AS progress_total,
+    max(a.last_accessed) AS last_accessed
+"""
+ROLLUP_SOURCES: Dict[str, Tuple[List[str], str]] = {
+    StudentProgressRollup.__tablename__: (
+        ["student_id"],
+        f"SELECT a.user_id AS student_id, {_COUNTERS} {_STUDENT_ACCESS} {{where}} GROUP BY a.user_id"
+    ),
+    ContentProgressRollup.__tablename__: (
+        ["content_id"],
+        f"SELECT a.content_id, {_COUNTERS} {_STUDENT_ACCESS} {{where}} GROUP BY a.content_id"
+    ),
+    StudentCategoryProgressRollup.__tablename__: (
+        ["student_id", "category_id"],
+        f"""SELECT a.user_id AS student_id, c.category_id, {_COUNTERS} {_STUDENT_ACCESS}
+            JOIN educational_content c ON c.id = a.content_id
+            {{where}} GROUP BY a.user_id, c.category_id"""
+    ),
+}
+
+def _apply_delta(db: Session, model, keys: Dict[str, str], started: int, completed: int,
+                 progress: float, accessed_at: datetime) -> None:
+    """Add deltas to one rollup row, creating it on first use"""
+    table = model.__table__
+    now = datetime.utcnow()
+    statement = insert(table).values(
+        **keys,
+        started=started,
+        completed=completed,
+        progress_total=progress,
+        last_accessed=accessed_at,
+        created_at=now,
+        updated_at=now
+    )
+    excluded = statement.excluded
+    db.execute(statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            "started": table.c.started + excluded.started,
+            "completed": table.c.completed + excluded.completed,
+            "progress_total": table.c.progress_total + excluded.progress_total,
+            "last_accessed": func.greatest(table.c.last_accessed, excluded.last_accessed),
+            "updated_at": excluded.updated_at,
+        }
+    ))
+
+def apply_progress_change(
+    db: Session,
+    student_id: str,
+    content_id: str,
+    category_id: str,
+    previous: Optional[Tuple[float, bool]],
+    progress: float,
+    completed: bool,
+    accessed_at: datetime
+) -> None:
+    """
+    Fold one content_access change into every rollup, in the caller's transaction.
+    `previous` is the (progress, completed) pair before the change, or None for a new access row.
+    """
+    previous_progress, previous_completed = previous or (0.0, False)
+    started = 0 if previous else 1
+    completed_delta = int(completed) - int(previous_completed)
+    progress_delta = progress - (previous_progress or 0.0)
+
+    _apply_delta(db, StudentProgressRollup, {"student_id": student_id},
+                 started, completed_delta, progress_delta, accessed_at)
+    _apply_delta(db, ContentProgressRollup, {"content_id": content_id},
+                 started, completed_delta, progress_delta, accessed_at)
+    _apply_delta(db, StudentCategoryProgressRollup, {"student_id": student_id, "category_id": category_id},
+                 started, completed_delta, progress_delta, accessed_at)
+
+def subtract_from_rollups(db: Session, access_table: str = "content_access", where: str = "",
+                          params: Optional[Dict] = None, tables: Optional[List[str]] = None) -> None:
+    """Subtract the selected access rows from the rollups (last_accessed is left as is)"""
+    for table in tables or list(ROLLUP_SOURCES):
+        keys, source = ROLLUP_SOURCES[table]
+        join = " AND ".join(f"r.{key} = s.{key}" for key in keys)
+        db.execute(text(f"""
+            UPDATE {table} r SET
+                started = r.started - s.started,
+                completed = r.completed - s.completed,
+                progress_total = r.progress_total - s.progress_total,
+                updated_at = now()
+            FROM ({source.format(access_table=access_table, where=where)}) s
+            WHERE {join}
+        """), params or {})
+
+def remove_content_from_rollups(db: Session, content_id: str) -> None:
+    """Subtract a content item's access rows before it is deleted"""
+    # content_progress_rollups rows go away with the content through the foreign key cascade
+    subtract_from_rollups(
+        db,
+        where="WHERE a.content_id = :content_id",
+        params={"content_id": content_id},
+        tables=[StudentProgressRollup.__tablename__, StudentCategoryProgressRollup.__tablename__]
+    )
+
+def rebuild_rollups(db: Session) -> Dict[str, int]:
+    """Recompute every rollup from content_access in one transaction"""
+    db.execute(text(f"TRUNCATE {', '.join(ROLLUP_SOURCES)}"))
+    counts = {}
+    for table, (keys, source) in ROLLUP_SOURCES.items():
+        columns = ", ".join(keys + ["started", "completed", "progress_total", "last_accessed"])
+        result = db.execute(text(f"""
+            INSERT INTO {table} ({columns}, created_at, updated_at)
+            SELECT s.*, now(), now() FROM ({source.format(access_table="content_access", where="")}) s
+        """))
+        counts[table] = result.rowcount
+        logger.info(f"Rebuilt {table}: {result.rowcount} rows")
+    db.commit()
+    return counts
+
+def find_rollup_drift(db: Session, limit: int = 100) -> Dict[str, List[Dict]]:
+    """Compare each rollup against a fresh aggregate and return mismatching rows"""
+    drift = {}
+    for table, (keys, source) in ROLLUP_SOURCES.items():
+        key_columns = ", ".join(keys)
+        rows = db.execute(text(f"""
+            SELECT {key_columns},
+                   s.started AS expected_started, r.started AS actual_started,
+                   s.completed AS expected_completed, r.completed AS actual_completed,
+                   s.progress_total AS expected_progress_total, r.progress_total AS actual_progress_total
+            FROM ({source.format(access_table="content_access", where="")}) s
+            FULL OUTER JOIN {table} r USING ({key_columns})
+            WHERE coalesce(s.started, 0) <> coalesce(r.started, 0)
+               OR coalesce(s.completed, 0) <> coalesce(r.completed, 0)
+               OR abs(coalesce(s.progress_total, 0) - coalesce(r.progress_total, 0)) > :tolerance
+            LIMIT :limit
+        """), {"tolerance": PROGRESS_TOLERANCE, "limit": limit}).mappings().all()
+        drift[table] = [dict(row) for row in rows]
+    return drift
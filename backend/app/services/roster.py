@@ -0,0 +1,186 @@
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from app.config.settings import settings
+from app.models.user import User, UserRole, guardian_student, teacher_student
+from app.services.invalidation import publish_invalidation
+from app.services.permissions import student_access_cache
+import csv
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROSTER_FIELDS = ("link_type", "user", "student")
+
+# link_type -> (association table, linking column, required role of the linking user)
+LINK_TYPES = {
+    "guardian": (guardian_student, "guardian_id", UserRole.GUARDIAN),
+    "teacher": (teacher_student, "teacher_id", UserRole.TEACHER),
+}
+
+class RosterImportError(ValueError):
+    """Raised when the upload as a whole cannot be processed"""
+
+def _decode(line: bytes, line_number: int) -> str:
+    try:
+        # The first line may start with a byte order mark
+        return line.decode("utf-8-sig" if line_number == 1 else "utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        raise RosterImportError(f"Line {line_number} is not valid UTF-8")
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body"""
+    buffer = b""
+    received = 0
+    line_number = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > settings.MAX_UPLOAD_SIZE:
+            raise RosterImportError("Roster file exceeds maximum upload size")
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield _decode(line, line_number)
+    if buffer:
+        yield _decode(buffer, line_number + 1)
+
+async def _iter_rows(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (row number, row, parse error) for CSV or NDJSON input"""
+    header: Optional[List[str]] = None
+    row_number = 0
+    async for line in _iter_lines(stream):
+        if not line.strip():
+            continue
+
+        if fmt == "csv":
+            # Roster fields never contain newlines, so each line is parsed on its own
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [value.strip().lower() for value in values]
+                missing = set(ROSTER_FIELDS) - set(header)
+                if missing:
+                    raise RosterImportError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+                continue
+            row_number += 1
+            yield row_number, dict(zip(header, values)), None
+        else:
+            row_number += 1
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+                yield row_number, row, None
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {str(e)}"
+
+def _resolve_users(db: Session, refs: Set[str]) -> Dict[str, Tuple[str, UserRole]]:
+    """Resolve user ids or emails to (id, role) with a single query"""
+    if not refs:
+        return {}
+    rows = db.execute(
+        select(User.id, User.email, User.role).where(
+            or_(User.id.in_(refs), User.email.in_(refs))
+        )
+    ).all()
+    resolved = {}
+    for user_id, email, role in rows:
+        resolved[user_id] = (user_id, role)
+        resolved[email] = (user_id, role)
+    return resolved
+
+def _apply_batch(db: Session, batch: List[Tuple[int, str, str, str]], seen: Set[Tuple[str, str, str]], report: Dict) -> None:
+    """Validate a batch of rows in set-based queries and insert the new links"""
+    users = _resolve_users(db, {ref for _, _, user_ref, student_ref in batch for ref in (user_ref, student_ref)})
+    pending: Dict[str, List[Dict[str, str]]] = {link_type: [] for link_type in LINK_TYPES}
+
+    for row_number, link_type, user_ref, student_ref in batch:
+        _, column, required_role = LINK_TYPES[link_type]
+        linker = users.get(user_ref)
+        student = users.get(student_ref)
+        if not linker:
+            error = f"{link_type.capitalize()} not found: {user_ref}"
+        elif linker[1] != required_role:
+            error = f"User {user_ref} is not a {link_type}"
+        elif not student:
+            error = f"Student not found: {student_ref}"
+        elif student[1] != UserRole.STUDENT:
+            error = f"User {student_ref} is not a student"
+        else:
+            error = None
+
+        if error:
+            report["failed"] += 1
+            report["errors"].append({"row": row_number, "error": error})
+            continue
+
+        pair = (link_type, linker[0], student[0])
+        if pair in seen:
+            report["duplicates"] += 1
+            continue
+        seen.add(pair)
+        pending[link_type].append({column: linker[0], "student_id": student[0]})
+
+    for link_type, values in pending.items():
+        if not values:
+            continue
+        table = LINK_TYPES[link_type][0]
+        # Multi-row insert; existing links are skipped so re-running an import is a no-op
+        result = db.execute(insert(table).values(values).on_conflict_do_nothing())
+        inserted = max(result.rowcount, 0)
+        report["linked"] += inserted
+        report["already_linked"] += len(values) - inserted
+    db.commit()
+
+    # Linked teachers/guardians now see more students in every worker
+    linkers = {link[LINK_TYPES[link_type][1]] for link_type, values in pending.items() for link in values}
+    if linkers:
+        publish_invalidation(student_access_cache.name, linkers)
+
+async def import_roster(db: Session, stream: AsyncIterator[bytes], fmt: str) -> Dict:
+    """Stream a CSV/NDJSON roster into guardian-student and teacher-student links"""
+    report = {
+        "total_rows": 0,
+        "linked": 0,
+        "already_linked": 0,
+        "duplicates": 0,
+        "failed": 0,
+        "errors": [],
+    }
+    seen: Set[Tuple[str, str, str]] = set()
+    batch: List[Tuple[int, str, str, str]] = []
+
+    async for row_number, row, parse_error in _iter_rows(stream, fmt):
+        report["total_rows"] += 1
+        if parse_error:
+            report["failed"] += 1
+            report["errors"].append({"row": row_number, "error": parse_error})
+            continue
+
+        link_type = str(row.get("link_type") or "").strip().lower()
+        user_ref = str(row.get("user") or "").strip()
+        student_ref = str(row.get("student") or "").strip()
+        if link_type not in LINK_TYPES:
+            report["failed"] += 1
+            report["errors"].append({"row": row_number, "error": f"Invalid link_type: {link_type or 'missing'}"})
+            continue
+        if not user_ref or not student_ref:
+            report["failed"] += 1
+            report["errors"].append({"row": row_number, "error": "Both user and student are required"})
+            continue
+
+        batch.append((row_number, link_type, user_ref, student_ref))
+        if len(batch) >= settings.ROSTER_IMPORT_BATCH_SIZE:
+            _apply_batch(db, batch, seen, report)
+            batch = []
+
+    if batch:
+        _apply_batch(db, batch, seen, report)
+
+    logger.info(
+        f"Roster import processed {report['total_rows']} rows: {report['linked']} linked, "
+        f"{report['already_linked']} already linked, {report['failed']} failed"
+    )
+    return report
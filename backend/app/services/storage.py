@@ -0,0 +1,350 @@
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from jose import JWTError, jwt
+from typing import Any, Dict, Iterator, Optional
+from app.config.settings import settings
+import boto3
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Every key starts with this prefix; it doubles as the local directory and URL path
+UPLOADS_ROOT = "uploads"
+STAGING_DIRECTORY = os.path.join(UPLOADS_ROOT, ".staging")
+DIRECT_UPLOAD_AUDIENCE = "direct-upload"
+CHUNK_SIZE = 1024 * 1024
+
+class StorageError(Exception):
+    """Raised for invalid keys, bad upload tokens and backend failures"""
+
+def new_upload_key(filename: Optional[str]) -> str:
+    """Unique key for a new upload, keeping the client's file extension"""
+    extension = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    name = f"{uuid.uuid4()}.{extension}" if extension else str(uuid.uuid4())
+    return f"{UPLOADS_ROOT}/{name}"
+
+class StorageBackend:
+    """
+    Where uploaded files live. Keys are the relative paths kept in
+    EducationalContent.file_path ("uploads/<name>"), so rows written before
+    the backend became configurable stay valid under either backend.
+    """
+
+    name = "base"
+
+    def check(self) -> str:
+        """Make sure the store is reachable (warm-up step)"""
+        return self.name
+
+    def new_staging_path(self, suffix: str = "") -> str:
+        """Scratch file for data on its way into the store"""
+        return os.path.join(self.staging_directory(), f"{uuid.uuid4().hex}{suffix}")
+
+    def staging_directory(self) -> str:
+        return tempfile.gettempdir()
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None,
+                   cache_control: Optional[str] = None) -> None:
+        """Store a local file under key; on success the source file is gone"""
+        raise NotImplementedError
+
+    def store_directory(self, source_dir: str, prefix: str, cache_control: Optional[str] = None) -> None:
+        """Store every file of a local directory under prefix, replacing what was there"""
+        self.delete_prefix(prefix)
+        for root, _, files in os.walk(source_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, source_dir).replace(os.sep, "/")
+                self.store_file(f"{prefix}/{relative}", path, mimetypes.guess_type(name)[0], cache_control)
+        shutil.rmtree(source_dir, ignore_errors=True)
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None,
+                  cache_control: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def size(self, key: str) -> Optional[int]:
+        """Size in bytes, None when nothing is stored under key"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        return self.size(key) is not None
+
+    def delete(self, key: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of a stored file, when the backend keeps files on this host"""
+        return None
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        """A readable local file with the stored bytes, for tools like ffmpeg"""
+        _, extension = os.path.splitext(key)
+        path = self.new_staging_path(extension)
+        try:
+            self._download(key, path)
+            yield path
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _download(self, key: str, destination: str) -> None:
+        raise NotImplementedError
+
+    def read_chunks(self, key: str, offset: int = 0, length: Optional[int] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream length bytes (or the rest) of a stored file from offset"""
+        raise NotImplementedError
+
+    def url(self, key: Optional[str]) -> Optional[str]:
+        """URL clients fetch a stored file from"""
+        raise NotImplementedError
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int) -> Dict[str, Any]:
+        """
+        Instructions for uploading one file straight to the store:
+        the HTTP method, URL, form fields (POST) and headers to send.
+        """
+        raise NotImplementedError
+
+class LocalStorage(StorageBackend):
+    """Files under uploads/, served by the /uploads static mount"""
+
+    name = "local"
+
+    def check(self) -> str:
+        self.staging_directory()
+        return self.name
+
+    def staging_directory(self) -> str:
+        # Same filesystem as the files, so storing one is a rename
+        os.makedirs(STAGING_DIRECTORY, exist_ok=True)
+        return STAGING_DIRECTORY
+
+    def _path(self, key: str) -> str:
+        root = os.path.realpath(UPLOADS_ROOT)
+        path = os.path.realpath(key)
+        if not path.startswith(root + os.sep):
+            raise StorageError(f"Invalid storage key: {key}")
+        return path
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None,
+                   cache_control: Optional[str] = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(source_path, path)
+
+    def store_directory(self, source_dir: str, prefix: str, cache_control: Optional[str] = None) -> None:
+        path = self._path(prefix)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(source_dir, path)
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None,
+                  cache_control: Optional[str] = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.partial"
+        with open(tmp_path, "wb") as output:
+            output.write(data)
+        os.replace(tmp_path, path)
+
+    def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        return os.path.getsize(path) if os.path.isfile(path) else None
+
+    def delete(self, key: Optional[str]) -> None:
+        if key and os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+    def delete_prefix(self, prefix: str) -> None:
+        shutil.rmtree(self._path(prefix), ignore_errors=True)
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        yield self._path(key)
+
+    def read_chunks(self, key: str, offset: int = 0, length: Optional[int] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as source:
+            source.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = source.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def url(self, key: Optional[str]) -> Optional[str]:
+        return f"/{key}" if key else None
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int) -> Dict[str, Any]:
+        # Mirrors an S3 presigned PUT: the signed token is the only credential
+        token = jwt.encode(
+            {
+                "aud": DIRECT_UPLOAD_AUDIENCE,
+                "exp": datetime.utcnow() + timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRY),
+                "key": key,
+                "content_type": content_type,
+                "max_size": max_size,
+            },
+            settings.JWT_SECRET,
+            algorithm="HS256"
+        )
+        return {
+            "method": "PUT",
+            "url": f"/api/content/uploads/direct/{token}",
+            "fields": {},
+            "headers": {"Content-Type": content_type},
+        }
+
+    def read_upload_token(self, token: str) -> Dict[str, Any]:
+        """Claims of a token issued by presigned_upload"""
+        try:
+            return jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"], audience=DIRECT_UPLOAD_AUDIENCE)
+        except JWTError as e:
+            raise StorageError(f"Invalid upload token: {str(e)}")
+
+class S3Storage(StorageBackend):
+    """Any S3-compatible object store (AWS S3, MinIO, ...) holding STORAGE_BUCKET"""
+
+    name = "s3"
+
+    def __init__(self):
+        self.bucket = settings.STORAGE_BUCKET
+        config = Config(
+            signature_version="s3v4",
+            s3={"addressing_style": settings.S3_ADDRESSING_STYLE},
+            retries={"max_attempts": 3, "mode": "standard"},
+            max_pool_connections=settings.S3_MAX_CONNECTIONS
+        )
+        credentials = {
+            "region_name": settings.S3_REGION,
+            "aws_access_key_id": settings.S3_ACCESS_KEY_ID,
+            "aws_secret_access_key": settings.S3_SECRET_ACCESS_KEY,
+            "config": config,
+        }
+        self._client = boto3.client("s3", endpoint_url=settings.S3_ENDPOINT_URL, **credentials)
+        # Signing is offline; URLs handed to browsers must use the endpoint they can reach
+        self._signer = boto3.client(
+            "s3", endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL or settings.S3_ENDPOINT_URL, **credentials
+        )
+        self._transfer = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_SIZE
+        )
+
+    def check(self) -> str:
+        try:
+            self._client.head_bucket(Bucket=self.bucket)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchBucket") or not settings.is_development:
+                raise
+            # Local MinIO starts empty
+            self._client.create_bucket(Bucket=self.bucket)
+            logger.info(f"Created storage bucket {self.bucket}")
+        return self.name
+
+    def _extra_args(self, content_type: Optional[str], cache_control: Optional[str]) -> Dict[str, str]:
+        extra = {}
+        if content_type:
+            extra["ContentType"] = content_type
+        if cache_control:
+            extra["CacheControl"] = cache_control
+        return extra
+
+    def store_file(self, key: str, source_path: str, content_type: Optional[str] = None,
+                   cache_control: Optional[str] = None) -> None:
+        # Multipart above S3_MULTIPART_CHUNK_SIZE, reading the file a chunk at a time
+        self._client.upload_file(
+            source_path, self.bucket, key,
+            ExtraArgs=self._extra_args(content_type, cache_control),
+            Config=self._transfer
+        )
+        os.remove(source_path)
+
+    def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None,
+                  cache_control: Optional[str] = None) -> None:
+        self._client.put_object(Bucket=self.bucket, Key=key, Body=data, **self._extra_args(content_type, cache_control))
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def delete(self, key: Optional[str]) -> None:
+        if key:
+            self._client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/"):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                # A listing page holds at most 1000 keys, the delete_objects limit
+                self._client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    def _download(self, key: str, destination: str) -> None:
+        self._client.download_file(self.bucket, key, destination, Config=self._transfer)
+
+    def read_chunks(self, key: str, offset: int = 0, length: Optional[int] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        if length == 0:
+            return
+        end = "" if length is None else offset + length - 1
+        response = self._client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={offset}-{end}")
+        try:
+            yield from response["Body"].iter_chunks(chunk_size)
+        finally:
+            response["Body"].close()
+
+    def url(self, key: Optional[str]) -> Optional[str]:
+        if not key:
+            return None
+        if settings.S3_PUBLIC_URL:
+            return f"{settings.S3_PUBLIC_URL.rstrip('/')}/{key}"
+        return self._signer.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=settings.STORAGE_URL_EXPIRY
+        )
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int) -> Dict[str, Any]:
+        # A POST policy, unlike a presigned PUT, lets the store enforce the size limit
+        post = self._signer.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=settings.DIRECT_UPLOAD_EXPIRY
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+def _create_storage() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    return LocalStorage()
+
+storage = _create_storage()
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, List, Optional, Tuple
+from app.config.settings import settings
+from app.models.content import ContentAccess, ContentCategory, EducationalContent
+from app.models.sync import SyncTombstone
+from app.models.user import User
+import base64
+import hashlib
+import json
+
+TOKEN_VERSION = 1
+EPOCH = datetime(1970, 1, 1)
+# Order of the cursors inside a sync token
+STREAMS = ("categories", "contents", "progress", "tombstones")
+# Tombstone entity type -> key of the "deleted" lists in the response
+DELETED_KEYS = {"category": "categories", "content": "contents", "progress": "progress"}
+
+# A cursor is the (updated_at, id) of the last row returned; id None means
+# everything up to and including that time has been returned
+Cursor = Tuple[datetime, Optional[Any]]
+
+class SyncTokenError(ValueError):
+    """Raised for a sync token that cannot be used"""
+
+class SyncTokenExpired(SyncTokenError):
+    """Raised when deletions since the token may already be purged"""
+
+def _user_tag(user: User) -> str:
+    return hashlib.sha256(user.id.encode()).hexdigest()[:8]
+
+def _micros(moment: datetime) -> int:
+    return int((moment - EPOCH) / timedelta(microseconds=1))
+
+def encode_token(user: User, cursors: Dict[str, Cursor]) -> str:
+    """Compact opaque token: base64 of the per-stream cursors, bound to the user"""
+    payload = [TOKEN_VERSION, _user_tag(user)] + [
+        [_micros(cursors[stream][0]), cursors[stream][1]] for stream in STREAMS
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_token(token: str, user: User) -> Dict[str, Cursor]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        version, tag, *cursors = json.loads(raw)
+        decoded = {
+            stream: (EPOCH + timedelta(microseconds=int(micros)), last_id)
+            for stream, (micros, last_id) in zip(STREAMS, cursors)
+        }
+    except (ValueError, TypeError):
+        raise SyncTokenError("Malformed sync token")
+    if version != TOKEN_VERSION or len(decoded) != len(STREAMS):
+        raise SyncTokenError("Unsupported sync token")
+    if tag != _user_tag(user):
+        raise SyncTokenError("Sync token belongs to another user")
+    return decoded
+
+def _changed_after(timestamp_column, id_column, cursor: Cursor):
+    moment, last_id = cursor
+    if last_id is None:
+        return timestamp_column > moment
+    return or_(timestamp_column > moment, and_(timestamp_column == moment, id_column > last_id))
+
+def _page(query, timestamp_column, id_column, cursor: Cursor, horizon: datetime):
+    """Rows changed after the cursor up to the horizon, oldest first; True if more remain"""
+    rows = (
+        query.filter(_changed_after(timestamp_column, id_column, cursor), timestamp_column <= horizon)
+        .order_by(timestamp_column, id_column)
+        .limit(settings.SYNC_PAGE_SIZE + 1)
+        .all()
+    )
+    return rows[:settings.SYNC_PAGE_SIZE], len(rows) > settings.SYNC_PAGE_SIZE
+
+def _advance(rows: List, more: bool, horizon: datetime, timestamp_attr: str, cursor: Cursor) -> Cursor:
+    if more:
+        return getattr(rows[-1], timestamp_attr), rows[-1].id
+    # Caught up: later calls only look past the horizon
+    return max(horizon, cursor[0]), None
+
+def _can_view(content: EducationalContent, user: User) -> bool:
+    # Same rule as GET /content/{content_id}
+    return content.is_published or user.is_admin or content.uploaded_by == user.id
+
+def load_changes(db: Session, user: User, token: Optional[str]) -> Dict[str, Any]:
+    """
+    Categories, content and the user's progress changed or deleted since the
+    token (everything visible when there is none), one page per stream.
+    """
+    now = datetime.utcnow()
+    # Rows stamped just before now may belong to transactions that have not committed yet
+    horizon = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+
+    if token:
+        cursors = decode_token(token, user)
+        if cursors["tombstones"][0] < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            raise SyncTokenExpired("Sync token expired; start a full sync without a token")
+    else:
+        # A full sync has nothing to delete, but must see deletions from here on
+        cursors = {stream: (EPOCH, None) for stream in STREAMS}
+        cursors["tombstones"] = (horizon, None)
+
+    categories, more_categories = _page(
+        db.query(ContentCategory),
+        ContentCategory.updated_at, ContentCategory.id, cursors["categories"], horizon
+    )
+    contents, more_contents = _page(
+        db.query(EducationalContent).options(joinedload(EducationalContent.category)),
+        EducationalContent.updated_at, EducationalContent.id, cursors["contents"], horizon
+    )
+    progress, more_progress = _page(
+        db.query(ContentAccess).filter(ContentAccess.user_id == user.id),
+        ContentAccess.updated_at, ContentAccess.id, cursors["progress"], horizon
+    )
+    tombstones, more_tombstones = _page(
+        db.query(SyncTombstone).filter(
+            or_(SyncTombstone.entity_type != "progress", SyncTombstone.user_id == user.id),
+            # Categories are shared and have no tenant
+            or_(SyncTombstone.tenant_id == None, SyncTombstone.tenant_id == user.tenant_id)
+        ),
+        SyncTombstone.deleted_at, SyncTombstone.id, cursors["tombstones"], horizon
+    )
+
+    deleted: Dict[str, List[str]] = {key: [] for key in DELETED_KEYS.values()}
+    visible = []
+    for content in contents:
+        if _can_view(content, user):
+            visible.append(content)
+        elif token:
+            # Unpublished since the last sync: gone as far as this client is concerned
+            deleted["contents"].append(content.id)
+    for tombstone in tombstones:
+        deleted[DELETED_KEYS[tombstone.entity_type]].append(tombstone.entity_id)
+
+    next_cursors = {
+        "categories": _advance(categories, more_categories, horizon, "updated_at", cursors["categories"]),
+        "contents": _advance(contents, more_contents, horizon, "updated_at", cursors["contents"]),
+        "progress": _advance(progress, more_progress, horizon, "updated_at", cursors["progress"]),
+        "tombstones": _advance(tombstones, more_tombstones, horizon, "deleted_at", cursors["tombstones"]),
+    }
+    return {
+        "sync_token": encode_token(user, next_cursors),
+        "has_more": more_categories or more_contents or more_progress or more_tombstones,
+        "categories": categories,
+        "contents": visible,
+        "progress": progress,
+        "deleted": deleted,
+    }
+
+def purge_tombstones(db: Session, retention_days: int) -> int:
+    """Delete tombstones older than the retention window; tokens older than that must resync"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = db.query(SyncTombstone).filter(SyncTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,45 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker, with_loader_criteria
+from typing import List, Optional
+from app.models.tenant import DEFAULT_TENANT_ID, Tenant, TenantScoped, current_tenant
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Execution option that lets a statement see every school (maintenance and admin tooling)
+ALL_TENANTS = "all_tenants"
+
+def set_current_tenant(tenant_id: str) -> None:
+    """Scope the rest of the request to one school"""
+    current_tenant.set(tenant_id)
+
+def install_tenant_scoping(session_factory: sessionmaker) -> None:
+    """
+    Filter every ORM read of a tenant-scoped table to the current tenant,
+    including joins and relationship loads. Without a tenant (startup,
+    background jobs, scripts) statements are left alone.
+    """
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _scope_to_tenant(execute_state):
+        tenant_id = current_tenant.get()
+        if (
+            tenant_id is None
+            or not execute_state.is_select
+            or execute_state.is_column_load
+            or execute_state.execution_options.get(ALL_TENANTS, False)
+        ):
+            return
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(TenantScoped, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+        )
+
+def resolve_tenant(db: Session, slug: Optional[str]) -> Optional[Tenant]:
+    """Active tenant for a slug; the default school when no slug is given"""
+    query = db.query(Tenant).filter(Tenant.is_active == True)
+    if slug:
+        return query.filter(Tenant.slug == slug).first()
+    return query.filter(Tenant.id == DEFAULT_TENANT_ID).first()
+
+def active_tenant_ids(db: Session) -> List[str]:
+    return [tenant_id for (tenant_id,) in db.query(Tenant.id).filter(Tenant.is_active == True).all()]
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from app.config.settings import settings
+from app.config.firebase import verify_firebase_token
+import asyncio
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TokenVerificationTimeout(Exception):
+    """Raised when a token could not be verified within TOKEN_VERIFY_TIMEOUT"""
+
+class TokenVerifier:
+    """
+    Runs signature verification in a worker pool so the event loop keeps
+    serving while RSA checks run (the crypto releases the GIL). Requests
+    presenting the same token at the same time share one verification.
+    """
+
+    def __init__(self, verify: Callable[[str], dict], workers: int, timeout: float):
+        self.verify = verify
+        self.timeout = timeout
+        self.coalesced = 0
+        self.timed_out = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="token-verify")
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, token: str) -> dict:
+        key = hashlib.sha256(token.encode()).hexdigest()
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, self.verify, token)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        try:
+            # Shielded: one waiter timing out must not cancel the result the others wait for
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"Token verification exceeded {self.timeout}s")
+            raise TokenVerificationTimeout("Token verification timed out")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+verifier = TokenVerifier(verify_firebase_token, settings.TOKEN_VERIFY_WORKERS, settings.TOKEN_VERIFY_TIMEOUT)
+
+async def verify_id_token(token: str) -> dict:
+    """Verify a Firebase ID token off the event loop"""
+    return await verifier(token)
+
+def shutdown_token_verifier() -> None:
+    verifier.shutdown()
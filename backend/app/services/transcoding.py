@@ -0,0 +1,300 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from typing import Dict, List, Optional
+from app.config.settings import settings
+from app.database import get_db_session
+from app.models.content import EducationalContent, TranscodeStatus
+from app.services.catalogue import invalidate_catalogue
+from app.services.storage import storage
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Make sure StaticFiles serves HLS artifacts with the right media types
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+
+HLS_EXTENSIONS = (".m3u8", ".ts")
+SOURCE_RENDITION = "source"
+
+# Target video/audio bitrates (kbps) per rendition height
+LADDER_BITRATES = {
+    240: (400, 64),
+    360: (800, 96),
+    480: (1400, 128),
+    720: (2800, 128),
+    1080: (5000, 192),
+}
+
+PROGRESS_UPDATE_INTERVAL = 2.0  # Seconds between progress writes to the content row
+HLS_CACHE_CONTROL = f"public, max-age={settings.HLS_CACHE_MAX_AGE}, immutable"
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.TRANSCODE_WORKERS,
+    thread_name_prefix="transcode"
+)
+
+def hls_directory(file_path: str) -> str:
+    """Storage prefix holding the HLS ladder, next to the original blob"""
+    root, _ = os.path.splitext(file_path)
+    return f"{root}_hls"
+
+def probe_video(file_path: str) -> Dict:
+    """Read duration, dimensions and bitrate of a video with ffprobe"""
+    result = subprocess.run(
+        [
+            settings.FFPROBE_PATH, "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height:format=duration,bit_rate",
+            "-of", "json",
+            file_path
+        ],
+        check=True,
+        capture_output=True,
+        text=True
+    )
+    data = json.loads(result.stdout)
+    stream = (data.get("streams") or [{}])[0]
+    fmt = data.get("format", {})
+    return {
+        "duration": float(fmt.get("duration") or 0),
+        "bit_rate": int(fmt.get("bit_rate") or 0),
+        "width": int(stream.get("width") or 0),
+        "height": int(stream.get("height") or 0),
+    }
+
+def plan_ladder(source_height: int) -> List[str]:
+    """Pick renditions for a source, lowest first so playback can start early"""
+    renditions = [
+        f"{height}p" for height in settings.hls_renditions_list
+        if not source_height or height <= source_height
+    ]
+    if settings.HLS_INCLUDE_SOURCE or not renditions:
+        renditions.append(SOURCE_RENDITION)
+    return renditions
+
+def _rendition_height(rendition: str, probe: Dict) -> int:
+    if rendition == SOURCE_RENDITION:
+        return probe["height"]
+    return int(rendition.rstrip("p"))
+
+def _rendition_width(height: int, probe: Dict) -> int:
+    if not probe["height"]:
+        return 0
+    # Keep the source aspect ratio, rounded to an even width for the encoder
+    return int(round(probe["width"] * height / probe["height"] / 2) * 2)
+
+def _rendition_bandwidth(rendition: str, probe: Dict) -> int:
+    if rendition == SOURCE_RENDITION:
+        return probe["bit_rate"] or 8_000_000
+    height = _rendition_height(rendition, probe)
+    video_kbps, audio_kbps = LADDER_BITRATES.get(height, (height * 4, 128))
+    return (video_kbps + audio_kbps) * 1000
+
+def _encoder_args(rendition: str, probe: Dict) -> List[str]:
+    if rendition == SOURCE_RENDITION:
+        return ["-c", "copy"]
+
+    height = _rendition_height(rendition, probe)
+    video_kbps, audio_kbps = LADDER_BITRATES.get(height, (height * 4, 128))
+    segment = settings.HLS_SEGMENT_SECONDS
+    return [
+        "-vf", f"scale=-2:{height}",
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-profile:v", "main",
+        "-b:v", f"{video_kbps}k",
+        "-maxrate", f"{int(video_kbps * 1.07)}k",
+        "-bufsize", f"{video_kbps * 2}k",
+        # Align keyframes with segment boundaries so renditions can switch cleanly
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment})",
+        "-sc_threshold", "0",
+        "-c:a", "aac",
+        "-b:a", f"{audio_kbps}k",
+        "-ac", "2",
+    ]
+
+def _encode_rendition(source: str, output_dir: str, rendition: str, probe: Dict, on_progress) -> None:
+    """Run ffmpeg for a single rendition, reporting progress as a 0-1 fraction"""
+    command = [
+        settings.FFMPEG_PATH, "-hide_banner", "-nostdin", "-y",
+        "-loglevel", "error",
+        "-i", source,
+        *_encoder_args(rendition, probe),
+        "-f", "hls",
+        "-hls_time", str(settings.HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(output_dir, "segment_%05d.ts"),
+        "-progress", "pipe:1",
+        "-nostats",
+        os.path.join(output_dir, "index.m3u8"),
+    ]
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    duration_us = probe["duration"] * 1_000_000
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        if key == "out_time_us" and duration_us and value.isdigit():
+            on_progress(min(int(value) / duration_us, 1.0))
+
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed for {rendition}: {stderr.strip()[-500:]}")
+
+def _write_master_playlist(hls_prefix: str, ready: List[str], probe: Dict) -> str:
+    """
+    Store a new master playlist listing the renditions ready so far.
+    Each version gets its own key so published playlists never change
+    and can be cached as immutable.
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for rendition in sorted(ready, key=lambda r: _rendition_bandwidth(r, probe)):
+        height = _rendition_height(rendition, probe)
+        attributes = f"BANDWIDTH={_rendition_bandwidth(rendition, probe)}"
+        width = _rendition_width(height, probe)
+        if width and height:
+            attributes += f",RESOLUTION={width}x{height}"
+        lines.append(f"#EXT-X-STREAM-INF:{attributes}")
+        lines.append(f"{rendition}/index.m3u8")
+
+    master_key = f"{hls_prefix}/master-{len(ready)}.m3u8"
+    storage.put_bytes(
+        master_key,
+        ("\n".join(lines) + "\n").encode(),
+        content_type="application/vnd.apple.mpegurl",
+        cache_control=HLS_CACHE_CONTROL
+    )
+    return master_key
+
+def _update_content(content_id: str, **fields) -> None:
+    with get_db_session() as db:
+        content = db.get(EducationalContent, content_id)
+        if content:
+            content.update(fields)
+
+def package_video(content_id: str) -> None:
+    """Probe a video upload and package it into an HLS ladder"""
+    with get_db_session() as db:
+        content = db.get(EducationalContent, content_id)
+        if not content:
+            logger.warning(f"Skipping HLS packaging for missing content {content_id}")
+            return
+        source_key = content.file_path
+
+    hls_prefix = hls_directory(source_key)
+    try:
+        # Remote backends download the source once; renditions are encoded locally and stored as they finish
+        with storage.local_copy(source_key) as source:
+            probe = probe_video(source)
+            renditions = plan_ladder(probe["height"])
+            _update_content(
+                content_id,
+                transcode_status=TranscodeStatus.PROCESSING,
+                transcode_progress=0.0,
+                duration=int(round(probe["duration"])) or None
+            )
+
+            ready: List[str] = []
+            for index, rendition in enumerate(renditions):
+                last_update = 0.0
+
+                def on_progress(fraction: float) -> None:
+                    nonlocal last_update
+                    now = time.monotonic()
+                    if now - last_update >= PROGRESS_UPDATE_INTERVAL:
+                        last_update = now
+                        overall = (index + fraction) / len(renditions) * 100
+                        _update_content(content_id, transcode_progress=round(overall, 1))
+
+                # Encode into a scratch directory and publish it in one step
+                work_dir = tempfile.mkdtemp(prefix=f"{rendition}-", dir=storage.staging_directory())
+                try:
+                    _encode_rendition(source, work_dir, rendition, probe, on_progress)
+                    storage.store_directory(work_dir, f"{hls_prefix}/{rendition}", cache_control=HLS_CACHE_CONTROL)
+                except Exception as e:
+                    if rendition == SOURCE_RENDITION and ready:
+                        # Stream copy only works for HLS-compatible codecs; the encoded ladder still plays
+                        logger.warning(f"Skipping source rendition for {content_id}: {str(e)}")
+                        continue
+                    raise
+                finally:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+                ready.append(rendition)
+                master_key = _write_master_playlist(hls_prefix, ready, probe)
+                _update_content(
+                    content_id,
+                    hls_manifest_path=master_key,
+                    hls_renditions=",".join(ready),
+                    transcode_progress=round((index + 1) / len(renditions) * 100, 1)
+                )
+                invalidate_catalogue()
+                logger.info(f"HLS rendition {rendition} ready for content {content_id}")
+
+        _update_content(content_id, transcode_status=TranscodeStatus.READY, transcode_progress=100.0)
+        invalidate_catalogue()
+        logger.info(f"HLS packaging completed for content {content_id}")
+
+    except Exception as e:
+        logger.error(f"HLS packaging failed for content {content_id}: {str(e)}")
+        try:
+            _update_content(content_id, transcode_status=TranscodeStatus.FAILED)
+            invalidate_catalogue()
+        except Exception as db_error:
+            logger.error(f"Failed to record packaging failure for {content_id}: {str(db_error)}")
+
+def submit_video_packaging(content_id: str) -> None:
+    """Queue HLS packaging on the bounded transcode pool"""
+    _executor.submit(package_video, content_id)
+
+def requeue_stranded_packaging() -> int:
+    """
+    Queue again the videos whose packaging was lost with a restarted process:
+    still pending or processing, with no progress written for
+    TRANSCODE_STALE_SECONDS. Each is claimed by refreshing updated_at, and
+    locked rows are skipped, so workers checking together never both take one.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.TRANSCODE_STALE_SECONDS)
+    # Served by the partial idx_educational_content_transcode_pending
+    stranded = (
+        select(EducationalContent.id)
+        .where(
+            EducationalContent.transcode_status.in_([TranscodeStatus.PENDING, TranscodeStatus.PROCESSING]),
+            EducationalContent.updated_at < cutoff
+        )
+        .with_for_update(skip_locked=True)
+    )
+    with get_db_session() as db:
+        content_ids = db.execute(
+            update(EducationalContent)
+            .where(EducationalContent.id.in_(stranded))
+            .values(transcode_status=TranscodeStatus.PENDING, transcode_progress=0.0, updated_at=datetime.utcnow())
+            .returning(EducationalContent.id),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+
+    for content_id in content_ids:
+        logger.info(f"Re-queueing HLS packaging for content {content_id}")
+        submit_video_packaging(content_id)
+    return len(content_ids)
+
+def remove_hls_artifacts(file_path: Optional[str]) -> None:
+    """Remove the HLS ladder stored next to a blob"""
+    if file_path:
+        storage.delete_prefix(hls_directory(file_path))
+
+def shutdown_transcoder() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
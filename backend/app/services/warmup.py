@@ -0,0 +1,152 @@
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config.settings import settings
+from app.config.firebase import prime_signing_keys
+from app import database
+from app.services.access_tokens import revocations
+from app.models.tenant import current_tenant
+from app.services.catalogue import load_published_catalogue
+from app.services.partitions import ensure_content_access_partitions
+from app.services.storage import storage
+from app.services.transcoding import requeue_stranded_packaging
+from app.services.tenancy import active_tenant_ids
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class WarmupState:
+    """Tracks whether this worker has finished warming up and how long each step took"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        # Periodic jobs that are reported here but never hold readiness back
+        self.background: Dict[str, Dict[str, Any]] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "steps": self.steps,
+            "background": self.background,
+        }
+
+warmup_state = WarmupState()
+
+def _prime_catalogue() -> int:
+    primed = 0
+    with database.get_db_session() as db:
+        # Catalogue pages are cached per school
+        for tenant_id in active_tenant_ids(db):
+            token = current_tenant.set(tenant_id)
+            try:
+                primed += len(load_published_catalogue(db))
+            finally:
+                current_tenant.reset(token)
+    return primed
+
+def _load_revocations() -> int:
+    with database.get_db_session() as db:
+        return revocations.load(db)
+
+def _ensure_partitions() -> int:
+    with database.get_db_session() as db:
+        return ensure_content_access_partitions(db)
+
+# Ordered warm-up steps; each returns a small detail value for the readiness report
+WARMUP_STEPS: List[Tuple[str, Callable[[], Any]]] = [
+    ("database_pool", database.warm_pool),
+    ("catalogue_cache", _prime_catalogue),
+    ("token_revocations", _load_revocations),
+    ("storage", storage.check),
+]
+
+async def _run_step(name: str, step: Callable[[], Any], report: Dict[str, Dict[str, Any]]) -> bool:
+    """Run one step in the threadpool and record its outcome under name in report"""
+    start = time.perf_counter()
+    try:
+        detail = await run_in_threadpool(step)
+        report[name] = {
+            "ok": True,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "detail": detail,
+        }
+        logger.info(f"Step {name} completed in {report[name]['duration_ms']}ms")
+        return True
+    except Exception as e:
+        report[name] = {
+            "ok": False,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "error": str(e),
+        }
+        logger.error(f"Step {name} failed: {str(e)}")
+        return False
+
+async def run_warmup() -> None:
+    """Run every warm-up step, retrying failed ones until the worker is ready"""
+    warmup_state.started_at = time.time()
+    pending = list(WARMUP_STEPS)
+
+    while pending:
+        failed = []
+        for name, step in pending:
+            if not await _run_step(name, step, warmup_state.steps):
+                failed.append((name, step))
+
+        pending = failed
+        if pending:
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+    warmup_state.completed_at = time.time()
+    warmup_state.ready = True
+    logger.info(f"Warm-up completed in {warmup_state.completed_at - warmup_state.started_at:.2f}s")
+
+# Best-effort steps: run once alongside the warm-up and reported, but never awaited for readiness
+BACKGROUND_STEPS: List[Tuple[str, Callable[[], Any]]] = [
+    ("signing_keys", prime_signing_keys),
+]
+
+async def run_background_warmup() -> None:
+    """Run every best-effort step once; a failure only costs the first request some latency"""
+    for name, step in BACKGROUND_STEPS:
+        await _run_step(name, step, warmup_state.background)
+
+async def _run_periodically(name: str, step: Callable[[], Any], interval: float) -> None:
+    while True:
+        await _run_step(name, step, warmup_state.background)
+        warmup_state.background[name]["checked_at"] = time.time()
+        await asyncio.sleep(interval)
+
+async def run_partition_maintenance() -> None:
+    """
+    Keep future content_access partitions in place, now and every
+    PARTITION_CHECK_SECONDS. Rows for a missing month land in the default
+    partition meanwhile, so a failure is reported but does not affect
+    readiness; the next round tries again.
+    """
+    await _run_periodically("access_partitions", _ensure_partitions, settings.PARTITION_CHECK_SECONDS)
+
+async def run_packaging_recovery() -> None:
+    """
+    Re-queue video packaging lost with a previous process, now and every
+    TRANSCODE_STALE_SECONDS; the packaging pool lives only in memory.
+    """
+    await _run_periodically("packaging_queue", requeue_stranded_packaging, settings.TRANSCODE_STALE_SECONDS)
+
+_probe_checked_at = 0.0
+_probe_ok = False
+_probe_lock = asyncio.Lock()
+
+async def database_reachable() -> bool:
+    """Database reachability, re-checked at most every READINESS_PROBE_TTL seconds"""
+    global _probe_checked_at, _probe_ok
+    async with _probe_lock:
+        if time.monotonic() - _probe_checked_at >= settings.READINESS_PROBE_TTL:
+            _probe_ok = await run_in_threadpool(database.ping_database)
+            _probe_checked_at = time.monotonic()
+        return _probe_ok
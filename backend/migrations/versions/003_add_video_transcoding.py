@@ -0,0 +1,48 @@
+"""add video transcoding columns
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Create enum type for HLS packaging status
+    op.execute("CREATE TYPE transcode_status AS ENUM ('pending', 'processing', 'ready', 'failed')")
+    
+    op.add_column(
+        'educational_content',
+        sa.Column('transcode_status', postgresql.ENUM('pending', 'processing', 'ready', 'failed', name='transcode_status', create_type=False), nullable=True)
+    )
+    op.add_column(
+        'educational_content',
+        sa.Column('transcode_progress', sa.Float(), nullable=False, server_default='0')
+    )
+    op.add_column('educational_content', sa.Column('hls_manifest_path', sa.String(), nullable=True))
+    op.add_column('educational_content', sa.Column('hls_renditions', sa.String(), nullable=True))
+    
+    # Partial index so the packaging queue can be scanned without touching finished rows
+    op.create_index(
+        'idx_educational_content_transcode_pending',
+        'educational_content',
+        ['transcode_status'],
+        postgresql_where=sa.text("transcode_status IN ('pending', 'processing')")
+    )
+
+def downgrade():
+    op.drop_index('idx_educational_content_transcode_pending')
+    op.drop_column('educational_content', 'hls_renditions')
+    op.drop_column('educational_content', 'hls_manifest_path')
+    op.drop_column('educational_content', 'transcode_progress')
+    op.drop_column('educational_content', 'transcode_status')
+    
+    # Drop enum type
+    op.execute('DROP TYPE transcode_status')
@@ -0,0 +1,63 @@
+"""create progress rollup tables
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def _counter_columns():
+    return [
+        sa.Column('started', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress_total', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('last_accessed', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+    ]
+
+def upgrade():
+    # Per-student totals across all content
+    op.create_table(
+        'student_progress_rollups',
+        sa.Column('student_id', sa.String(), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id')
+    )
+    
+    # Per-content totals across all students
+    op.create_table(
+        'content_progress_rollups',
+        sa.Column('content_id', sa.String(), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['content_id'], ['educational_content.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('content_id')
+    )
+    
+    # Per-student totals for each category
+    op.create_table(
+        'student_category_progress_rollups',
+        sa.Column('student_id', sa.String(), nullable=False),
+        sa.Column('category_id', sa.String(), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['category_id'], ['content_categories.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id', 'category_id')
+    )
+    
+    # Rebuilds and the consistency checker aggregate content_access per user/content pair
+    op.create_index('idx_content_access_user_content', 'content_access', ['user_id', 'content_id'])
+
+def downgrade():
+    op.drop_index('idx_content_access_user_content')
+    op.drop_table('student_category_progress_rollups')
+    op.drop_table('content_progress_rollups')
+    op.drop_table('student_progress_rollups')
@@ -0,0 +1,53 @@
+"""create content recommendations tables
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'content_recommendations',
+        sa.Column('content_id', sa.String(), nullable=False),
+        sa.Column('related_content_id', sa.String(), nullable=False),
+        sa.Column('rank', sa.SmallInteger(), nullable=False),
+        sa.Column('score', sa.REAL(), nullable=False),
+        sa.Column('support', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['content_id'], ['educational_content.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_content_id'], ['educational_content.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('content_id', 'related_content_id')
+    )
+    
+    # Serving reads one item's neighbours in rank order
+    op.create_index('idx_content_recommendations_rank', 'content_recommendations', ['content_id', 'rank'])
+    # Needed for the cascade when the related item is deleted
+    op.create_index('idx_content_recommendations_related', 'content_recommendations', ['related_content_id'])
+    
+    op.create_table(
+        'job_watermarks',
+        sa.Column('job_name', sa.String(), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('job_name')
+    )
+    
+    # Incremental refresh looks up items with access rows created since the last run
+    op.create_index('idx_content_access_created_at', 'content_access', ['created_at'])
+
+def downgrade():
+    op.drop_index('idx_content_access_created_at')
+    op.drop_table('job_watermarks')
+    op.drop_index('idx_content_recommendations_related')
+    op.drop_index('idx_content_recommendations_rank')
+    op.drop_table('content_recommendations')
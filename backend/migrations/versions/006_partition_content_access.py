@@ -0,0 +1,128 @@
+"""partition content_access by month on last_accessed
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# Creates monthly partitions from `from_month` up to `months_ahead` months past the current one.
+# Called by the app at startup and by the archival command, so future months always exist.
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_content_access_partitions(
+    months_ahead integer DEFAULT 3,
+    from_month date DEFAULT date_trunc('month', now())::date
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month)::date;
+    last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    -- Several workers call this at startup
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_content_access_partitions'));
+    WHILE month_start <= last_month LOOP
+        partition_name := format('content_access_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF content_access FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+def upgrade():
+    # Move the heap table aside; its index and key names are needed for the new table
+    op.execute("ALTER TABLE content_access RENAME TO content_access_legacy")
+    op.execute("ALTER TABLE content_access_legacy RENAME CONSTRAINT content_access_pkey TO content_access_legacy_pkey")
+    for index in ('idx_content_access_user', 'idx_content_access_content',
+                  'idx_content_access_user_content', 'idx_content_access_created_at'):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_legacy")
+    
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE content_access (
+            id VARCHAR NOT NULL,
+            content_id VARCHAR NOT NULL REFERENCES educational_content (id) ON DELETE CASCADE,
+            user_id VARCHAR NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            last_accessed TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            progress FLOAT NOT NULL DEFAULT 0,
+            completed BOOLEAN NOT NULL DEFAULT false,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT content_access_pkey PRIMARY KEY (id, last_accessed)
+        ) PARTITION BY RANGE (last_accessed)
+    """)
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    
+    # Partitions for every month present in the existing data, plus three months ahead
+    op.execute("""
+        SELECT ensure_content_access_partitions(
+            3,
+            coalesce((SELECT min(last_accessed) FROM content_access_legacy), now())::date
+        )
+    """)
+    # Catches rows outside any monthly range instead of failing the insert
+    op.execute("CREATE TABLE content_access_default PARTITION OF content_access DEFAULT")
+    
+    # Indexes on the parent cascade to every partition
+    op.create_index('idx_content_access_user', 'content_access', ['user_id'])
+    op.create_index('idx_content_access_content', 'content_access', ['content_id'])
+    op.create_index('idx_content_access_user_content', 'content_access', ['user_id', 'content_id'])
+    # Time columns grow with insertion order, so BRIN stays tiny compared to B-tree
+    op.create_index('idx_content_access_last_accessed_brin', 'content_access', ['last_accessed'], postgresql_using='brin')
+    op.create_index('idx_content_access_created_at_brin', 'content_access', ['created_at'], postgresql_using='brin')
+    
+    op.execute("""
+        INSERT INTO content_access (id, content_id, user_id, last_accessed, progress, completed, created_at, updated_at)
+        SELECT id, content_id, user_id, last_accessed, progress, completed, created_at, updated_at
+        FROM content_access_legacy
+    """)
+    op.drop_table('content_access_legacy')
+
+def downgrade():
+    op.execute("ALTER TABLE content_access RENAME TO content_access_partitioned")
+    op.execute("ALTER TABLE content_access_partitioned RENAME CONSTRAINT content_access_pkey TO content_access_partitioned_pkey")
+    for index in ('idx_content_access_user', 'idx_content_access_content', 'idx_content_access_user_content'):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_partitioned")
+    
+    op.create_table(
+        'content_access',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('content_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('last_accessed', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('progress', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['content_id'], ['educational_content.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("""
+        INSERT INTO content_access (id, content_id, user_id, last_accessed, progress, completed, created_at, updated_at)
+        SELECT id, content_id, user_id, last_accessed, progress, completed, created_at, updated_at
+        FROM content_access_partitioned
+    """)
+    op.execute("DROP TABLE content_access_partitioned CASCADE")
+    op.execute("DROP FUNCTION ensure_content_access_partitions(integer, date)")
+    
+    op.create_index('idx_content_access_user', 'content_access', ['user_id'])
+    op.create_index('idx_content_access_content', 'content_access', ['content_id'])
+    op.create_index('idx_content_access_user_content', 'content_access', ['user_id', 'content_id'])
+    op.create_index('idx_content_access_created_at', 'content_access', ['created_at'])
@@ -0,0 +1,37 @@
+"""add partial indexes for the published catalogue
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# Non-admin catalogue queries always filter is_published = true and sort newest first,
+# so every index is partial on published rows and ends with the sort key
+PUBLISHED = sa.text("is_published")
+
+CATALOGUE_INDEXES = {
+    'idx_educational_content_published_recent': ['created_at', 'id'],
+    'idx_educational_content_published_category': ['category_id', 'created_at', 'id'],
+    'idx_educational_content_published_type': ['content_type', 'created_at', 'id'],
+    'idx_educational_content_published_uploader': ['uploaded_by', 'created_at', 'id'],
+    'idx_educational_content_published_views': ['view_count'],
+}
+
+def upgrade():
+    for name, columns in CATALOGUE_INDEXES.items():
+        op.create_index(name, 'educational_content', columns, postgresql_where=PUBLISHED)
+    
+    # Refresh planner statistics so the new indexes are considered right away
+    op.execute("ANALYZE educational_content")
+
+def downgrade():
+    for name in CATALOGUE_INDEXES:
+        op.drop_index(name)
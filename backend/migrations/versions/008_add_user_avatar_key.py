@@ -0,0 +1,21 @@
+"""add avatar key to users
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # SHA-256 of the uploaded avatar; resized derivatives are stored under that name
+    op.add_column('users', sa.Column('avatar_key', sa.String(), nullable=True))
+
+def downgrade():
+    op.drop_column('users', 'avatar_key')
@@ -0,0 +1,131 @@
+"""add uuid shadow columns for string keys
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 15:00:00.000000
+
+First half of the online switch from varchar to native uuid keys:
+  009  adds a uuid shadow column next to every key column, keeps it in sync
+       with a trigger and pre-builds the shadow indexes concurrently
+       python -m scripts.backfill_uuid_columns  fills existing rows in batches
+  010  swaps the shadow columns in under a short lock
+"""
+from alembic import op
+import re
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+# Key columns converted to uuid, per table
+UUID_COLUMNS = {
+    'users': ['id'],
+    'content_categories': ['id'],
+    'educational_content': ['id', 'category_id', 'uploaded_by'],
+    'content_access': ['id', 'content_id', 'user_id'],
+    'content_comments': ['id', 'content_id', 'user_id'],
+    'guardian_student': ['guardian_id', 'student_id'],
+    'teacher_student': ['teacher_id', 'student_id'],
+    'student_progress_rollups': ['student_id'],
+    'content_progress_rollups': ['content_id'],
+    'student_category_progress_rollups': ['student_id', 'category_id'],
+    'content_recommendations': ['content_id', 'related_content_id'],
+}
+
+# Copies each column named in the trigger arguments into its <column>_uuid shadow
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_uuid_shadow_columns() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    column_name text;
+    patch jsonb := '{}';
+BEGIN
+    FOREACH column_name IN ARRAY TG_ARGV LOOP
+        patch := patch || jsonb_build_object(column_name || '_uuid', to_jsonb(NEW) ->> column_name);
+    END LOOP;
+    NEW := jsonb_populate_record(NEW, patch);
+    RETURN NEW;
+END;
+$$;
+"""
+
+def _is_partitioned(bind, table):
+    return bind.exec_driver_sql(
+        f"SELECT relkind = 'p' FROM pg_class WHERE oid = '{table}'::regclass"
+    ).scalar()
+
+def _partitions(bind, table):
+    return [row[0] for row in bind.exec_driver_sql(
+        f"SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = '{table}'::regclass ORDER BY 1"
+    )]
+
+def _shadow_definition(definition, columns):
+    """Index definition rewritten onto the shadow columns, from USING onwards"""
+    using = definition[definition.index(" USING "):]
+    for column in columns:
+        using = re.sub(rf'\b{column}\b', f'{column}_uuid', using)
+    return using
+
+def shadow_indexes(bind, table, columns):
+    """(name, is primary key, UNIQUE prefix, rewritten definition) of indexes on converted columns"""
+    rows = bind.exec_driver_sql(f"""
+        SELECT c.relname, i.indisprimary, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = '{table}'::regclass
+    """).all()
+    indexes = []
+    for name, primary, definition in rows:
+        rewritten = _shadow_definition(definition, columns)
+        if rewritten != definition[definition.index(" USING "):]:
+            unique = "UNIQUE " if " UNIQUE " in definition[:definition.index(" ON ")] else ""
+            indexes.append((name, primary, unique, rewritten))
+    return indexes
+
+def upgrade():
+    bind = op.get_bind()
+    op.execute(SYNC_FUNCTION)
+
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ADD COLUMN {column}_uuid uuid")
+            # Proven by the backfill, so 010 can set NOT NULL without a scan under lock
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_uuid_not_null "
+                f"CHECK ({column}_uuid IS NOT NULL) NOT VALID"
+            )
+        arguments = ", ".join(f"'{column}'" for column in columns)
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_uuid BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION sync_uuid_shadow_columns({arguments})"
+        )
+
+    # Index builds must not block writes, so they run outside the migration transaction
+    with op.get_context().autocommit_block():
+        for table, columns in UUID_COLUMNS.items():
+            partitioned = _is_partitioned(bind, table)
+            for position, (name, primary, unique, definition) in enumerate(shadow_indexes(bind, table, columns)):
+                if not partitioned:
+                    op.execute(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {name}_uuid ON {table}{definition}")
+                    continue
+
+                # Partitioned parents can't build concurrently: each partition is built on its own.
+                # The primary key's partition indexes stay unattached; adding the key in 010 adopts them.
+                if not primary:
+                    op.execute(f"CREATE {unique}INDEX IF NOT EXISTS {name}_uuid ON ONLY {table}{definition}")
+                for partition in _partitions(bind, table):
+                    partition_index = f"{partition}_uuid_{'pkey' if primary else position}"
+                    op.execute(
+                        f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition}{definition}"
+                    )
+                    if not primary:
+                        op.execute(f"ALTER INDEX {name}_uuid ATTACH PARTITION {partition_index}")
+
+def downgrade():
+    for table, columns in UUID_COLUMNS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_uuid ON {table}")
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{column}_uuid_not_null")
+            # Drops the shadow indexes with it
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}_uuid CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS sync_uuid_shadow_columns()")
@@ -0,0 +1,183 @@
+"""swap uuid shadow columns in for string keys
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 15:30:00.000000
+
+Second half of the online switch to native uuid keys. Requires every shadow
+column to be filled, by the backfill (python -m scripts.backfill_uuid_columns)
+or, on a new install, by the trigger alone. Every shadow column and index
+already exists, so the locked section only drops, renames and re-attaches
+constraints. Foreign keys of partitioned tables need a full
+check and are restored by 018 instead, outside this lock.
+"""
+from alembic import op
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# Same tables and columns as 009
+UUID_COLUMNS = {
+    'users': ['id'],
+    'content_categories': ['id'],
+    'educational_content': ['id', 'category_id', 'uploaded_by'],
+    'content_access': ['id', 'content_id', 'user_id'],
+    'content_comments': ['id', 'content_id', 'user_id'],
+    'guardian_student': ['guardian_id', 'student_id'],
+    'teacher_student': ['teacher_id', 'student_id'],
+    'student_progress_rollups': ['student_id'],
+    'content_progress_rollups': ['content_id'],
+    'student_category_progress_rollups': ['student_id', 'category_id'],
+    'content_recommendations': ['content_id', 'related_content_id'],
+}
+
+def _table_list():
+    return ", ".join(f"'{table}'::regclass" for table in UUID_COLUMNS)
+
+def _is_partitioned(bind, table):
+    return bind.exec_driver_sql(
+        f"SELECT relkind = 'p' FROM pg_class WHERE oid = '{table}'::regclass"
+    ).scalar()
+
+def _foreign_keys(bind):
+    """(table, name, definition) of the foreign keys declared on converted tables"""
+    return bind.exec_driver_sql(f"""
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conparentid = 0 AND conrelid IN ({_table_list()})
+        ORDER BY 1, 2
+    """).all()
+
+def _primary_key(bind, table):
+    return bind.exec_driver_sql(f"""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE contype = 'p' AND conrelid = '{table}'::regclass
+    """).one()
+
+def _partitions(bind, table):
+    return [row[0] for row in bind.exec_driver_sql(
+        f"SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = '{table}'::regclass ORDER BY 1"
+    )]
+
+def _primary_key_columns(bind, table):
+    return [row[0] for row in bind.exec_driver_sql(f"""
+        SELECT a.attname FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = '{table}'::regclass AND i.indisprimary
+        ORDER BY array_position(i.indkey::int2[], a.attnum)
+    """)]
+
+def _shadow_indexes(bind, table):
+    return [row[0] for row in bind.exec_driver_sql(f"""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = '{table}'::regclass AND c.relname LIKE '%\\_uuid'
+    """)]
+
+def _unvalidated_checks(bind):
+    """(table, constraint) of shadow NOT NULL checks the backfill has not validated yet"""
+    return bind.exec_driver_sql(f"""
+        SELECT conrelid::regclass::text, conname FROM pg_constraint
+        WHERE contype = 'c' AND NOT convalidated AND conname LIKE '%\\_uuid\\_not\\_null'
+          AND conrelid IN ({_table_list()})
+        ORDER BY 1, 2
+    """).all()
+
+def upgrade():
+    bind = op.get_bind()
+
+    # Nothing to backfill (a new install, or tables the trigger filled from the start):
+    # validate here instead of requiring the backfill script. VALIDATE does not block writes.
+    with op.get_context().autocommit_block():
+        for table, constraint in _unvalidated_checks(bind):
+            column = constraint[len(f"{table}_"):-len("_not_null")]
+            missing = bind.exec_driver_sql(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE {column} IS NULL)").scalar()
+            if not missing:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+
+    pending = [f"{table}.{constraint}" for table, constraint in _unvalidated_checks(bind)]
+    if pending:
+        raise RuntimeError(
+            f"UUID backfill incomplete ({', '.join(pending)}); run python -m scripts.backfill_uuid_columns first"
+        )
+
+    # 009 built a key index on the shadow columns for every partition it saw; partitions
+    # created since then get theirs here, before anything is locked
+    with op.get_context().autocommit_block():
+        for table, columns in UUID_COLUMNS.items():
+            if not _is_partitioned(bind, table):
+                continue
+            key = ", ".join(
+                f"{column}_uuid" if column in columns else column for column in _primary_key_columns(bind, table)
+            )
+            for partition in _partitions(bind, table):
+                op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {partition}_uuid_pkey ON {partition} ({key})")
+
+    # Fail fast instead of queueing behind long transactions while holding locks
+    op.execute("SET LOCAL lock_timeout = '10s'")
+
+    foreign_keys = _foreign_keys(bind)
+    for table, name, _ in foreign_keys:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+
+    partitioned_tables = set()
+    for table, columns in UUID_COLUMNS.items():
+        partitioned = _is_partitioned(bind, table)
+        if partitioned:
+            partitioned_tables.add(table)
+        primary_key, primary_key_definition = _primary_key(bind, table)
+        shadow_indexes = _shadow_indexes(bind, table)
+
+        op.execute(f"DROP TRIGGER {table}_sync_uuid ON {table}")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {primary_key}")
+        for column in columns:
+            # Indexes on the old column go with it; their shadow copies take over the names below
+            op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+            op.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_uuid TO {column}")
+            # The validated check constraint lets this skip the table scan
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_{column}_uuid_not_null")
+
+        for index in shadow_indexes:
+            if index != f"{primary_key}_uuid":
+                op.execute(f"ALTER INDEX {index} RENAME TO {index[:-len('_uuid')]}")
+
+        if partitioned:
+            # The parent key only attaches partition indexes that already back a key constraint,
+            # so each partition's prebuilt index becomes its key first; otherwise all are rebuilt here
+            for partition in _partitions(bind, table):
+                op.execute(
+                    f"ALTER TABLE {partition} ADD CONSTRAINT {partition}_pkey PRIMARY KEY USING INDEX {partition}_uuid_pkey"
+                )
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {primary_key} {primary_key_definition}")
+        else:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {primary_key} PRIMARY KEY USING INDEX {primary_key}_uuid")
+
+    # Foreign keys on partitioned tables can't be added NOT VALID, and checking them here would
+    # scan the largest table while every converted table is locked; 018 restores them
+    for table, name, definition in foreign_keys:
+        if table not in partitioned_tables:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID")
+
+    op.execute("DROP FUNCTION sync_uuid_shadow_columns()")
+
+    # Validation only takes a SHARE UPDATE EXCLUSIVE lock, so writes continue meanwhile
+    with op.get_context().autocommit_block():
+        for table, name, _ in foreign_keys:
+            if table not in partitioned_tables:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+def downgrade():
+    # Offline: converting back rewrites every table
+    bind = op.get_bind()
+    foreign_keys = _foreign_keys(bind)
+    for table, name, _ in foreign_keys:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar USING {column}::text")
+
+    for table, name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
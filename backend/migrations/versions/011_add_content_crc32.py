@@ -0,0 +1,22 @@
+"""add crc32 checksum to educational content
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # CRC-32 of the stored file, needed up front to lay out category ZIP bundles;
+    # existing rows are filled in the first time their category is bundled
+    op.add_column('educational_content', sa.Column('crc32', sa.BigInteger(), nullable=True))
+
+def downgrade():
+    op.drop_column('educational_content', 'crc32')
@@ -0,0 +1,77 @@
+"""create sync tombstones and change-feed indexes
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 17:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# Table and the entity type its deletions are reported as by GET /api/sync
+TOMBSTONED_TABLES = {
+    'content_categories': 'category',
+    'educational_content': 'content',
+    'content_access': 'progress',
+}
+
+# Keyset indexes for "changed since (updated_at, id)" scans
+SYNC_INDEXES = {
+    'idx_content_categories_sync': ('content_categories', ['updated_at', 'id']),
+    'idx_educational_content_sync': ('educational_content', ['updated_at', 'id']),
+    'idx_content_access_user_sync': ('content_access', ['user_id', 'updated_at', 'id']),
+}
+
+# Any delete, however it is issued, leaves a tombstone. user_id scopes
+# per-user rows (progress) and is NULL for shared ones.
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted_at timestamp := timezone('utc', clock_timestamp());
+BEGIN
+    INSERT INTO sync_tombstones (entity_type, entity_id, user_id, deleted_at, created_at, updated_at)
+    VALUES (TG_ARGV[0], OLD.id, (to_jsonb(OLD) ->> 'user_id')::uuid, deleted_at, deleted_at, deleted_at);
+    RETURN OLD;
+END;
+$$;
+"""
+
+def upgrade():
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('entity_type', sa.String(32), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False)
+    )
+    op.create_index('idx_sync_tombstones_deleted', 'sync_tombstones', ['deleted_at', 'id'])
+    
+    op.execute(TOMBSTONE_FUNCTION)
+    for table, entity_type in TOMBSTONED_TABLES.items():
+        op.execute(f"""
+            CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('{entity_type}')
+        """)
+    
+    # On the partitioned content_access this also creates the index on every partition
+    for name, (table, columns) in SYNC_INDEXES.items():
+        op.create_index(name, table, columns)
+
+def downgrade():
+    for name, (table, _) in SYNC_INDEXES.items():
+        op.drop_index(name, table_name=table)
+    for table in TOMBSTONED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_sync_tombstone ON {table}")
+    op.execute("DROP FUNCTION record_sync_tombstone()")
+    op.drop_index('idx_sync_tombstones_deleted', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
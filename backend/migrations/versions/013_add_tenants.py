@@ -0,0 +1,199 @@
+"""add tenants and tenant-led indexes
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 18:30:00.000000
+
+Stays online like 009/010: the tenant foreign keys are added NOT VALID and
+validated without blocking writes, and the indexes are built concurrently
+(per partition on content_access) outside the migration transaction.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+# Every existing row belongs to this school (app.models.tenant.DEFAULT_TENANT_ID)
+DEFAULT_TENANT_ID = '01a152c6-8f79-757a-b3be-2e54fbdf72a7'
+
+TENANT_TABLES = ['users', 'educational_content', 'content_access']
+
+# Every request is scoped to one school, so these replace the indexes they shadow
+# (the catalogue indexes from 007 and the change-feed keyset from 012)
+PUBLISHED = sa.text("is_published")
+TENANT_INDEXES = {
+    'idx_users_tenant_role': ('users', ['tenant_id', 'role', 'full_name'], None),
+    'idx_educational_content_tenant_published_recent': (
+        'educational_content', ['tenant_id', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_tenant_published_category': (
+        'educational_content', ['tenant_id', 'category_id', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_tenant_published_type': (
+        'educational_content', ['tenant_id', 'content_type', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_tenant_published_uploader': (
+        'educational_content', ['tenant_id', 'uploaded_by', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_tenant_published_views': (
+        'educational_content', ['tenant_id', 'view_count'], PUBLISHED),
+    'idx_educational_content_tenant_sync': ('educational_content', ['tenant_id', 'updated_at', 'id'], None),
+    'idx_content_access_tenant_user_content': ('content_access', ['tenant_id', 'user_id', 'content_id'], None),
+    'idx_content_access_tenant_last_accessed': ('content_access', ['tenant_id', 'last_accessed'], None),
+}
+REPLACED_INDEXES = {
+    'idx_educational_content_published_recent': ('educational_content', ['created_at', 'id'], PUBLISHED),
+    'idx_educational_content_published_category': (
+        'educational_content', ['category_id', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_published_type': ('educational_content', ['content_type', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_published_uploader': (
+        'educational_content', ['uploaded_by', 'created_at', 'id'], PUBLISHED),
+    'idx_educational_content_published_views': ('educational_content', ['view_count'], PUBLISHED),
+    'idx_educational_content_sync': ('educational_content', ['updated_at', 'id'], None),
+    'idx_content_access_user_content': ('content_access', ['user_id', 'content_id'], None),
+}
+
+# Tombstones carry the school of the deleted row so the change feed stays per school
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted_at timestamp := timezone('utc', clock_timestamp());
+BEGIN
+    INSERT INTO sync_tombstones (entity_type, entity_id, user_id, tenant_id, deleted_at, created_at, updated_at)
+    VALUES (
+        TG_ARGV[0], OLD.id, (to_jsonb(OLD) ->> 'user_id')::uuid, (to_jsonb(OLD) ->> 'tenant_id')::uuid,
+        deleted_at, deleted_at, deleted_at
+    );
+    RETURN OLD;
+END;
+$$;
+"""
+
+PREVIOUS_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted_at timestamp := timezone('utc', clock_timestamp());
+BEGIN
+    INSERT INTO sync_tombstones (entity_type, entity_id, user_id, deleted_at, created_at, updated_at)
+    VALUES (TG_ARGV[0], OLD.id, (to_jsonb(OLD) ->> 'user_id')::uuid, deleted_at, deleted_at, deleted_at);
+    RETURN OLD;
+END;
+$$;
+"""
+
+def _create_indexes(indexes):
+    for name, (table, columns, where) in indexes.items():
+        op.create_index(name, table, columns, postgresql_where=where)
+
+def _drop_indexes(indexes):
+    for name, (table, _, _) in indexes.items():
+        op.drop_index(name, table_name=table)
+
+def _is_partitioned(bind, table):
+    return bind.exec_driver_sql(
+        f"SELECT relkind = 'p' FROM pg_class WHERE oid = '{table}'::regclass"
+    ).scalar()
+
+def _partitions(bind, table):
+    return [row[0] for row in bind.exec_driver_sql(
+        f"SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = '{table}'::regclass ORDER BY 1"
+    )]
+
+def _constraint_exists(bind, table, name):
+    return bind.exec_driver_sql(
+        f"SELECT 1 FROM pg_constraint WHERE conrelid = '{table}'::regclass AND conname = '{name}'"
+    ).scalar() is not None
+
+def _create_indexes_concurrently(bind, indexes):
+    """Must run in an autocommit block"""
+    for name, (table, columns, where) in indexes.items():
+        definition = f"({', '.join(columns)})" + (f" WHERE {where}" if where is not None else "")
+        if not _is_partitioned(bind, table):
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+            continue
+        # Partitioned parents can't build concurrently: each partition is built on its own
+        # and attached, which makes the parent index valid once all are in
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}")
+        for partition in _partitions(bind, table):
+            partition_index = f"{partition}_{name[len(f'idx_{table}_'):]}"
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} {definition}")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+def _drop_indexes_concurrently(bind, indexes):
+    """Must run in an autocommit block"""
+    for name, (table, _, _) in indexes.items():
+        # Partitioned indexes can't be dropped concurrently; dropping only takes a brief lock
+        concurrently = "" if _is_partitioned(bind, table) else "CONCURRENTLY "
+        op.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
+
+def _validate_tenant_key(bind, table):
+    """Must run in an autocommit block; VALIDATE only takes a lock that lets writes continue"""
+    name = f'fk_{table}_tenant'
+    definition = "FOREIGN KEY (tenant_id) REFERENCES tenants (id)"
+    if not _is_partitioned(bind, table):
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+        return
+    # NOT VALID keys can't be added to a partitioned table: each partition gets one and
+    # validates it, then the parent's key adopts them instead of checking every row again
+    for partition in _partitions(bind, table):
+        partition_key = f"{partition}_tenant_fkey"
+        if not _constraint_exists(bind, partition, partition_key):
+            op.execute(f"ALTER TABLE {partition} ADD CONSTRAINT {partition_key} {definition} NOT VALID")
+        op.execute(f"ALTER TABLE {partition} VALIDATE CONSTRAINT {partition_key}")
+    if not _constraint_exists(bind, table, name):
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+def upgrade():
+    bind = op.get_bind()
+    op.create_table(
+        'tenants',
+        sa.Column('id', postgresql.UUID(), nullable=False),
+        sa.Column('slug', sa.String(64), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default='true'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('slug')
+    )
+    op.execute(f"INSERT INTO tenants (id, slug, name) VALUES ('{DEFAULT_TENANT_ID}', 'default', 'Default school')")
+
+    for table in TENANT_TABLES:
+        # A constant default is kept in the catalog, so existing rows are not rewritten;
+        # dropping it afterwards makes the application supply the tenant on insert
+        op.add_column(table, sa.Column('tenant_id', postgresql.UUID(), nullable=False,
+                                       server_default=DEFAULT_TENANT_ID))
+        op.alter_column(table, 'tenant_id', server_default=None)
+        if not _is_partitioned(bind, table):
+            # Checked below, outside the transaction, instead of scanning the table under lock
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_tenant "
+                f"FOREIGN KEY (tenant_id) REFERENCES tenants (id) NOT VALID"
+            )
+
+    op.add_column('sync_tombstones', sa.Column('tenant_id', postgresql.UUID(), nullable=True))
+    op.execute(TOMBSTONE_FUNCTION)
+
+    with op.get_context().autocommit_block():
+        for table in TENANT_TABLES:
+            _validate_tenant_key(bind, table)
+        _create_indexes_concurrently(bind, TENANT_INDEXES)
+        _drop_indexes_concurrently(bind, REPLACED_INDEXES)
+
+    op.execute("ANALYZE users")
+    op.execute("ANALYZE educational_content")
+    op.execute("ANALYZE content_access")
+
+def downgrade():
+    op.execute(PREVIOUS_TOMBSTONE_FUNCTION)
+    op.drop_column('sync_tombstones', 'tenant_id')
+
+    _create_indexes(REPLACED_INDEXES)
+    _drop_indexes(TENANT_INDEXES)
+
+    for table in reversed(TENANT_TABLES):
+        op.drop_constraint(f'fk_{table}_tenant', table, type_='foreignkey')
+        op.drop_column(table, 'tenant_id')
+    op.drop_table('tenants')
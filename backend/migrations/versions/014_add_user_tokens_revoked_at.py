@@ -0,0 +1,21 @@
+"""add token revocation time to users
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # API tokens issued at or before this time are rejected (logout everywhere)
+    op.add_column('users', sa.Column('tokens_revoked_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('users', 'tokens_revoked_at')
@@ -0,0 +1,36 @@
+"""add covering index for continue-where-you-left-off
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from alembic import op
+
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+INDEX = 'idx_content_access_continue'
+DEFINITION = "(user_id, completed, last_accessed DESC) INCLUDE (content_id, progress)"
+
+def _partitions(bind):
+    return [row[0] for row in bind.exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'content_access'::regclass ORDER BY 1"
+    )]
+
+def upgrade():
+    bind = op.get_bind()
+    # GET /content/continue reads everything it needs from this index (index-only scan),
+    # newest first, instead of sorting all of a student's access rows.
+    # The partitioned parent can't build concurrently, so each partition is built on its
+    # own without blocking writes and attached; the parent index is valid once all are in.
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY content_access {DEFINITION}")
+        for partition in _partitions(bind):
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_continue ON {partition} {DEFINITION}")
+            op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_continue")
+
+def downgrade():
+    op.drop_index(INDEX, table_name='content_access')
@@ -0,0 +1,36 @@
+"""add trigram indexes for user directory search
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+# ILIKE '%term%' and 'term%' on these columns can use a trigram index;
+# a btree only helps case-sensitive prefixes
+SEARCH_INDEXES = {
+    'idx_users_full_name_trgm': 'full_name',
+    'idx_users_email_trgm': 'email',
+}
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in SEARCH_INDEXES.items():
+        op.create_index(
+            name, 'users', [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+    op.execute("ANALYZE users")
+
+def downgrade():
+    # The extension stays: other database objects may have come to rely on it
+    for name in SEARCH_INDEXES:
+        op.drop_index(name, table_name='users')
@@ -0,0 +1,23 @@
+"""add page count and first-page preview to documents
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19 21:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Filled in by PDF processing after upload; existing documents stay NULL
+    op.add_column('educational_content', sa.Column('page_count', sa.Integer(), nullable=True))
+    op.add_column('educational_content', sa.Column('preview_path', sa.String(), nullable=True))
+
+def downgrade():
+    op.drop_column('educational_content', 'preview_path')
+    op.drop_column('educational_content', 'page_count')
@@ -0,0 +1,59 @@
+"""restore content_access foreign keys after the uuid switch
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19 22:00:00.000000
+
+010 leaves the foreign keys of the partitioned content_access table out:
+adding them there would scan every row while all converted tables are
+locked. Here each partition gets the key NOT VALID and is validated on
+its own (SHARE UPDATE EXCLUSIVE, writes continue), then the key on the
+parent adopts the validated partition keys instead of checking again.
+Databases migrated before 010 changed already have the keys and are left
+alone, apart from dropping the key indexes 009 built per partition, which
+the old 010 left unused next to the rebuilt ones.
+"""
+from alembic import op
+
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+FOREIGN_KEYS = {
+    'content_access_content_id_fkey': ('content_id', 'educational_content'),
+    'content_access_user_id_fkey': ('user_id', 'users'),
+}
+
+def _partitions(bind):
+    return [row[0] for row in bind.exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'content_access'::regclass ORDER BY 1"
+    )]
+
+def _constraint_exists(bind, table, name):
+    return bind.exec_driver_sql(
+        f"SELECT 1 FROM pg_constraint WHERE conrelid = '{table}'::regclass AND conname = '{name}'"
+    ).scalar() is not None
+
+def upgrade():
+    bind = op.get_bind()
+    partitions = _partitions(bind)
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {partition}_uuid_pkey")
+
+        for name, (column, referenced) in FOREIGN_KEYS.items():
+            if _constraint_exists(bind, 'content_access', name):
+                continue
+            definition = f"FOREIGN KEY ({column}) REFERENCES {referenced} (id) ON DELETE CASCADE"
+            for partition in partitions:
+                partition_key = f"{partition}_{column}_fkey"
+                if not _constraint_exists(bind, partition, partition_key):
+                    op.execute(f"ALTER TABLE {partition} ADD CONSTRAINT {partition_key} {definition} NOT VALID")
+                op.execute(f"ALTER TABLE {partition} VALIDATE CONSTRAINT {partition_key}")
+            op.execute(f"ALTER TABLE content_access ADD CONSTRAINT {name} {definition}")
+
+def downgrade():
+    # The keys are part of the schema since 006; 010's downgrade carries them back
+    pass
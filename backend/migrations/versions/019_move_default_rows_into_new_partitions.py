@@ -0,0 +1,113 @@
+"""move default-partition rows into new content_access partitions
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19 22:30:00.000000
+
+A month without a partition collects its rows in content_access_default,
+and creating that month's partition afterwards fails: the default partition
+would hold rows inside the new range. The function now builds the month as
+a plain table, moves the matching rows out of the default partition into it
+and only then attaches it.
+"""
+from alembic import op
+
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_content_access_partitions(
+    months_ahead integer DEFAULT 3,
+    from_month date DEFAULT date_trunc('month', now())::date
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month)::date;
+    month_end date;
+    last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    -- Several workers call this periodically
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_content_access_partitions'));
+    WHILE month_start <= last_month LOOP
+        partition_name := format('content_access_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+        month_end := (month_start + interval '1 month')::date;
+        IF to_regclass(partition_name) IS NULL THEN
+            IF to_regclass('content_access_default') IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF content_access FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            ELSE
+                -- No new rows may reach the default partition between the move and the attach
+                LOCK TABLE content_access_default IN SHARE ROW EXCLUSIVE MODE;
+                -- Moved rows are not deletions; the new table is not attached yet,
+                -- so the tombstone trigger could not find them and would report them
+                ALTER TABLE content_access_default DISABLE TRIGGER content_access_sync_tombstone;
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE content_access INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    partition_name
+                );
+                EXECUTE format(
+                    'WITH moved AS ('
+                    '    DELETE FROM content_access_default'
+                    '    WHERE last_accessed >= %L AND last_accessed < %L'
+                    '    RETURNING *'
+                    ') INSERT INTO %I SELECT * FROM moved',
+                    month_start, month_end, partition_name
+                );
+                ALTER TABLE content_access_default ENABLE TRIGGER content_access_sync_tombstone;
+                -- Indexes and foreign keys of the parent are added to the table as it attaches
+                EXECUTE format(
+                    'ALTER TABLE content_access ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+# As created by 006
+PREVIOUS_ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_content_access_partitions(
+    months_ahead integer DEFAULT 3,
+    from_month date DEFAULT date_trunc('month', now())::date
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month)::date;
+    last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    -- Several workers call this at startup
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_content_access_partitions'));
+    WHILE month_start <= last_month LOOP
+        partition_name := format('content_access_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF content_access FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+def upgrade():
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+def downgrade():
+    op.execute(PREVIOUS_ENSURE_PARTITIONS_FUNCTION)
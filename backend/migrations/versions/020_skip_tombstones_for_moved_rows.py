@@ -0,0 +1,67 @@
+"""skip sync tombstones for rows that move between partitions
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-19 23:00:00.000000
+
+An update that changes last_accessed into another month moves the
+content_access row to another partition. Postgres does that as a delete
+plus an insert, and the delete fired the tombstone trigger, so the change
+feed reported live progress as deleted. The trigger runs after the whole
+statement's changes are in, so it can check whether the row still exists.
+"""
+from alembic import op
+
+revision = '020'
+down_revision = '019'
+branch_labels = None
+depends_on = None
+
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted_at timestamp := timezone('utc', clock_timestamp());
+    still_exists boolean;
+BEGIN
+    -- Only rows of a partitioned table can move; look for the row across all partitions
+    IF (SELECT relispartition FROM pg_class WHERE oid = TG_RELID) THEN
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %s WHERE id = $1)', pg_partition_root(TG_RELID))
+            INTO still_exists USING OLD.id;
+        IF still_exists THEN
+            RETURN OLD;
+        END IF;
+    END IF;
+
+    INSERT INTO sync_tombstones (entity_type, entity_id, user_id, tenant_id, deleted_at, created_at, updated_at)
+    VALUES (
+        TG_ARGV[0], OLD.id, (to_jsonb(OLD) ->> 'user_id')::uuid, (to_jsonb(OLD) ->> 'tenant_id')::uuid,
+        deleted_at, deleted_at, deleted_at
+    );
+    RETURN OLD;
+END;
+$$;
+"""
+
+# As redefined by 013
+PREVIOUS_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted_at timestamp := timezone('utc', clock_timestamp());
+BEGIN
+    INSERT INTO sync_tombstones (entity_type, entity_id, user_id, tenant_id, deleted_at, created_at, updated_at)
+    VALUES (
+        TG_ARGV[0], OLD.id, (to_jsonb(OLD) ->> 'user_id')::uuid, (to_jsonb(OLD) ->> 'tenant_id')::uuid,
+        deleted_at, deleted_at, deleted_at
+    );
+    RETURN OLD;
+END;
+$$;
+"""
+
+def upgrade():
+    op.execute(TOMBSTONE_FUNCTION)
+
+def downgrade():
+    op.execute(PREVIOUS_TOMBSTONE_FUNCTION)
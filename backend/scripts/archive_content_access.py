@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Archive old content_access partitions.
+
+Monthly partitions that end before the retention window are detached, written
+to gzip-compressed CSV files and dropped. Future partitions are topped up first,
+and partitions an interrupted run left detached are exported and dropped.
+
+Run from the backend directory:
+    python -m scripts.archive_content_access
+    python -m scripts.archive_content_access --retention-months 12 --output-dir /backups/access
+"""
+import argparse
+import logging
+import sys
+
+from app import database
+from app.config.settings import settings
+from app.services.partitions import archive_old_partitions, ensure_content_access_partitions
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("archive_content_access")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="content_access partition archival")
+    parser.add_argument("--retention-months", type=int, default=settings.ACCESS_RETENTION_MONTHS)
+    parser.add_argument("--output-dir", default=settings.ACCESS_ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    database.init_db()
+    with database.get_db_session() as db:
+        ensure_content_access_partitions(db)
+        archived = archive_old_partitions(db, args.retention_months, args.output_dir)
+
+    logger.info(f"Archived {len(archived)} partitions")
+    for path in archived:
+        print(path)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
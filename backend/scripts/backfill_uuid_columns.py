@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Backfill the uuid shadow columns added by migration 009.
+
+Walks every table (each partition separately) in ranges of heap pages, copying
+the varchar keys into their <column>_uuid shadows in short transactions, then
+validates the NOT NULL check constraints so migration 010 can swap the columns
+in without scanning under lock. Safe to re-run; rows already filled are skipped.
+
+Run from the backend directory:
+    python -m scripts.backfill_uuid_columns
+    python -m scripts.backfill_uuid_columns --pages 500 --pause 0.05
+"""
+import argparse
+import logging
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import database
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("backfill_uuid_columns")
+
+def shadow_columns(db: Session) -> Dict[str, List[str]]:
+    """Key columns with a uuid shadow, per table"""
+    rows = db.execute(text("""
+        SELECT s.table_name, left(s.column_name, -5)
+        FROM information_schema.columns s
+        JOIN information_schema.columns k
+          ON k.table_schema = s.table_schema AND k.table_name = s.table_name
+         AND k.column_name = left(s.column_name, -5)
+        JOIN pg_class c ON c.relname = s.table_name AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+        WHERE s.table_schema = current_schema() AND s.column_name LIKE '%\\_uuid' AND s.data_type = 'uuid'
+        ORDER BY 1, 2
+    """)).all()
+    columns = defaultdict(list)
+    for table, column in rows:
+        columns[table].append(column)
+    return dict(columns)
+
+def leaf_tables(db: Session, table: str) -> List[str]:
+    return list(db.execute(
+        text("SELECT relid::regclass::text FROM pg_partition_tree(:table) WHERE isleaf"),
+        {"table": table}
+    ).scalars())
+
+def backfill_table(db: Session, table: str, columns: List[str], pages: int, pause: float) -> int:
+    assignments = ", ".join(f"{column}_uuid = {column}::uuid" for column in columns)
+    missing = " OR ".join(f"{column}_uuid IS NULL" for column in columns)
+    total_pages = db.execute(
+        text("SELECT pg_relation_size(:table) / current_setting('block_size')::int"), {"table": table}
+    ).scalar()
+
+    updated = 0
+    for start in range(0, total_pages + 1, pages):
+        # TID range scan: each batch only reads its own pages
+        result = db.execute(text(f"""
+            UPDATE {table} SET {assignments}
+            WHERE ctid >= '({start},0)'::tid AND ctid < '({start + pages},0)'::tid AND ({missing})
+        """))
+        db.commit()
+        updated += result.rowcount
+        if pause:
+            time.sleep(pause)
+
+    logger.info(f"{table}: {updated} rows backfilled over {total_pages} pages")
+    return updated
+
+def validate(db: Session, table: str, columns: List[str]) -> None:
+    for column in columns:
+        db.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_uuid_not_null"))
+        db.commit()
+    logger.info(f"{table}: shadow columns validated")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backfill uuid shadow key columns")
+    parser.add_argument("--pages", type=int, default=1000, help="Heap pages updated per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    database.init_db()
+    with database.get_db_session() as db:
+        columns = shadow_columns(db)
+        if not columns:
+            logger.info("No uuid shadow columns found; nothing to backfill")
+            return 0
+
+        for table, table_columns in columns.items():
+            for leaf in leaf_tables(db, table):
+                try:
+                    backfill_table(db, leaf, table_columns, args.pages, args.pause)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"{leaf}: backfill failed, is every key a valid UUID? {str(e)}")
+                    return 1
+            # Rows written meanwhile were filled by the sync trigger
+            validate(db, table, table_columns)
+
+    logger.info("Backfill complete; migration 010 can be applied")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
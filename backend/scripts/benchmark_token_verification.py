@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Measure event-loop lag while a burst of concurrent logins verifies ID tokens,
+with verification inline on the loop (the old behaviour) and through the
+token verification executor.
+
+Tokens are RS256 JWTs checked against an X.509 certificate, parsed on every
+call like the Admin SDK does, so no Firebase project or database is needed.
+
+Run from the backend directory:
+    python -m scripts.benchmark_token_verification
+    python -m scripts.benchmark_token_verification --logins 500 --distinct 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+from app.config.settings import settings
+from app.services.token_verification import TokenVerifier
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark_token_verification")
+
+AUDIENCE = "benchmark-project"
+PROBE_INTERVAL = 0.005
+
+def _signing_material():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "benchmark")])
+    now = datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return private_pem, certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+def _tokens(private_pem: str, distinct: int) -> List[str]:
+    expires = datetime.utcnow() + timedelta(hours=1)
+    return [
+        jwt.encode({"uid": f"user-{index}", "aud": AUDIENCE, "exp": expires}, private_pem, algorithm="RS256")
+        for index in range(distinct)
+    ]
+
+def _verifier(certificate_pem: str) -> Callable[[str], dict]:
+    def verify(token: str) -> dict:
+        return jwt.decode(token, certificate_pem, algorithms=["RS256"], audience=AUDIENCE)
+    return verify
+
+async def _probe_lag(samples: List[float], stop: asyncio.Event) -> None:
+    """Sleep in short steps and record how late the loop wakes us up"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append(max(0.0, loop.time() - expected))
+
+async def run_mode(verify: Callable, tokens: List[str], logins: int) -> Dict:
+    samples: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_lag(samples, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    latencies: List[float] = []
+
+    async def login(index: int) -> None:
+        started = time.perf_counter()
+        await verify(tokens[index % len(tokens)])
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login(index) for index in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    samples.sort()
+    latencies.sort()
+    return {
+        "logins": logins,
+        "total_seconds": round(elapsed, 3),
+        "loop_lag_max_ms": round(samples[-1] * 1000, 1) if samples else None,
+        "loop_lag_p99_ms": round(samples[int(len(samples) * 0.99)] * 1000, 1) if samples else None,
+        "loop_lag_median_ms": round(statistics.median(samples) * 1000, 1) if samples else None,
+        "login_p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "login_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+    }
+
+async def run(args) -> Dict:
+    private_pem, certificate_pem = _signing_material()
+    tokens = _tokens(private_pem, args.distinct)
+    verify = _verifier(certificate_pem)
+
+    async def inline(token: str) -> dict:
+        # What async handlers did before: CPU work directly on the event loop
+        return verify(token)
+
+    executor = TokenVerifier(verify, args.workers, settings.TOKEN_VERIFY_TIMEOUT)
+    try:
+        results = {
+            "inline": await run_mode(inline, tokens, args.logins),
+            "executor": await run_mode(executor, tokens, args.logins),
+        }
+        results["executor"]["coalesced"] = executor.coalesced
+    finally:
+        executor.shutdown()
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Event-loop lag under concurrent token verification")
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=500,
+                        help="Distinct tokens among the logins; fewer means more coalescing")
+    parser.add_argument("--workers", type=int, default=settings.TOKEN_VERIFY_WORKERS)
+    args = parser.parse_args()
+
+    logger.info(f"Verifying {args.logins} logins ({args.distinct} distinct tokens)")
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compare content_access-shaped tables keyed by random varchar UUIDs (the old
+schema) and by time-ordered native uuids (the current one).
+
+Reports insert throughput and table/index sizes. Everything happens in
+temporary tables, so it is safe to point at any database.
+
+Run from the backend directory:
+    python -m scripts.benchmark_uuid_keys
+    python -m scripts.benchmark_uuid_keys --rows 2000000 --batch 5000
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict
+
+from psycopg2.extras import execute_values
+
+from app import database
+from app.models.base import new_id
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark_uuid_keys")
+
+VARIANTS = {
+    # name: (key column type, id generator)
+    "varchar_uuid4": ("varchar", lambda: str(uuid.uuid4())),
+    "uuid_v7": ("uuid", new_id),
+}
+
+def _create_table(cursor, name: str, key_type: str) -> None:
+    cursor.execute(f"""
+        CREATE TEMP TABLE bench_{name} (
+            id {key_type} PRIMARY KEY,
+            content_id {key_type} NOT NULL,
+            user_id {key_type} NOT NULL,
+            last_accessed timestamp NOT NULL,
+            progress float NOT NULL,
+            completed boolean NOT NULL,
+            created_at timestamp NOT NULL,
+            updated_at timestamp NOT NULL
+        )
+    """)
+    cursor.execute(f"CREATE INDEX ON bench_{name} (user_id)")
+    cursor.execute(f"CREATE INDEX ON bench_{name} (content_id)")
+    cursor.execute(f"CREATE INDEX ON bench_{name} (user_id, content_id)")
+
+def run_variant(connection, name: str, key_type: str, make_id: Callable[[], str],
+                rows: int, batch: int, users: int, contents: int) -> Dict:
+    cursor = connection.cursor()
+    _create_table(cursor, name, key_type)
+    connection.commit()
+
+    # Foreign keys point at pools created the same way as the primary keys
+    user_ids = [make_id() for _ in range(users)]
+    content_ids = [make_id() for _ in range(contents)]
+    random.seed(42)
+
+    elapsed = 0.0
+    for offset in range(0, rows, batch):
+        now = datetime.utcnow()
+        values = [
+            (make_id(), random.choice(content_ids), random.choice(user_ids), now, random.random() * 100, False, now, now)
+            for _ in range(min(batch, rows - offset))
+        ]
+        start = time.perf_counter()
+        execute_values(cursor, f"INSERT INTO bench_{name} VALUES %s", values, page_size=batch)
+        connection.commit()
+        elapsed += time.perf_counter() - start
+
+    cursor.execute(f"ANALYZE bench_{name}")
+    cursor.execute(f"""
+        SELECT pg_relation_size('bench_{name}'),
+               pg_relation_size('bench_{name}_pkey'),
+               pg_indexes_size('bench_{name}')
+    """)
+    table_bytes, primary_key_bytes, index_bytes = cursor.fetchone()
+    cursor.execute(f"DROP TABLE bench_{name}")
+    connection.commit()
+    cursor.close()
+
+    return {
+        "rows": rows,
+        "insert_seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed) if elapsed else None,
+        "table_mb": round(table_bytes / 1048576, 1),
+        "primary_key_mb": round(primary_key_bytes / 1048576, 1),
+        "all_indexes_mb": round(index_bytes / 1048576, 1),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="UUID key insert and index size benchmark")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--contents", type=int, default=5000)
+    args = parser.parse_args()
+
+    database.init_db()
+    connection = database.engine.raw_connection()
+    try:
+        results = {}
+        for name, (key_type, make_id) in VARIANTS.items():
+            logger.info(f"Running {name} with {args.rows} rows")
+            results[name] = run_variant(
+                connection, name, key_type, make_id, args.rows, args.batch, args.users, args.contents
+            )
+            logger.info(f"{name}: {json.dumps(results[name])}")
+    finally:
+        connection.close()
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Check that catalogue queries keep using indexes.
+
+Seeds a realistic catalogue into the configured (migrated) database inside a
+transaction, runs EXPLAIN on the queries list_content builds for common filter
+combinations and fails if any of them reads educational_content with a
+sequential scan. It also seeds one student with a long access history and
+checks that GET /content/continue is answered by index-only scans. The
+transaction is rolled back, so nothing is left behind.
+
+Run from the backend directory against a local Postgres:
+    python -m scripts.check_query_plans
+    python -m scripts.check_query_plans --contents 500000 --verbose
+    python -m scripts.check_query_plans --access-rows 20000
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import uuid
+from typing import Dict, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app import database
+from app.models.content import ContentType
+from app.models.tenant import DEFAULT_TENANT_ID, TenantScoped
+from app.schemas.content import ContentFilterParams
+from app.services.catalogue import query_catalogue
+from app.services.resume import in_progress_statement
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("check_query_plans")
+
+SEED_PREFIX = "plancheck"
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+CONTINUE_PAGE_SIZE = 10
+
+def seed_id(kind: str, n: int) -> str:
+    """Deterministic key of a seeded row; matches md5(...)::uuid in the seed SQL"""
+    return str(uuid.UUID(hashlib.md5(f"{SEED_PREFIX}-{kind}-{n}".encode()).hexdigest()))
+
+def seed(db: Session, contents: int, categories: int, uploaders: int, published_ratio: float) -> None:
+    """Insert uploaders, categories and content rows with a skewed, realistic distribution"""
+    db.execute(text("""
+        INSERT INTO users (id, firebase_uid, email, full_name, role, tenant_id, created_at, updated_at)
+        SELECT md5(:prefix || '-user-' || n)::uuid, :prefix || '-uid-' || n, :prefix || n || '@example.com',
+               'Teacher ' || n, 'teacher', :tenant_id, now(), now()
+        FROM generate_series(1, :uploaders) AS n
+    """), {"prefix": SEED_PREFIX, "uploaders": uploaders, "tenant_id": DEFAULT_TENANT_ID})
+    db.execute(text("""
+        INSERT INTO content_categories (id, name, created_at, updated_at)
+        SELECT md5(:prefix || '-category-' || n)::uuid, :prefix || ' category ' || n, now(), now()
+        FROM generate_series(1, :categories) AS n
+    """), {"prefix": SEED_PREFIX, "categories": categories})
+    # Power-law-ish views, most content published, uploads spread over two years
+    db.execute(text("""
+        INSERT INTO educational_content (
+            id, title, content_type, file_path, file_size, mime_type, category_id, uploaded_by,
+            is_published, view_count, download_count, tenant_id, created_at, updated_at
+        )
+        SELECT md5(:prefix || '-content-' || n)::uuid,
+               'Content ' || n,
+               (ARRAY['video', 'document', 'ebook'])[1 + n % 3]::content_type,
+               'uploads/' || n || '.pdf',
+               1024 + n % 100000,
+               'application/pdf',
+               md5(:prefix || '-category-' || (1 + n % :categories))::uuid,
+               md5(:prefix || '-user-' || (1 + (random() * random() * (:uploaders - 1))::int))::uuid,
+               random() < :published_ratio,
+               (1000 * power(random(), 4))::int,
+               0,
+               :tenant_id,
+               now() - random() * interval '730 days',
+               now()
+        FROM generate_series(1, :contents) AS n
+    """), {
+        "prefix": SEED_PREFIX,
+        "contents": contents,
+        "categories": categories,
+        "uploaders": uploaders,
+        "published_ratio": published_ratio,
+        "tenant_id": DEFAULT_TENANT_ID,
+    })
+    db.execute(text("ANALYZE users"))
+    db.execute(text("ANALYZE content_categories"))
+    db.execute(text("ANALYZE educational_content"))
+
+def seed_access(db: Session, contents: int, access_rows: int) -> None:
+    """One student with a year of access history spread over the monthly partitions"""
+    db.execute(text("""
+        INSERT INTO users (id, firebase_uid, email, full_name, role, grade_level, tenant_id, created_at, updated_at)
+        VALUES (md5(:prefix || '-student-1')::uuid, :prefix || '-student-uid', :prefix || '-student@example.com',
+                'Student', 'student', '5', :tenant_id, now(), now())
+    """), {"prefix": SEED_PREFIX, "tenant_id": DEFAULT_TENANT_ID})
+    db.execute(text("SELECT ensure_content_access_partitions(3, (now() - interval '1 year')::date)"))
+    db.execute(text("""
+        INSERT INTO content_access (
+            id, content_id, user_id, last_accessed, progress, completed, tenant_id, created_at, updated_at
+        )
+        SELECT md5(:prefix || '-access-' || n)::uuid,
+               md5(:prefix || '-content-' || (1 + (random() * (:contents - 1))::int))::uuid,
+               md5(:prefix || '-student-1')::uuid,
+               now() - random() * interval '365 days',
+               random() * 100,
+               random() < 0.6,
+               :tenant_id,
+               now(),
+               now()
+        FROM generate_series(1, :access_rows) AS n
+    """), {
+        "prefix": SEED_PREFIX,
+        "contents": contents,
+        "access_rows": access_rows,
+        "tenant_id": DEFAULT_TENANT_ID,
+    })
+    db.execute(text("ANALYZE content_access"))
+
+def plan_cases(page_size: int) -> Dict[str, ContentFilterParams]:
+    """The filter combinations non-admin catalogue requests actually send"""
+    return {
+        "first page": ContentFilterParams(limit=page_size),
+        "second page": ContentFilterParams(skip=page_size, limit=page_size),
+        "by category": ContentFilterParams(category_id=seed_id("category", 7), limit=page_size),
+        "by type": ContentFilterParams(content_type=ContentType.VIDEO, limit=page_size),
+        "by uploader": ContentFilterParams(uploaded_by=seed_id("user", 42), limit=page_size),
+        "popular": ContentFilterParams(min_view_count=900, limit=page_size),
+        "category and type": ContentFilterParams(
+            category_id=seed_id("category", 3), content_type=ContentType.EBOOK, limit=page_size
+        ),
+    }
+
+def _walk(node: Dict) -> Iterator[Dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+def explain(db: Session, filters: ContentFilterParams) -> Dict:
+    # Requests are scoped to a school at execution time; compiling the statement skips that hook
+    statement = query_catalogue(db, filters).options(
+        with_loader_criteria(TenantScoped, lambda cls: cls.tenant_id == DEFAULT_TENANT_ID, include_aliases=True)
+    ).statement
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+
+def check_plans(db: Session, page_size: int, verbose: bool) -> List[str]:
+    """Return the names of cases whose plan scans educational_content sequentially"""
+    failures = []
+    for name, filters in plan_cases(page_size).items():
+        plan = explain(db, filters)
+        scans = [node for node in _walk(plan) if node.get("Relation Name") == "educational_content"]
+        sequential = [node for node in scans if node["Node Type"] not in INDEX_SCANS]
+        indexes = sorted({node["Index Name"] for node in scans if node.get("Index Name")})
+
+        if sequential:
+            failures.append(name)
+            logger.error(f"{name}: {', '.join(node['Node Type'] for node in sequential)} on educational_content")
+        else:
+            logger.info(f"{name}: {', '.join(indexes) or 'bitmap scan'}")
+        if verbose or sequential:
+            print(json.dumps(plan, indent=2))
+    return failures
+
+def check_continue_plan(db: Session, verbose: bool) -> bool:
+    """True if the continue-where-you-left-off query only touches content_access through index-only scans"""
+    statement = in_progress_statement(seed_id("student", 1), CONTINUE_PAGE_SIZE)
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    result = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()[0]
+    plan = result["Plan"]
+    scans = [node for node in _walk(plan) if node.get("Relation Name", "").startswith("content_access")]
+    other = [node for node in scans if node["Node Type"] != "Index Only Scan"]
+    # Freshly seeded rows are not all-visible yet, so heap fetches are expected here
+    heap_fetches = sum(node.get("Heap Fetches", 0) for node in scans)
+
+    if other:
+        logger.error(f"continue: {', '.join(sorted({node['Node Type'] for node in other}))} on content_access")
+    else:
+        logger.info(
+            f"continue: index-only scans on {len(scans)} partitions, "
+            f"{result['Execution Time']:.3f} ms, {heap_fetches} heap fetches"
+        )
+    if verbose or other:
+        print(json.dumps(plan, indent=2))
+    return not other
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Catalogue query plan regression check")
+    parser.add_argument("--contents", type=int, default=200000)
+    parser.add_argument("--categories", type=int, default=60)
+    parser.add_argument("--uploaders", type=int, default=400)
+    parser.add_argument("--published-ratio", type=float, default=0.85)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--access-rows", type=int, default=5000,
+                        help="Access history of the seeded student for the continue query")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not only failing ones")
+    args = parser.parse_args()
+
+    database.init_db()
+    with database.get_db_session() as db:
+        try:
+            seed(db, args.contents, args.categories, args.uploaders, args.published_ratio)
+            failures = check_plans(db, args.page_size, args.verbose)
+            seed_access(db, args.contents, args.access_rows)
+            if not check_continue_plan(db, args.verbose):
+                failures.append("continue")
+        finally:
+            db.rollback()
+
+    if failures:
+        logger.error(f"Unindexed reads in {len(failures)} queries: {', '.join(failures)}")
+        return 1
+    logger.info("All catalogue and continue queries use indexes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
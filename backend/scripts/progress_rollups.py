@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Rebuild or verify the progress rollup tables.
+
+Run from the backend directory:
+    python -m scripts.progress_rollups rebuild   # backfill from content_access
+    python -m scripts.progress_rollups check     # report drift, exit 1 if any
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app import database
+from app.services.rollups import rebuild_rollups, find_rollup_drift
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("progress_rollups")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Progress rollup maintenance")
+    parser.add_argument("action", choices=["rebuild", "check"])
+    parser.add_argument("--limit", type=int, default=100, help="Maximum drifting rows reported per table")
+    args = parser.parse_args()
+
+    database.init_db()
+    with database.get_db_session() as db:
+        if args.action == "rebuild":
+            counts = rebuild_rollups(db)
+            logger.info(f"Rollups rebuilt: {json.dumps(counts)}")
+            return 0
+
+        drift = find_rollup_drift(db, limit=args.limit)
+        for table, rows in drift.items():
+            if rows:
+                logger.error(f"{table}: {len(rows)} drifting rows")
+                for row in rows:
+                    print(json.dumps(row, default=str))
+            else:
+                logger.info(f"{table}: consistent")
+        return 1 if any(drift.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
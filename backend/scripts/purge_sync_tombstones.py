@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Purge sync tombstones older than the retention window.
+
+Clients whose sync token predates the window get 410 from GET /api/sync and
+start over with a full sync, so nothing they still need is lost.
+
+Run from the backend directory (daily is plenty):
+    python -m scripts.purge_sync_tombstones
+    python -m scripts.purge_sync_tombstones --retention-days 14
+"""
+import argparse
+import logging
+import sys
+
+from app import database
+from app.config.settings import settings
+from app.services.sync import purge_tombstones
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("purge_sync_tombstones")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync tombstone purge")
+    parser.add_argument("--retention-days", type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    database.init_db()
+    with database.get_db_session() as db:
+        purged = purge_tombstones(db, args.retention_days)
+
+    logger.info(f"Purged {purged} tombstones older than {args.retention_days} days")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Refresh "students also studied" recommendations from content_access.
+
+Run from the backend directory:
+    python -m scripts.recommendations          # incremental: items with new access rows only
+    python -m scripts.recommendations --full   # recompute every item
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app import database
+from app.services.recommendations import refresh_recommendations
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("recommendations")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Co-access recommendation batch job")
+    parser.add_argument("--full", action="store_true", help="Recompute all items instead of changed ones")
+    args = parser.parse_args()
+
+    database.init_db()
+    with database.get_db_session() as db:
+        summary = refresh_recommendations(db, full=args.full)
+    logger.info(f"Recommendation refresh finished: {json.dumps(summary)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -63,6 +63,13 @@ def run_migrations(action='upgrade'):
     run_command(f'. venv/bin/activate && {migration_commands[action]}')
     os.chdir('..')
 
+def run_backend_script(module, *args):
+    """Run a maintenance script from backend/scripts inside the backend virtualenv"""
+    setup_backend_env()
+    os.chdir('backend')
+    run_command(f'. venv/bin/activate && python -m scripts.{module} {" ".join(args)}')
+    os.chdir('..')
+
 def run_tests(component=None):
     """Run tests for backend or frontend"""
     if component == 'backend':
@@ -137,6 +144,36 @@ def main():
     parser.add_argument('--migrate', choices=['upgrade', 'downgrade', 'generate', 'history'], 
                         help='Run database migrations')
     
+    # Progress rollup maintenance
+    parser.add_argument('--rollups', choices=['rebuild', 'check'],
+                        help='Rebuild or verify progress rollup tables')
+    
+    # Recommendation batch job
+    parser.add_argument('--recommendations', choices=['incremental', 'full'],
+                        help='Refresh co-access content recommendations')
+    
+    # content_access archival
+    parser.add_argument('--archive-access', action='store_true',
+                        help='Archive content_access partitions older than the retention window')
+    
+    # Delta sync tombstones
+    parser.add_argument('--purge-tombstones', action='store_true',
+                        help='Purge sync tombstones older than the retention window')
+    
+    # Query plan regression check
+    parser.add_argument('--check-plans', action='store_true',
+                        help='Seed a local database and verify catalogue queries use indexes')
+    
+    # UUID key migration
+    parser.add_argument('--backfill-uuids', action='store_true',
+                        help='Backfill uuid shadow key columns (between migrations 009 and 010)')
+    parser.add_argument('--benchmark-keys', action='store_true',
+                        help='Benchmark varchar vs time-ordered uuid keys')
+    
+    # Token verification
+    parser.add_argument('--benchmark-tokens', action='store_true',
+                        help='Measure event-loop lag during concurrent token verification')
+    
     # Test commands
     parser.add_argument('--test', choices=['backend', 'frontend', 'all'], 
                         help='Run tests')
@@ -166,6 +203,30 @@ def main():
     if args.migrate:
         run_migrations(args.migrate)
     
+    if args.rollups:
+        run_backend_script('progress_rollups', args.rollups)
+    
+    if args.recommendations:
+        run_backend_script('recommendations', '--full' if args.recommendations == 'full' else '')
+    
+    if args.archive_access:
+        run_backend_script('archive_content_access')
+    
+    if args.purge_tombstones:
+        run_backend_script('purge_sync_tombstones')
+    
+    if args.check_plans:
+        run_backend_script('check_query_plans')
+    
+    if args.backfill_uuids:
+        run_backend_script('backfill_uuid_columns')
+    
+    if args.benchmark_keys:
+        run_backend_script('benchmark_uuid_keys')
+    
+    if args.benchmark_tokens:
+        run_backend_script('benchmark_token_verification')
+    
     if args.test:
         run_tests(args.test)
     